@@ -0,0 +1,39 @@
+"""attempt expiry index
+
+Revision ID: 8f1c6a2d9e04
+Revises: 3b9d2e7a41c5
+Create Date: 2026-10-19 11:03:27.118904
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8f1c6a2d9e04"
+down_revision: Union[str, Sequence[str], None] = "3b9d2e7a41c5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_quiz_attempt_expires_at_in_progress",
+        "quiz_attempt",
+        ["expires_at"],
+        unique=False,
+        postgresql_where=sa.text("status = 'IN_PROGRESS'"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ix_quiz_attempt_expires_at_in_progress",
+        table_name="quiz_attempt",
+        postgresql_where=sa.text("status = 'IN_PROGRESS'"),
+    )
@@ -0,0 +1,39 @@
+"""attempt review index
+
+Revision ID: e2b7d9c41f68
+Revises: c5e81f4a7d20
+Create Date: 2026-10-19 22:41:09.274536
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e2b7d9c41f68"
+down_revision: Union[str, Sequence[str], None] = "c5e81f4a7d20"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_quiz_attempt_quiz_id_finished_at_id",
+        "quiz_attempt",
+        ["quiz_id", "finished_at", "id"],
+        unique=False,
+        postgresql_where=sa.text("finished_at IS NOT NULL"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ix_quiz_attempt_quiz_id_finished_at_id",
+        table_name="quiz_attempt",
+        postgresql_where=sa.text("finished_at IS NOT NULL"),
+    )
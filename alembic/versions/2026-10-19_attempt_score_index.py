@@ -0,0 +1,32 @@
+"""attempt score index
+
+Revision ID: c5e81f4a7d20
+Revises: 9a4e2c7f1b53
+Create Date: 2026-10-19 22:04:18.637215
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c5e81f4a7d20"
+down_revision: Union[str, Sequence[str], None] = "9a4e2c7f1b53"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_quiz_attempt_quiz_id_status_score",
+        "quiz_attempt",
+        ["quiz_id", "status", "score"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_quiz_attempt_quiz_id_status_score", table_name="quiz_attempt")
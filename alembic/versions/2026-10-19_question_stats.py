@@ -0,0 +1,95 @@
+"""question stats
+
+Revision ID: 9a4e2c7f1b53
+Revises: 6d3f0b8e2a91
+Create Date: 2026-10-19 21:12:46.510238
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "9a4e2c7f1b53"
+down_revision: Union[str, Sequence[str], None] = "6d3f0b8e2a91"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "question_stats",
+        sa.Column("quiz_id", sa.UUID(), nullable=False),
+        sa.Column("question_id", sa.UUID(), nullable=False),
+        sa.Column("answered_count", sa.Integer(), nullable=False),
+        sa.Column("correct_count", sa.Integer(), nullable=False),
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.ForeignKeyConstraint(["quiz_id"], ["company_quiz.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(
+            ["question_id"], ["company_quiz_question.id"], ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("quiz_id", "question_id"),
+    )
+    op.create_table(
+        "option_stats",
+        sa.Column("quiz_id", sa.UUID(), nullable=False),
+        sa.Column("option_id", sa.UUID(), nullable=False),
+        sa.Column("picks_count", sa.Integer(), nullable=False),
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.ForeignKeyConstraint(["quiz_id"], ["company_quiz.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(
+            ["option_id"], ["question_answer_option.id"], ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("quiz_id", "option_id"),
+    )
+    # Same grading rule as finalize_attempts_query: selected options equal the correct ones
+    op.execute("""
+        INSERT INTO question_stats
+            (id, quiz_id, question_id, answered_count, correct_count)
+        WITH selected AS (
+            SELECT a.quiz_id, ans.question_id,
+                   array_agg(DISTINCT s.option_id ORDER BY s.option_id)
+                       FILTER (WHERE s.option_id IS NOT NULL) AS option_ids
+            FROM quiz_attempt a
+            JOIN quiz_attempt_answer ans ON ans.attempt_id = a.id
+            JOIN quiz_question_link l
+              ON l.quiz_id = a.quiz_id AND l.question_id = ans.question_id
+            LEFT JOIN attempt_answer_selection s ON s.answer_id = ans.id
+            WHERE a.status IN ('COMPLETED', 'EXPIRED')
+            GROUP BY ans.id, a.quiz_id, ans.question_id
+        ), correct AS (
+            SELECT question_id,
+                   array_agg(id ORDER BY id) FILTER (WHERE is_correct) AS option_ids
+            FROM question_answer_option
+            GROUP BY question_id
+        )
+        SELECT gen_random_uuid(), s.quiz_id, s.question_id,
+               count(*) FILTER (WHERE s.option_ids IS NOT NULL),
+               count(*) FILTER (WHERE s.option_ids IS NOT DISTINCT FROM c.option_ids)
+        FROM selected s
+        LEFT JOIN correct c ON c.question_id = s.question_id
+        GROUP BY s.quiz_id, s.question_id
+        """)
+    op.execute("""
+        INSERT INTO option_stats (id, quiz_id, option_id, picks_count)
+        SELECT gen_random_uuid(), a.quiz_id, s.option_id, count(*)
+        FROM quiz_attempt a
+        JOIN quiz_attempt_answer ans ON ans.attempt_id = a.id
+        JOIN quiz_question_link l
+          ON l.quiz_id = a.quiz_id AND l.question_id = ans.question_id
+        JOIN attempt_answer_selection s ON s.answer_id = ans.id
+        WHERE a.status IN ('COMPLETED', 'EXPIRED')
+        GROUP BY a.quiz_id, s.option_id
+        """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("option_stats")
+    op.drop_table("question_stats")
@@ -0,0 +1,75 @@
+"""quiz question link
+
+Revision ID: 6d3f0b8e2a91
+Revises: c2e9b47a5d18
+Create Date: 2026-10-19 17:58:33.614270
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "6d3f0b8e2a91"
+down_revision: Union[str, Sequence[str], None] = "c2e9b47a5d18"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "quiz_question_link",
+        sa.Column("quiz_id", sa.UUID(), nullable=False),
+        sa.Column("question_id", sa.UUID(), nullable=False),
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["question_id"], ["company_quiz_question.id"], ondelete="CASCADE"
+        ),
+        sa.ForeignKeyConstraint(["quiz_id"], ["company_quiz.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("quiz_id", "question_id"),
+    )
+    op.create_index(
+        "ix_quiz_question_link_question_id", "quiz_question_link", ["question_id"]
+    )
+    # Existing copies stay separate questions, new versions share them
+    op.execute("""
+        INSERT INTO quiz_question_link (id, quiz_id, question_id)
+        SELECT gen_random_uuid(), quiz_id, id
+        FROM company_quiz_question
+        """)
+    op.drop_column("company_quiz_question", "quiz_id")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column(
+        "company_quiz_question", sa.Column("quiz_id", sa.UUID(), nullable=True)
+    )
+    # A shared question goes back to one of its quizzes, the other versions lose it
+    op.execute("""
+        UPDATE company_quiz_question q
+        SET quiz_id = l.quiz_id
+        FROM (
+            SELECT DISTINCT ON (question_id) question_id, quiz_id
+            FROM quiz_question_link
+            ORDER BY question_id, quiz_id
+        ) l
+        WHERE l.question_id = q.id
+        """)
+    op.execute("DELETE FROM company_quiz_question WHERE quiz_id IS NULL")
+    op.alter_column("company_quiz_question", "quiz_id", nullable=False)
+    op.create_foreign_key(
+        "company_quiz_question_quiz_id_fkey",
+        "company_quiz_question",
+        "company_quiz",
+        ["quiz_id"],
+        ["id"],
+        ondelete="CASCADE",
+    )
+    op.drop_index("ix_quiz_question_link_question_id", table_name="quiz_question_link")
+    op.drop_table("quiz_question_link")
@@ -0,0 +1,50 @@
+"""unique active attempt
+
+Revision ID: 5e7a1c3b9f62
+Revises: 8f1c6a2d9e04
+Create Date: 2026-10-19 14:02:17.384105
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5e7a1c3b9f62"
+down_revision: Union[str, Sequence[str], None] = "8f1c6a2d9e04"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Keep the newest attempt in progress per user and quiz, expire the others
+    op.execute("""
+        UPDATE quiz_attempt a
+        SET status = 'EXPIRED', finished_at = now()
+        FROM quiz_attempt b
+        WHERE a.user_id = b.user_id
+          AND a.quiz_id = b.quiz_id
+          AND a.status = 'IN_PROGRESS'
+          AND b.status = 'IN_PROGRESS'
+          AND (a.started_at, a.id) < (b.started_at, b.id)
+        """)
+    op.create_index(
+        "uq_quiz_attempt_in_progress",
+        "quiz_attempt",
+        ["user_id", "quiz_id"],
+        unique=True,
+        postgresql_where=sa.text("status = 'IN_PROGRESS'"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "uq_quiz_attempt_in_progress",
+        table_name="quiz_attempt",
+        postgresql_where=sa.text("status = 'IN_PROGRESS'"),
+    )
@@ -0,0 +1,60 @@
+"""unique attempt answers
+
+Revision ID: 3b9d2e7a41c5
+Revises: cf07717561d7
+Create Date: 2026-10-19 10:12:41.503218
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3b9d2e7a41c5"
+down_revision: Union[str, Sequence[str], None] = "cf07717561d7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Keep one answer per question of an attempt, selections of the others cascade
+    op.execute("""
+        DELETE FROM quiz_attempt_answer a
+        USING quiz_attempt_answer b
+        WHERE a.attempt_id = b.attempt_id
+          AND a.question_id = b.question_id
+          AND a.id < b.id
+        """)
+    op.execute("""
+        DELETE FROM attempt_answer_selection a
+        USING attempt_answer_selection b
+        WHERE a.answer_id = b.answer_id
+          AND a.option_id = b.option_id
+          AND a.id < b.id
+        """)
+    op.create_unique_constraint(
+        "quiz_attempt_answer_attempt_id_question_id_key",
+        "quiz_attempt_answer",
+        ["attempt_id", "question_id"],
+    )
+    op.create_unique_constraint(
+        "attempt_answer_selection_answer_id_option_id_key",
+        "attempt_answer_selection",
+        ["answer_id", "option_id"],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint(
+        "attempt_answer_selection_answer_id_option_id_key",
+        "attempt_answer_selection",
+        type_="unique",
+    )
+    op.drop_constraint(
+        "quiz_attempt_answer_attempt_id_question_id_key",
+        "quiz_attempt_answer",
+        type_="unique",
+    )
@@ -0,0 +1,51 @@
+"""user company stats
+
+Revision ID: c2e9b47a5d18
+Revises: a4c82f6d1b37
+Create Date: 2026-10-19 16:40:09.257731
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c2e9b47a5d18"
+down_revision: Union[str, Sequence[str], None] = "a4c82f6d1b37"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "user_company_stats",
+        sa.Column("user_id", sa.UUID(), nullable=False),
+        sa.Column("company_id", sa.UUID(), nullable=False),
+        sa.Column("correct_answers_count", sa.Integer(), nullable=False),
+        sa.Column("total_questions_count", sa.Integer(), nullable=False),
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.ForeignKeyConstraint(["company_id"], ["company.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["user_id"], ["user.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("user_id", "company_id"),
+    )
+    # Large histories can be rebuilt later in batches: python -m src.quiz.commands rebuild-stats
+    op.execute("""
+        INSERT INTO user_company_stats
+            (id, user_id, company_id, correct_answers_count, total_questions_count)
+        SELECT gen_random_uuid(), a.user_id, q.company_id,
+               sum(a.correct_answers_count), sum(a.total_questions_count)
+        FROM quiz_attempt a
+        JOIN company_quiz q ON q.id = a.quiz_id
+        WHERE a.status IN ('COMPLETED', 'EXPIRED')
+        GROUP BY a.user_id, q.company_id
+        """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("user_company_stats")
@@ -0,0 +1,46 @@
+"""user quiz attempt counter
+
+Revision ID: a4c82f6d1b37
+Revises: 5e7a1c3b9f62
+Create Date: 2026-10-19 15:21:48.902611
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a4c82f6d1b37"
+down_revision: Union[str, Sequence[str], None] = "5e7a1c3b9f62"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "user_quiz_attempt_counter",
+        sa.Column("user_id", sa.UUID(), nullable=False),
+        sa.Column("quiz_id", sa.UUID(), nullable=False),
+        sa.Column("attempts_count", sa.Integer(), nullable=False),
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.ForeignKeyConstraint(["quiz_id"], ["company_quiz.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["user_id"], ["user.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("user_id", "quiz_id"),
+    )
+    # Counters of the attempts taken so far
+    op.execute("""
+        INSERT INTO user_quiz_attempt_counter (id, user_id, quiz_id, attempts_count)
+        SELECT gen_random_uuid(), user_id, quiz_id, count(*)
+        FROM quiz_attempt
+        GROUP BY user_id, quiz_id
+        """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("user_quiz_attempt_counter")
@@ -1,4 +1,5 @@
 from datetime import datetime
+from typing import Iterable
 from uuid import UUID
 
 from sqlalchemy import update
@@ -14,11 +15,11 @@ class UserRepository(BaseRepository[UserModel]):
         super().__init__(model=UserModel, db=db)
 
     async def update_last_quiz_attempt_time(
-        self, user_id: UUID, new_time: datetime
+        self, user_ids: Iterable[UUID], new_time: datetime
     ) -> None:
         query = (
             update(UserModel)
-            .where(UserModel.id == user_id)
+            .where(UserModel.id.in_(user_ids))
             .values(last_quiz_attempt_at=new_time)
         )
         await self.db.execute(query)
@@ -3,7 +3,8 @@ from uuid import UUID
 from fastapi import APIRouter, Response, status
 from fastapi_cache.decorator import cache
 
-from src.core.caching.keys import endpoint_key_builder
+from src.core.caching.config import HOUR, CacheConfig
+from src.core.caching.keys import endpoint_key_builder, tagged_key_builder
 from src.core.dependencies import PaginationParamDep
 from src.core.exceptions import ExternalAuthProviderException
 from src.core.schemas import PaginationResponse
@@ -125,7 +126,7 @@ async def get_users(user_service: UserServiceDep, pagination: PaginationParamDep
 @users_router.get(
     "/me", status_code=status.HTTP_200_OK, response_model=UserDetailsResponse
 )
-@cache(expire=600, key_builder=endpoint_key_builder)
+@cache(expire=6 * HOUR, key_builder=tagged_key_builder(CacheConfig.USER))
 async def get_me(user: GetUserJWTDep):
     """Returns an authenticated user info"""
     return user
@@ -134,7 +135,7 @@ async def get_me(user: GetUserJWTDep):
 @users_router.get(
     "/{user_id}", status_code=status.HTTP_200_OK, response_model=UserDetailsResponse
 )
-@cache(expire=600, key_builder=endpoint_key_builder)
+@cache(expire=6 * HOUR, key_builder=tagged_key_builder(CacheConfig.USER))
 async def get_user(user_service: UserServiceDep, user_id: UUID):
     """Returns a user by its id"""
     user = await user_service.get_by_id(user_id=user_id)
@@ -185,7 +186,7 @@ async def delete_self(user_service: UserServiceDep, user: GetUserJWTDep):
     response_model=UserAverageSystemStatsResponseSchema,
     status_code=status.HTTP_200_OK,
 )
-@cache(expire=3600, key_builder=endpoint_key_builder)
+@cache(expire=6 * HOUR, key_builder=tagged_key_builder(CacheConfig.USER))
 async def get_user_average_score_system_wide(
     attempt_service: AttemptServiceDep, user: GetUserJWTDep
 ):
@@ -9,6 +9,8 @@ from pydantic import EmailStr
 from sqlalchemy.orm import InstrumentedAttribute
 
 from src.auth.enums import JWTTypeEnum
+from src.core.caching.config import CacheConfig
+from src.core.caching.decorators import cache_not_found
 from src.core.config import AppSettings, Auth0JWTSettings, LocalJWTSettings
 from src.core.exceptions import (
     ExternalAuthProviderException,
@@ -69,6 +71,7 @@ class UserService(BaseService[UserRepository, UserModel]):
         )
         return user
 
+    @cache_not_found(config=CacheConfig.USER)
     async def get_by_id(
         self, user_id: UUID, relationships: set[InstrumentedAttribute] | None = None
     ) -> UserDetailsResponse:
@@ -1,12 +1,16 @@
 from __future__ import annotations
 
 from typing import Annotated
+from uuid import UUID
 
 from fastapi import Depends
 from fastapi_limiter.depends import RateLimiter
 
-from src.core.dependencies import DBSessionDep
+from src.auth.dependencies import GetOptionalUserJWTDep
+from src.core.dependencies import DBSessionDep, RedisDep
+from src.quiz.leaderboard import Leaderboard
 
+from .enums import CompanyAudience
 from .repository import (
     CompanyRepository,
     InvitationRepository,
@@ -26,14 +30,26 @@ ReqLimitDep = Depends(RateLimiter(times=20, seconds=60))
 
 
 async def get_company_member_service(
-    member_repo: MemberRepositoryDep,
+    member_repo: MemberRepositoryDep, redis: RedisDep
 ) -> MemberService:
-    return MemberService(member_repo=member_repo)
+    return MemberService(member_repo=member_repo, leaderboard=Leaderboard(redis=redis))
 
 
 CompanyMemberServiceDep = Annotated[MemberService, Depends(get_company_member_service)]
 
 
+async def get_company_audience(
+    member_service: CompanyMemberServiceDep,
+    user: GetOptionalUserJWTDep,
+    company_id: UUID,
+) -> CompanyAudience:
+    user_id = user.id if user else None
+    return await member_service.get_audience(company_id=company_id, user_id=user_id)
+
+
+CompanyAudienceDep = Annotated[CompanyAudience, Depends(get_company_audience)]
+
+
 async def get_company_service(
     company_repo: CompanyRepositoryDep, member_service: CompanyMemberServiceDep
 ) -> CompanyService:
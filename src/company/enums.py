@@ -15,6 +15,26 @@ class CompanyRole(IntEnum):
         return self.value >= required_role.value
 
 
+class CompanyAudience(str, Enum):
+    """Viewers of the company content that get the same responses."""
+
+    ANONYMOUS = "anonymous"  # Guests and users outside the company
+    MEMBER = "member"
+    ADMIN = "admin"
+
+    @classmethod
+    def from_role(cls, role: CompanyRole | None) -> "CompanyAudience":
+        if role is None:
+            return cls.ANONYMOUS
+        if role.is_authorized(CompanyRole.ADMIN):
+            return cls.ADMIN
+        return cls.MEMBER
+
+    @property
+    def is_admin(self) -> bool:
+        return self is CompanyAudience.ADMIN
+
+
 class MessageStatus(str, Enum):
     PENDING = "pending"
     ACCEPTED = "accepted"
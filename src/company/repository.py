@@ -5,6 +5,7 @@ from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.core.repository import BaseRepository
+from src.quiz.models import CompanyQuiz as CompanyQuizModel
 
 from .enums import CompanyRole
 from .models import (
@@ -54,19 +55,12 @@ class MemberRepository(BaseRepository[CompanyMemberModel]):
         user_company_ids = await self.db.scalars(query)
         return user_company_ids.all()
 
-    async def get_and_lock_member_row(
-        self, company_id: UUID, user_id: UUID
-    ) -> CompanyMemberModel | None:
-        query = (
-            select(CompanyMemberModel)
-            .where(
-                CompanyMemberModel.company_id == company_id,
-                CompanyMemberModel.user_id == user_id,
-            )
-            .with_for_update()
+    async def get_company_quiz_ids(self, company_id: UUID) -> Sequence[UUID]:
+        query = select(CompanyQuizModel.id).where(
+            CompanyQuizModel.company_id == company_id
         )
-        member = await self.db.scalar(query)
-        return member
+        quiz_ids = await self.db.scalars(query)
+        return quiz_ids.all()
 
     async def get_members_count_by_ids(self, company_id: UUID, *args: UUID) -> int:
         query = (
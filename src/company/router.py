@@ -4,12 +4,14 @@ from fastapi import APIRouter, Query, status
 from fastapi_cache.decorator import cache
 
 from src.auth.dependencies import GetOptionalUserJWTDep, GetUserJWTDep
-from src.core.caching.keys import endpoint_key_builder
+from src.core.caching.config import HOUR, CacheConfig
+from src.core.caching.keys import endpoint_key_builder, tagged_key_builder
 from src.core.dependencies import PaginationParamDep
 from src.core.schemas import PaginationResponse
 from src.quiz.dependencies import AttemptServiceDep
 
 from .dependencies import (
+    CompanyAudienceDep,
     CompanyInvitationServiceDep,
     CompanyJoinRequestServiceDep,
     CompanyLimitDep,
@@ -96,13 +98,15 @@ async def get_companies(
     response_model=CompanyDetailsResponseSchema,
     status_code=status.HTTP_200_OK,
 )
-@cache(expire=600, key_builder=endpoint_key_builder)
+@cache(
+    expire=6 * HOUR,
+    key_builder=tagged_key_builder(CacheConfig.COMPANY, per_audience=True),
+)
 async def get_company(
-    company_service: CompanyServiceDep, user: GetOptionalUserJWTDep, company_id: UUID
+    company_service: CompanyServiceDep, audience: CompanyAudienceDep, company_id: UUID
 ):
     """Returns a company by its id"""
-    user_id = user.id if user else None
-    company = await company_service.get_by_id(company_id=company_id, user_id=user_id)
+    company = await company_service.get_by_id(company_id=company_id, audience=audience)
     return company
 
 
@@ -214,7 +218,7 @@ async def cancel_invitation(
     response_model=PaginationResponse[InvitationDetailsResponse],
     status_code=status.HTTP_200_OK,
 )
-@cache(expire=600, key_builder=endpoint_key_builder)
+@cache(expire=6 * HOUR, key_builder=tagged_key_builder(CacheConfig.COMPANY))
 async def get_company_pending_invitations(
     company_invitation_service: CompanyInvitationServiceDep,
     acting_user: GetUserJWTDep,
@@ -235,7 +239,7 @@ async def get_company_pending_invitations(
     response_model=PaginationResponse[InvitationDetailsResponse],
     status_code=status.HTTP_200_OK,
 )
-@cache(expire=600, key_builder=endpoint_key_builder)
+@cache(expire=6 * HOUR, key_builder=tagged_key_builder(CacheConfig.USER))
 async def get_my_pending_invitations(
     company_invitation_service: CompanyInvitationServiceDep,
     user: GetUserJWTDep,
@@ -319,7 +323,7 @@ async def cancel_request(
     response_model=PaginationResponse[RequestDetailsResponse],
     status_code=status.HTTP_200_OK,
 )
-@cache(expire=600, key_builder=endpoint_key_builder)
+@cache(expire=6 * HOUR, key_builder=tagged_key_builder(CacheConfig.COMPANY))
 async def get_company_pending_requests(
     company_join_request_service: CompanyJoinRequestServiceDep,
     acting_user: GetUserJWTDep,
@@ -340,7 +344,7 @@ async def get_company_pending_requests(
     response_model=PaginationResponse[RequestDetailsResponse],
     status_code=status.HTTP_200_OK,
 )
-@cache(expire=60, key_builder=endpoint_key_builder)
+@cache(expire=6 * HOUR, key_builder=tagged_key_builder(CacheConfig.USER))
 async def get_my_pending_requests(
     company_join_request_service: CompanyJoinRequestServiceDep,
     user: GetUserJWTDep,
@@ -360,7 +364,7 @@ async def get_my_pending_requests(
     response_model=PaginationResponse[CompanyMemberDetailsResponse],
     status_code=status.HTTP_200_OK,
 )
-@cache(expire=300, key_builder=endpoint_key_builder)
+@cache(expire=6 * HOUR, key_builder=tagged_key_builder(CacheConfig.COMPANY))
 async def get_company_members(
     member_service: CompanyMemberServiceDep,
     pagination: PaginationParamDep,
@@ -423,7 +427,12 @@ async def update_member_role(
     response_model=UserAverageCompanyStatsResponseSchema,
     status_code=status.HTTP_200_OK,
 )
-@cache(expire=3600, key_builder=endpoint_key_builder)
+@cache(
+    expire=6 * HOUR,
+    key_builder=tagged_key_builder(
+        CacheConfig.COMPANY, (CacheConfig.USER, "target_user_id")
+    ),
+)
 async def get_user_average_score_in_company(
     attempt_service: AttemptServiceDep,
     user: GetUserJWTDep,
@@ -6,6 +6,8 @@ from uuid import UUID, uuid4
 from sqlalchemy import or_, select
 from sqlalchemy.orm import InstrumentedAttribute
 
+from src.core.caching.config import CacheConfig
+from src.core.caching.decorators import cache_not_found
 from src.core.exceptions import (
     CompanyPermissionException,
     InstanceNotFoundException,
@@ -18,8 +20,9 @@ from src.core.exceptions import (
 from src.core.logger import logger
 from src.core.schemas import PaginationResponse
 from src.core.service import BaseService
+from src.quiz.leaderboard import Leaderboard
 
-from .enums import CompanyRole, MessageStatus
+from .enums import CompanyAudience, CompanyRole, MessageStatus
 from .models import (
     Company as CompanyModel,
 )
@@ -242,8 +245,9 @@ class MemberService(BaseService[MemberRepository, CompanyMemberModel]):
     def display_name(self) -> str:
         return "CompanyMember"
 
-    def __init__(self, member_repo: MemberRepository) -> None:
+    def __init__(self, member_repo: MemberRepository, leaderboard: Leaderboard) -> None:
         super().__init__(repo=member_repo)
+        self.leaderboard = leaderboard
 
     async def get_members_paginated(
         self,
@@ -290,6 +294,9 @@ class MemberService(BaseService[MemberRepository, CompanyMemberModel]):
 
         await self._delete_instance(target_member)
         await self.repo.commit()
+        await self._remove_from_leaderboards(
+            company_id=company_id, user_id=target_user_id
+        )
 
     async def leave_company(self, company_id: UUID, user_id: UUID) -> None:
         """
@@ -306,6 +313,12 @@ class MemberService(BaseService[MemberRepository, CompanyMemberModel]):
 
         await self._delete_instance(member)
         await self.repo.commit()
+        await self._remove_from_leaderboards(company_id=company_id, user_id=user_id)
+
+    async def _remove_from_leaderboards(self, company_id: UUID, user_id: UUID) -> None:
+        """Former members leave the company board and the boards of its quizzes."""
+        quiz_ids = await self.repo.get_company_quiz_ids(company_id=company_id)
+        await self.leaderboard.remove_members(company_id, quiz_ids, user_id)
 
     async def get_user_company_ids(self, user_id: UUID) -> Sequence[UUID]:
         user_company_ids = await self.repo.get_user_company_ids(user_id=user_id)
@@ -396,6 +409,19 @@ class MemberService(BaseService[MemberRepository, CompanyMemberModel]):
             company_id=company_id, user_id=user_id, required_role=CompanyRole.ADMIN
         )
 
+    async def get_audience(
+        self, company_id: UUID, user_id: UUID | None
+    ) -> CompanyAudience:
+        """
+        :param company_id:
+        :param user_id:
+        :return: Audience of the user, resolved with a single role lookup.
+        """
+        if user_id is None:
+            return CompanyAudience.ANONYMOUS
+        role = await self.repo.get_company_role(company_id=company_id, user_id=user_id)
+        return CompanyAudience.from_role(role)
+
     async def has_owner_permission(
         self, company_id: UUID, user_id: UUID | None
     ) -> bool:
@@ -501,17 +527,6 @@ class MemberService(BaseService[MemberRepository, CompanyMemberModel]):
 
         return target_member
 
-    async def get_and_lock_member_row(
-        self, company_id: UUID, user_id: UUID
-    ) -> CompanyMemberModel | None:
-        member = await self.repo.get_and_lock_member_row(
-            company_id=company_id, user_id=user_id
-        )
-        if member is None:
-            raise UserIsNotACompanyMemberException()
-
-        return member
-
 
 class InvitationService(BaseService[InvitationRepository, CompanyInvitationModel]):
     @property
@@ -757,20 +772,17 @@ class CompanyService(BaseService[CompanyRepository, CompanyModel]):
             query, page, page_size, return_schema=CompanyDetailsResponseSchema
         )
 
+    @cache_not_found(config=CacheConfig.COMPANY)
     async def get_by_id(
-        self, company_id: UUID, user_id: UUID | None
+        self, company_id: UUID, audience: CompanyAudience
     ) -> CompanyDetailsResponseSchema:
         company = await self.get_company(company_id=company_id)
         if company.is_visible:
             return company
 
-        # Invisible company then check if user is a part of it
-        if not user_id:
+        # Invisible company is only seen by its members
+        if audience is CompanyAudience.ANONYMOUS:
             raise InstanceNotFoundException(instance_name=self.display_name)
-
-        await self.member_service.assert_user_in_company(
-            company_id=company_id, user_id=user_id
-        )
         return company
 
     async def create_company(
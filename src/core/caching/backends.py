@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+from contextvars import ContextVar
+
+from fastapi_cache.backends.redis import RedisBackend
+from redis.exceptions import RedisError
+
+from .metrics import Timer, cache_metrics
+from .operations import set_with_mappings
+
+# Filled by the key builder of the current request, consumed by the backend on set.
+_staged_mapping_keys: ContextVar[dict[str, list[str]] | None] = ContextVar(
+    "staged_mapping_keys", default=None
+)
+
+
+def stage_mapping_keys(key: str, mapping_keys: list[str]) -> None:
+    """Remembers which mappings the endpoint key belongs to until the response gets cached."""
+    staged = _staged_mapping_keys.get()
+    if staged is None:
+        staged = {}
+        _staged_mapping_keys.set(staged)
+    staged[key] = mapping_keys
+
+
+class InstrumentedRedisBackend(RedisBackend):
+    """RedisBackend that records the @cache routes hits, misses, latency and payload size."""
+
+    async def get_with_ttl(self, key: str) -> tuple[int, bytes | None]:
+        try:
+            with Timer() as timer:
+                ttl, value = await super().get_with_ttl(key)
+        except RedisError:
+            cache_metrics.record_error(key)
+            raise
+
+        if value is None:
+            cache_metrics.record_miss(key, latency_ms=timer.ms)
+        else:
+            cache_metrics.record_hit(key, latency_ms=timer.ms, payload=value)
+        return ttl, value
+
+    async def set(self, key: str, value: bytes, expire: int | None = None) -> None:
+        try:
+            with Timer() as timer:
+                await super().set(key, value, expire)
+        except RedisError:
+            cache_metrics.record_error(key)
+            raise
+        cache_metrics.record_set(key, latency_ms=timer.ms, payload=value)
+
+
+class TaggedRedisBackend(InstrumentedRedisBackend):
+    """
+    RedisBackend that adds cached endpoint keys to the Shadow Sets staged by the key builder.
+    Keys without staged mappings are stored as usual.
+    """
+
+    async def set(self, key: str, value: bytes, expire: int | None = None) -> None:
+        staged = _staged_mapping_keys.get()
+        mapping_keys = staged.pop(key, None) if staged else None
+
+        if not mapping_keys or expire is None:
+            await super().set(key, value, expire)
+            return
+
+        await set_with_mappings(
+            mapping_keys=mapping_keys, key=key, value=value, expire=expire
+        )
@@ -5,12 +5,28 @@ MINUTE = 60
 HOUR = 3600
 DAY = 86400
 
+# Negative entries are short-lived, generations and mappings clear them earlier on writes.
+NOT_FOUND_EXPIRE = MINUTE
+
+# Generation counters must outlive every cache entry keyed by them.
+GENERATION_EXPIRE = 30 * DAY
+
 
 class CacheConfig(Enum):  # TODO Pydantic settings.
-    """(prefix: str, expire: int) expire is in seconds."""
+    """(prefix: str, mapping_key_name: str, expire: int) expire is in seconds."""
 
     QUIZ = ("quiz", "quiz_id", DAY)
+    # Built from a published quiz, dropped when the quiz is deleted.
+    ANSWER_KEY = ("quiz:answer-key", "quiz_id", 7 * DAY)
+    # Company of a quiz never changes, dropped when the quiz is deleted.
+    QUIZ_COMPANY = ("quiz:company", "quiz_id", 7 * DAY)
+    # Dropped when an attempt of the quiz is finalized or the quiz is deleted.
+    QUESTION_STATS = ("quiz:question-stats", "quiz_id", 5 * MINUTE)
+    SCORE_DISTRIBUTION = ("quiz:score-distribution", "quiz_id", 5 * MINUTE)
     ATTEMPT = ("attempt", "attempt_id", 2 * DAY)
+    # Tags for endpoint caching.
+    COMPANY = ("company", "company_id", DAY)
+    USER = ("user", "user_id", DAY)
     # Correct as long as company and sys stats have different args
     USER_COMPANY_STATS = ("user:stats:company", "company_id", 5 * MINUTE)
     USER_SYSTEM_STATS = ("user:stats", "user_id", 5 * MINUTE)
@@ -27,5 +43,13 @@ class CacheConfig(Enum):  # TODO Pydantic settings.
     def expire(self) -> int:
         return self.value[2]
 
+    @property
+    def is_versioned(self) -> bool:
+        """Versioned configs embed a generation counter in the keys instead of using a Shadow Set."""
+        return self in (CacheConfig.QUIZ, CacheConfig.COMPANY, CacheConfig.USER)
+
     def get_mapping_key(self, _id: str | UUID) -> str:
         return f"mapping:{self.prefix}:{str(_id)}"
+
+    def get_generation_key(self, _id: str | UUID) -> str:
+        return f"gen:{self.prefix}:{str(_id)}"
@@ -3,10 +3,10 @@ from typing import Any, Callable, Type
 
 from pydantic import BaseModel as BaseSchema
 
-from ..exceptions import CacheKeyNotExistException
-from .config import CacheConfig
+from ..exceptions import CacheKeyNotExistException, InstanceNotFoundException
+from .config import NOT_FOUND_EXPIRE, CacheConfig
 from .keys import service_key_builder
-from .operations import get_schema_from_cache, set_with_mapping
+from .operations import get_not_found_detail, get_schema_from_cache, set_with_mappings
 from .serializers import serialize
 
 
@@ -18,6 +18,7 @@ def cache_with_mapping[S: BaseSchema](
 ) -> Callable[[Any], Any] | S:
     """
     Custom decorator that caches result and adds the key to a Shadow Set.
+    Versioned configs embed the mapping generation in the key instead (see CacheConfig.is_versioned).
     Services must be called with **kwargs parameters if possible. Example: quiz_service(user_id=user_id).
 
     mapping_key_name: The name of the kwarg to use as the ID.
@@ -38,7 +39,9 @@ def cache_with_mapping[S: BaseSchema](
             if not mapping_key:
                 raise CacheKeyNotExistException(mapping=mapping_id)
 
-            cache_key = service_key_builder(namespace=func.__name__, *args, **kwargs)
+            cache_key = await service_key_builder(
+                config, func.__name__, *args, **kwargs
+            )
 
             cached = await get_schema_from_cache(
                 key=cache_key, response_schema=response_schema
@@ -53,8 +56,9 @@ def cache_with_mapping[S: BaseSchema](
             if cache_condition and not cache_condition(result):
                 return result
 
-            await set_with_mapping(
-                mapping_key=mapping_key,
+            # The generation in the key replaces the Shadow Set of versioned configs
+            await set_with_mappings(
+                mapping_keys=[] if config.is_versioned else [mapping_key],
                 key=cache_key,
                 value=serialize(result),
                 expire=config.expire,
@@ -65,3 +69,47 @@ def cache_with_mapping[S: BaseSchema](
         return wrapper
 
     return decorator
+
+
+def cache_not_found(
+    *, config: CacheConfig, expire: int = NOT_FOUND_EXPIRE
+) -> Callable[[Any], Any]:
+    """
+    Negative caching. Stores the InstanceNotFoundException outcome for a short time and raises it again without a DB lookup.
+    Entry is tied to the config mapping like cache_with_mapping, so creating or publishing the instance clears it.
+    Services must be called with **kwargs parameters. The key includes every kwarg, e.g. is_admin.
+    Service must have display_name.
+    """
+
+    def decorator(func: Callable):
+        @functools.wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            mapping_id = str(kwargs.get(config.mapping_key_name))
+            cache_key = await service_key_builder(
+                config, f"{func.__name__}.not_found", *args, **kwargs
+            )
+
+            detail = await get_not_found_detail(key=cache_key)
+            if detail is not None:
+                exception = InstanceNotFoundException(instance_name=self.display_name)
+                exception.detail = detail
+                raise exception
+
+            try:
+                return await func(self, *args, **kwargs)
+            except InstanceNotFoundException as exception:
+                await set_with_mappings(
+                    mapping_keys=(
+                        []
+                        if config.is_versioned
+                        else [config.get_mapping_key(mapping_id)]
+                    ),
+                    key=cache_key,
+                    value=exception.detail,
+                    expire=expire,
+                )
+                raise
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+from contextvars import ContextVar
+
+from fastapi_cache import FastAPICache
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from .config import GENERATION_EXPIRE
+from .metrics import Timer, cache_metrics
+
+# Generations already read by the current request. None outside a request scope, so nothing is memoized there.
+_generation_memo: ContextVar[dict[str, int] | None] = ContextVar(
+    "generation_memo", default=None
+)
+
+
+async def get_generations(*generation_keys: str) -> list[int]:
+    """
+    Returns the current generation of every key, a missing key is generation 0.
+    Keys unknown to the request memo are fetched with a single MGET.
+    """
+    memo = _generation_memo.get()
+    if memo is None:
+        memo = {}
+
+    missing = [key for key in dict.fromkeys(generation_keys) if key not in memo]
+    if missing:
+        redis = FastAPICache.get_backend().redis
+        values = await redis.mget(missing)
+        memo.update(
+            (key, int(value) if value is not None else 0)
+            for key, value in zip(missing, values)
+        )
+
+    return [memo[key] for key in generation_keys]
+
+
+async def bump_generations(*generation_keys: str) -> None:
+    """
+    Invalidates everything cached under the generations with one INCR per key.
+    Old entries are never read again and age out via their TTL.
+    """
+    if not generation_keys:
+        return
+
+    memo = _generation_memo.get()
+    redis = FastAPICache.get_backend().redis
+
+    with Timer() as timer:
+        async with redis.pipeline(transaction=False) as pipe:
+            for key in generation_keys:
+                pipe.incr(key)
+                # Must outlive every entry keyed by it, or a reset counter would resurrect old entries.
+                pipe.expire(key, GENERATION_EXPIRE)
+                if memo is not None:
+                    memo.pop(key, None)
+            await pipe.execute()
+
+    for key in generation_keys:
+        cache_metrics.record_invalidation(key, latency_ms=timer.ms)
+
+
+class GenerationMemoMiddleware:
+    """Gives every request its own generation memo, so generations are fetched once per request."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = _generation_memo.set({})
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _generation_memo.reset(token)
@@ -1,41 +1,75 @@
 from __future__ import annotations
 
+from typing import Any, Awaitable, Callable, Sequence
+from uuid import UUID
+
 from fastapi import Request, Response
 from fastapi_cache import FastAPICache
 
 from src.auth.models import User as UserModel
 
 from ..dependencies import PaginationParams
+from .backends import stage_mapping_keys
+from .config import CacheConfig
+from .generations import get_generations
+
+type CacheTag = CacheConfig | tuple[CacheConfig, str]
+
+# Endpoint kwarg with the audience class of the viewer. Example: CompanyAudienceDep.
+AUDIENCE_PARAM = "audience"
 
 
-def service_key_builder(namespace: str, *args, **kwargs) -> str:
-    """Services must be called with **kwargs parameters if possible. Example: quiz_service(user_id=user_id)"""
+async def service_key_builder(
+    config: CacheConfig, namespace: str, /, *args, **kwargs
+) -> str:
+    """
+    Services must be called with **kwargs parameters if possible. Example: quiz_service(user_id=user_id)
+    Versioned configs embed the generation of the mapping id, so bumping it invalidates the key.
+    """
     prefix = FastAPICache.get_prefix()
 
     args_part = [str(arg) for arg in args]
     kwargs_part = [f"{k}:{v}" for k, v in sorted(kwargs.items())]
     key_parts = args_part + kwargs_part
 
-    cache_key = f"{prefix}:{namespace}:{':'.join(key_parts)}"
+    generation_keys = []
+    if config.is_versioned:
+        generation_keys.append(
+            config.get_generation_key(kwargs.get(config.mapping_key_name))
+        )
+    generation_info = await _get_generation_info(generation_keys)
+
+    cache_key = f"{prefix}:{namespace}:{generation_info}:{':'.join(key_parts)}"
     return cache_key
 
 
-def endpoint_key_builder(
+async def endpoint_key_builder(
     func,
     namespace: str = "",
+    *,
     request: Request = None,
     response: Response = None,
-    *args,
-    **kwargs,
+    args: tuple[Any, ...] = (),
+    kwargs: dict[str, Any] | None = None,
+    generation_keys: Sequence[str] = (),
+    per_audience: bool = False,
 ) -> str:
     """
     Builds a specific key for caching Endpoints.
     Can extract user and pagination params for caching the endpoint.
+    fastapi-cache passes the endpoint arguments inside the args and kwargs parameters.
+    generation_keys: generations embedded in the key, bumping any of them invalidates the key.
+    per_audience: key on the audience kwarg instead of the user, one entry is shared by the whole audience.
     """
     prefix = FastAPICache.get_prefix()
+    kwargs = kwargs or {}
 
-    user = kwargs.get("user") or kwargs.get("acting_user")
-    user_info = f"{str(user.id)}" if isinstance(user, UserModel) else "no-user"
+    audience = kwargs.get(AUDIENCE_PARAM)
+    if per_audience and audience is not None:
+        user_info = f"audience={audience.value}"
+    else:
+        user = _get_user(kwargs)
+        user_info = f"{str(user.id)}" if user else "no-user"
 
     pagination: PaginationParams = kwargs.get("pagination")
 
@@ -51,4 +85,80 @@ def endpoint_key_builder(
         f"{k}={v}" for k, v in query_params if k not in pagination_fields
     )
 
-    return f"{prefix}:{namespace}:{user_info}:{request.url.path}:{pagination_info}:{query_params_str}"
+    generation_info = await _get_generation_info(generation_keys)
+
+    return f"{prefix}:{func.__name__}:{generation_info}:{user_info}:{request.url.path}:{pagination_info}:{query_params_str}"
+
+
+def tagged_key_builder(
+    *tags: CacheTag, per_audience: bool = False
+) -> Callable[..., Awaitable[str]]:
+    """
+    Key builder for the @cache routes that ties each entry to the tags.
+    Tag is a CacheConfig, the id is taken from the endpoint kwarg with the config mapping_key_name.
+    To take the id from another kwarg pass a tuple. Example: (CacheConfig.USER, "target_user_id").
+    "user_id" falls back to the authenticated user.
+    Versioned tags embed their generation in the key, others register the entry under the tag mapping.
+    per_audience: opt-in for routes whose response only differs by the audience, not by the user.
+    """
+
+    async def key_builder(
+        func,
+        namespace: str = "",
+        *,
+        request: Request = None,
+        response: Response = None,
+        args: tuple[Any, ...] = (),
+        kwargs: dict[str, Any] | None = None,
+    ) -> str:
+        kwargs = kwargs or {}
+
+        generation_keys = []
+        mapping_keys = []
+        for tag in tags:
+            config, param_name = tag if isinstance(tag, tuple) else (tag, None)
+            mapping_id = _get_mapping_id(
+                kwargs, param_name=param_name or config.mapping_key_name
+            )
+            if mapping_id is None:
+                continue
+            if config.is_versioned:
+                generation_keys.append(config.get_generation_key(mapping_id))
+            else:
+                mapping_keys.append(config.get_mapping_key(mapping_id))
+
+        cache_key = await endpoint_key_builder(
+            func,
+            namespace,
+            request=request,
+            response=response,
+            args=args,
+            kwargs=kwargs,
+            generation_keys=generation_keys,
+            per_audience=per_audience,
+        )
+
+        stage_mapping_keys(key=cache_key, mapping_keys=mapping_keys)
+        return cache_key
+
+    return key_builder
+
+
+async def _get_generation_info(generation_keys: Sequence[str]) -> str:
+    if not generation_keys:
+        return "no-gen"
+    generations = await get_generations(*generation_keys)
+    return "g" + ".".join(str(generation) for generation in generations)
+
+
+def _get_user(endpoint_kwargs: dict[str, Any]) -> UserModel | None:
+    user = endpoint_kwargs.get("user") or endpoint_kwargs.get("acting_user")
+    return user if isinstance(user, UserModel) else None
+
+
+def _get_mapping_id(endpoint_kwargs: dict[str, Any], param_name: str) -> UUID | None:
+    mapping_id = endpoint_kwargs.get(param_name)
+    if mapping_id is None and param_name == CacheConfig.USER.mapping_key_name:
+        user = _get_user(endpoint_kwargs)
+        mapping_id = user.id if user else None
+    return mapping_id
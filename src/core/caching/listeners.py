@@ -1,50 +1,132 @@
 import asyncio
+from typing import Any, Iterable
 from uuid import UUID
 
 from sqlalchemy import event
 from sqlalchemy.orm import Session
 
-from src.quiz.models import CompanyQuiz, QuizAttempt
+from src.auth.models import User
+from src.company.models import Company, Invitation, JoinRequest, Member
+from src.quiz.models import CompanyQuiz, QuizAttempt, QuizQuestionLink
 
 from .config import CacheConfig
-from .operations import invalidate_mapping
+from .generations import bump_generations
+from .operations import invalidate_mappings
 
+INVALIDATION_KEY = "mappings_to_invalidate"
+INVALIDATION_TASKS_KEY = "invalidation_tasks"
 
-def add_to_session(session: Session, key: str, _ids: set[UUID]):
-    if _ids:
-        if key not in session.info:
-            session.info[key] = set()
-        session.info[key].update(_ids)
+# Holds references, so the scheduled invalidations won't be garbage collected mid-way.
+_background_tasks: set[asyncio.Task] = set()
+
+
+def add_to_session(
+    session: Session, mappings: Iterable[tuple[CacheConfig, UUID]]
+) -> None:
+    mappings = {(config, _id) for config, _id in mappings if _id is not None}
+    if mappings:
+        if INVALIDATION_KEY not in session.info:
+            session.info[INVALIDATION_KEY] = set()
+        session.info[INVALIDATION_KEY].update(mappings)
+
+
+def mark_for_invalidation(session: Any, config: CacheConfig, *_ids: UUID) -> None:
+    """
+    For bulk statements that bypass the unit of work (update(), delete()).
+    Accepts both Session and AsyncSession, mappings are invalidated after the commit.
+    """
+    add_to_session(session, ((config, _id) for _id in _ids))
+
+
+def get_mapping_ids(obj: Any) -> list[tuple[CacheConfig, UUID]]:
+    """Returns the mappings that the changed object invalidates."""
+    if isinstance(obj, CompanyQuiz):
+        return [(CacheConfig.QUIZ, obj.id), (CacheConfig.COMPANY, obj.company_id)]
+    if isinstance(obj, QuizQuestionLink):
+        return [(CacheConfig.QUIZ, obj.quiz_id)]
+    if isinstance(obj, QuizAttempt):
+        return [(CacheConfig.ATTEMPT, obj.id), (CacheConfig.USER, obj.user_id)]
+    if isinstance(obj, Company):
+        return [(CacheConfig.COMPANY, obj.id)]
+    if isinstance(obj, Member):
+        return [(CacheConfig.COMPANY, obj.company_id), (CacheConfig.USER, obj.user_id)]
+    if isinstance(obj, Invitation):
+        return [
+            (CacheConfig.COMPANY, obj.company_id),
+            (CacheConfig.USER, obj.invited_user_id),
+        ]
+    if isinstance(obj, JoinRequest):
+        return [
+            (CacheConfig.COMPANY, obj.company_id),
+            (CacheConfig.USER, obj.requesting_user_id),
+        ]
+    if isinstance(obj, User):
+        return [(CacheConfig.USER, obj.id)]
+    return []
+
+
+def get_deleted_mapping_ids(obj: Any) -> list[tuple[CacheConfig, UUID]]:
+    """Mappings that only a deletion invalidates, e.g. artifacts of immutable published quizzes."""
+    if isinstance(obj, CompanyQuiz):
+        return [
+            (CacheConfig.ANSWER_KEY, obj.id),
+            (CacheConfig.QUIZ_COMPANY, obj.id),
+            (CacheConfig.QUESTION_STATS, obj.id),
+            (CacheConfig.SCORE_DISTRIBUTION, obj.id),
+        ]
+    return []
 
 
 @event.listens_for(Session, "after_flush")
 def capture_ids_for_invalidation(session, flush_context):
     changed_objects = session.dirty | session.new | session.deleted
 
-    quiz_ids = set()
-    attempt_ids = set()
-
     for obj in changed_objects:
-        if isinstance(obj, CompanyQuiz):
-            quiz_ids.add(obj.id)
-        elif isinstance(obj, QuizAttempt):
-            attempt_ids.add(obj.id)
+        add_to_session(session, get_mapping_ids(obj))
 
-    add_to_session(session, "quiz_ids_to_invalidate", quiz_ids)
-    add_to_session(session, "attempt_ids_to_invalidate", attempt_ids)
+    for obj in session.deleted:
+        add_to_session(session, get_deleted_mapping_ids(obj))
 
 
 @event.listens_for(Session, "after_commit")
 def trigger_invalidation_after_commit(session):
-    quiz_ids = session.info.pop("quiz_ids_to_invalidate", set())
-    attempt_ids = session.info.pop("attempt_ids_to_invalidate", set())
+    mappings = session.info.pop(INVALIDATION_KEY, set())
+    if not mappings:
+        return
 
     loop = asyncio.get_event_loop()
     if not loop.is_running():
         return
 
-    for _id in quiz_ids:
-        loop.create_task(invalidate_mapping(CacheConfig.QUIZ.get_mapping_key(_id)))
+    task = loop.create_task(invalidate(mappings))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+    # Per session, so waiting for them doesn't wait for the invalidations of other requests
+    session_tasks = session.info.setdefault(INVALIDATION_TASKS_KEY, set())
+    session_tasks.add(task)
+    task.add_done_callback(session_tasks.discard)
+
+
+async def wait_for_invalidations(session: Any) -> None:
+    """
+    Waits for the invalidations scheduled by the commits of the session, e.g. before warming entries keyed by generations.
+    Accepts both Session and AsyncSession.
+    """
+    tasks = session.info.get(INVALIDATION_TASKS_KEY)
+    if tasks:
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def invalidate(mappings: Iterable[tuple[CacheConfig, UUID]]) -> None:
+    """Versioned configs are invalidated with an INCR of the generation, the others drop their Shadow Set."""
+    generation_keys = []
+    mapping_keys = []
+    for config, _id in mappings:
+        if config.is_versioned:
+            generation_keys.append(config.get_generation_key(_id))
+        else:
+            mapping_keys.append(config.get_mapping_key(_id))
 
-    for _id in attempt_ids:
-        loop.create_task(invalidate_mapping(CacheConfig.ATTEMPT.get_mapping_key(_id)))
+    await bump_generations(*generation_keys)
+    await invalidate_mappings(*mapping_keys)
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Any
+
+from ..logger import logger
+
+# Upper bounds of the histogram buckets, the last bucket is unbounded.
+LATENCY_BUCKETS_MS = (0.5, 1, 2.5, 5, 10, 25, 50, 100, 250)
+PAYLOAD_BUCKETS_BYTES = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+
+class Histogram:
+    def __init__(self, buckets: tuple[float, ...]) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def snapshot(self) -> dict[str, Any]:
+        labels = [f"le_{bound}" for bound in self.buckets] + ["inf"]
+        return {
+            "count": self.count,
+            "avg": round(self.total / self.count, 3) if self.count else 0,
+            "max": round(self.max, 3),
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
+class NamespaceMetrics:
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0  # Entries found, but not decodable into the response schema
+        self.sets = 0
+        self.invalidations = 0
+        self.errors = 0
+        self.avoided_lookups = 0  # Negative entries served instead of the DB lookup
+        self.latency_ms = Histogram(LATENCY_BUCKETS_MS)
+        self.payload_bytes = Histogram(PAYLOAD_BUCKETS_BYTES)
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses + self.stale
+        return round(self.hits / lookups, 3) if lookups else 0.0
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "sets": self.sets,
+            "invalidations": self.invalidations,
+            "errors": self.errors,
+            "avoided_lookups": self.avoided_lookups,
+            "hit_ratio": self.hit_ratio,
+            "latency_ms": self.latency_ms.snapshot(),
+            "payload_bytes": self.payload_bytes.snapshot(),
+        }
+
+
+class CacheMetrics:
+    """
+    In-process cache counters per namespace.
+    Namespace is the cached function name for cached entries and the config prefix for mappings and generations.
+    """
+
+    def __init__(self) -> None:
+        self.namespaces: defaultdict[str, NamespaceMetrics] = defaultdict(
+            NamespaceMetrics
+        )
+        self.started_at = time.time()
+
+    def record_hit(self, key: str, latency_ms: float, payload: str | bytes) -> None:
+        metrics = self.namespaces[get_namespace(key)]
+        metrics.hits += 1
+        metrics.latency_ms.observe(latency_ms)
+        metrics.payload_bytes.observe(len(payload))
+
+    def record_miss(self, key: str, latency_ms: float) -> None:
+        metrics = self.namespaces[get_namespace(key)]
+        metrics.misses += 1
+        metrics.latency_ms.observe(latency_ms)
+
+    def record_stale(self, key: str) -> None:
+        self.namespaces[get_namespace(key)].stale += 1
+
+    def record_set(self, key: str, latency_ms: float, payload: str | bytes) -> None:
+        metrics = self.namespaces[get_namespace(key)]
+        metrics.sets += 1
+        metrics.latency_ms.observe(latency_ms)
+        metrics.payload_bytes.observe(len(payload))
+
+    def record_invalidation(self, key: str, latency_ms: float | None = None) -> None:
+        metrics = self.namespaces[get_namespace(key)]
+        metrics.invalidations += 1
+        if latency_ms is not None:
+            metrics.latency_ms.observe(latency_ms)
+
+    def record_avoided_lookup(self, key: str) -> None:
+        self.namespaces[get_namespace(key)].avoided_lookups += 1
+
+    def record_error(self, key: str) -> None:
+        self.namespaces[get_namespace(key)].errors += 1
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "uptime_seconds": round(time.time() - self.started_at),
+            "namespaces": {
+                namespace: metrics.snapshot()
+                for namespace, metrics in sorted(self.namespaces.items())
+            },
+        }
+
+    def summary(self) -> str:
+        """One line per namespace, for the periodic log."""
+        return "\n".join(
+            f"{namespace}: hits={m.hits} misses={m.misses} stale={m.stale} "
+            f"hit_ratio={m.hit_ratio} invalidations={m.invalidations} errors={m.errors} "
+            f"avoided_lookups={m.avoided_lookups} "
+            f"avg_latency_ms={m.latency_ms.snapshot()['avg']} avg_bytes={m.payload_bytes.snapshot()['avg']}"
+            for namespace, m in sorted(self.namespaces.items())
+        )
+
+    def reset(self) -> None:
+        self.namespaces.clear()
+        self.started_at = time.time()
+
+
+def get_namespace(key: str) -> str:
+    """
+    Example: "api-cache:get_quiz:..." -> "get_quiz", "mapping:quiz:<id>" -> "mapping:quiz".
+    """
+    prefix, _, rest = key.partition(":")
+    if prefix in ("mapping", "gen"):
+        return key.rpartition(":")[0]
+    return rest.partition(":")[0] or prefix
+
+
+class Timer:
+    """Measures the Redis round trip. Example: with Timer() as timer: ... timer.ms"""
+
+    def __init__(self) -> None:
+        self.ms = 0.0
+        self._start = 0.0
+
+    def __enter__(self) -> Timer:
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.ms = (time.perf_counter() - self._start) * 1000
+
+
+cache_metrics = CacheMetrics()
+
+
+async def log_cache_metrics() -> None:
+    """Periodic summary, see settings.APP.CACHE_METRICS_LOG_INTERVAL_SECONDS."""
+    summary = cache_metrics.summary()
+    if summary:
+        logger.info(f"Cache metrics:\n{summary}")
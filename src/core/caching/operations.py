@@ -1,22 +1,44 @@
 from __future__ import annotations
 
-from typing import Type
+from typing import Sequence, Type
 from uuid import UUID
 
 from fastapi_cache import FastAPICache
 from pydantic import BaseModel as BaseSchema
+from redis.exceptions import RedisError
 
+from .metrics import Timer, cache_metrics
 from .serializers import deserialize
 
 
 async def set_with_mapping(mapping_key: str, key: str, value: str, expire: int):
+    await set_with_mappings(
+        mapping_keys=[mapping_key], key=key, value=value, expire=expire
+    )
+
+
+async def set_with_mappings(
+    mapping_keys: Sequence[str], key: str, value: str | bytes, expire: int
+):
+    """
+    Sets the key and adds it to every Shadow Set in mapping_keys.
+    Mapping TTL only grows, so a shorter-lived entry can't orphan a longer-lived one.
+    """
     redis = FastAPICache.get_backend().redis
 
-    async with redis.pipeline(transaction=True) as pipe:
-        pipe.set(key, value, ex=expire)
-        pipe.sadd(mapping_key, key)
-        pipe.expire(mapping_key, expire)
-        await pipe.execute()
+    try:
+        with Timer() as timer:
+            async with redis.pipeline(transaction=True) as pipe:
+                pipe.set(key, value, ex=expire)
+                for mapping_key in mapping_keys:
+                    pipe.sadd(mapping_key, key)
+                    pipe.expire(mapping_key, expire, nx=True)
+                    pipe.expire(mapping_key, expire, gt=True)
+                await pipe.execute()
+    except RedisError:
+        cache_metrics.record_error(key)
+        raise
+    cache_metrics.record_set(key, latency_ms=timer.ms, payload=value)
 
 
 async def invalidate_mapping(mapping_key: str | UUID):
@@ -24,18 +46,76 @@ async def invalidate_mapping(mapping_key: str | UUID):
     Accepts the id of the mapping to invalidate.
     Example: cache_with_mapping is called with the mapping_key_name parameter, to invalidate the mapping pass this key value.
     """
+    await invalidate_mappings(str(mapping_key))
+
+
+async def invalidate_mappings(*mapping_keys: str):
+    """Invalidates many mappings with one SMEMBERS round trip and one DELETE."""
+    if not mapping_keys:
+        return
+
     redis = FastAPICache.get_backend().redis
 
-    keys = await redis.smembers(mapping_key)
-    if keys:
-        await redis.delete(*keys, mapping_key)
+    try:
+        with Timer() as timer:
+            async with redis.pipeline(transaction=False) as pipe:
+                for mapping_key in mapping_keys:
+                    pipe.smembers(mapping_key)
+                members = await pipe.execute()
+
+            keys = set().union(*members)
+            await redis.delete(*keys, *mapping_keys)
+    except RedisError:
+        for mapping_key in mapping_keys:
+            cache_metrics.record_error(mapping_key)
+        raise
+
+    for mapping_key in mapping_keys:
+        cache_metrics.record_invalidation(mapping_key, latency_ms=timer.ms)
 
 
 async def get_schema_from_cache[S: BaseSchema](
     key: str, response_schema: Type[S] | None
 ) -> S | None:
+    """Entries that no longer match the schema are counted as stale and treated as a miss."""
     redis = FastAPICache.get_backend().redis
-    obj = await redis.get(key)
+
+    try:
+        with Timer() as timer:
+            obj = await redis.get(key)
+    except RedisError:
+        cache_metrics.record_error(key)
+        raise
+
     if not obj:
+        cache_metrics.record_miss(key, latency_ms=timer.ms)
         return None
-    return deserialize(obj=obj, response_schema=response_schema)
+
+    try:
+        schema = deserialize(obj=obj, response_schema=response_schema)
+    except ValueError:  # Includes JSON decode errors and pydantic ValidationError
+        cache_metrics.record_stale(key)
+        return None
+
+    cache_metrics.record_hit(key, latency_ms=timer.ms, payload=obj)
+    return schema
+
+
+async def get_not_found_detail(key: str) -> str | None:
+    """Returns the detail of a cached not found outcome, every hit is a DB lookup avoided."""
+    redis = FastAPICache.get_backend().redis
+
+    try:
+        with Timer() as timer:
+            detail = await redis.get(key)
+    except RedisError:
+        cache_metrics.record_error(key)
+        raise
+
+    if detail is None:
+        cache_metrics.record_miss(key, latency_ms=timer.ms)
+        return None
+
+    cache_metrics.record_hit(key, latency_ms=timer.ms, payload=detail)
+    cache_metrics.record_avoided_lookup(key)
+    return detail
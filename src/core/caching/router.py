@@ -0,0 +1,13 @@
+from fastapi import APIRouter, status
+
+from src.auth.dependencies import GetUserJWTDep
+
+from .metrics import cache_metrics
+
+cache_router = APIRouter(prefix="/cache", tags=["Cache"])
+
+
+@cache_router.get("/metrics", status_code=status.HTTP_200_OK)
+async def get_cache_metrics(user: GetUserJWTDep):
+    """Per namespace cache counters of this worker since its start."""
+    return cache_metrics.snapshot()
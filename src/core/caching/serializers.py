@@ -22,4 +22,4 @@ def deserialize[S: BaseSchema](obj: str, response_schema: Type[S] | None) -> S |
         return data
 
     # Use TypeAdapter to handle both single models and lists of models automatically
-    return TypeAdapter(S | list[S]).validate_python(data)
+    return TypeAdapter(response_schema | list[response_schema]).validate_python(data)
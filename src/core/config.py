@@ -28,6 +28,20 @@ class AppSettings(SharedConfig):
     # Limits
     MAX_PAGE_SIZE: int = 100
 
+    # Cache metrics summary is logged every interval, 0 disables it
+    CACHE_METRICS_LOG_INTERVAL_SECONDS: int = 300
+    # GET /cache/metrics exposes the per worker cache counters, mounted only when enabled
+    CACHE_METRICS_ROUTE_ENABLED: bool = False
+
+    # In progress answers are buffered in Redis and written to Postgres on submit, expiry and checkpoints
+    ANSWER_BUFFER_ENABLED: bool = False
+    ANSWER_BUFFER_CHECKPOINT_SECONDS: int = 60
+
+    # Timed attempts are expired from a Redis delayed queue, polled every interval, 0 disables the queue
+    ATTEMPT_EXPIRY_QUEUE_POLL_SECONDS: float = 1
+    # Fallback for attempts missing from the queue, 0 disables the sweeper
+    ATTEMPT_SWEEP_INTERVAL_SECONDS: int = 600
+
 
 class DBSettings(SharedConfig):
     # PostgresSQL
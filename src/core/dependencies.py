@@ -30,6 +30,22 @@ class PaginationParams:
 PaginationParamDep = Annotated[PaginationParams, Depends()]
 
 
+@dataclass
+class KeysetPaginationParams:
+    cursor: str | None = Query(
+        default=None, description="next_cursor of the previous page, None is the first"
+    )
+    page_size: int = Query(
+        default=10,
+        ge=1,
+        le=settings.APP.MAX_PAGE_SIZE,
+        description="Number of items per page",
+    )
+
+
+KeysetPaginationParamDep = Annotated[KeysetPaginationParams, Depends()]
+
+
 async def get_db_session() -> AsyncGenerator[AsyncSession, None]:
     """Exception is handled inside the postgres_module.sessionmanager.session()"""
     async with db_session_manager.session() as session:
@@ -121,6 +121,29 @@ class PermissionDeniedException(HTTPException):
         )
 
 
+class InvalidAnswerException(HTTPException):
+    def __init__(self, message: str):
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid answer: {message}"
+        )
+
+
+class InvalidImportException(HTTPException):
+    def __init__(self, line_number: int, message: str):
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid import: line {line_number}, {message}",
+        )
+
+
+class InvalidCursorException(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor: pass the next_cursor of the previous page",
+        )
+
+
 class ResourceConflictException(HTTPException):
     def __init__(self, message: str):
         super().__init__(
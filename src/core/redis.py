@@ -1,3 +1,4 @@
+import contextlib
 from typing import Any, AsyncGenerator
 
 from redis.asyncio import ConnectionPool, Redis
@@ -19,6 +20,7 @@ class RedisManager:
             await self.pool.disconnect()
             self.pool = None
 
+    @contextlib.asynccontextmanager
     async def session(self) -> AsyncGenerator[Redis, None]:
         if self.pool is None:
             raise SessionNotInitializedException(session_name="REDIS")
@@ -8,6 +8,7 @@ from sqlalchemy.orm import InstrumentedAttribute, selectinload
 from sqlalchemy.sql import Delete, Select, Update
 from sqlalchemy.sql.base import ExecutableOption
 
+from .caching.listeners import wait_for_invalidations
 from .exceptions import RecordAlreadyExistsException
 from .models import Base as BaseModel
 from .schemas import PaginationResponse
@@ -91,6 +92,13 @@ class BaseRepository[M: BaseModel]:
         except IntegrityError:
             raise RecordAlreadyExistsException()
 
+    async def rollback(self) -> None:
+        await self.db.rollback()
+
+    async def wait_for_invalidations(self) -> None:
+        """Waits for the cache invalidations scheduled by the commits of this session."""
+        await wait_for_invalidations(self.db)
+
     async def get_instance_by_field_or_none(
         self,
         field: InstrumentedAttribute,
@@ -27,6 +27,15 @@ class PaginationResponse[T](Base):
     data: Sequence[T]
 
 
+class KeysetPaginationResponse[T](Base):
+    """Page after a cursor, no total is counted. next_cursor is None on the last page."""
+
+    page_size: int
+    has_next: bool
+    next_cursor: str | None
+    data: Sequence[T]
+
+
 class ScoreStatsBase(Base):
     score: float
     total_correct_answers: int
@@ -0,0 +1,38 @@
+import asyncio
+from typing import Awaitable, Callable
+
+from .logger import logger
+
+
+class PeriodicTask:
+    """Runs the coroutine function every interval seconds until stopped. Started and stopped in the lifespan."""
+
+    def __init__(
+        self, name: str, interval: float, func: Callable[[], Awaitable[None]]
+    ) -> None:
+        self.name = name
+        self.interval = interval
+        self.func = func
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name=self.name)
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.func()
+            except Exception:
+                # A failed run must not stop the next ones
+                logger.exception(f"Periodic task {self.name} failed")
@@ -1,7 +1,12 @@
+import base64
+import binascii
+import json
 from typing import Any, Sequence, Type
 
 from pydantic import BaseModel as BaseSchema
 
+from .exceptions import InvalidCursorException
+
 
 def sanitize[U: BaseSchema, A: BaseSchema](
     data: Any,
@@ -18,3 +23,24 @@ def sanitize[U: BaseSchema, A: BaseSchema](
     if isinstance(data, Sequence):
         return [schema.model_validate(item) for item in data]
     return schema.model_validate(data)
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Opaque keyset cursor of the last row of a page. Values are stored as strings."""
+    data = json.dumps([str(value) for value in values]).encode()
+    return base64.urlsafe_b64encode(data).decode()
+
+
+def decode_cursor(cursor: str, size: int) -> list[str]:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, UnicodeError, ValueError):
+        raise InvalidCursorException()
+
+    if (
+        not isinstance(values, list)
+        or len(values) != size
+        or not all(isinstance(value, str) for value in values)
+    ):
+        raise InvalidCursorException()
+    return values
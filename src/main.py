@@ -5,18 +5,29 @@ import uvicorn
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi_cache import FastAPICache
-from fastapi_cache.backends.redis import RedisBackend
 from fastapi_limiter import FastAPILimiter
 from redis.asyncio import Redis as AsyncRedis
 
 from src.auth.router import auth_router, users_router
 from src.company.router import companies_router, invitations_router, requests_router
+from src.core.caching import listeners  # noqa: F401 Registers the invalidation events
+from src.core.caching.backends import TaggedRedisBackend
+from src.core.caching.generations import GenerationMemoMiddleware
+from src.core.caching.metrics import log_cache_metrics
+from src.core.caching.router import cache_router
 from src.core.config import settings
 from src.core.database import db_session_manager
 from src.core.http_client import http_client_manager
 from src.core.logger import logger
 from src.core.redis import redis_manager
+from src.core.tasks import PeriodicTask
 from src.quiz.router import attempt_router, quiz_router
+from src.quiz.tasks import (
+    checkpoint_answer_buffers,
+    expire_attempts,
+    process_expiry_queue,
+    rebuild_expiry_queue_on_startup,
+)
 
 
 # From guide https://medium.com/@tclaitken/setting-up-a-fastapi-app-with-async-sqlalchemy-2-0-pydantic-v2-e6c540be4308
@@ -38,7 +49,7 @@ async def lifespan(app: FastAPI):
     redis_client = AsyncRedis(
         connection_pool=redis_manager.pool, encoding="utf8", decode_responses=True
     )
-    FastAPICache.init(RedisBackend(redis_client), prefix="api-cache")
+    FastAPICache.init(TaggedRedisBackend(redis_client), prefix="api-cache")
     await FastAPILimiter.init(redis_client, prefix="limiter")
 
     http_client_manager.start(
@@ -46,10 +57,52 @@ async def lifespan(app: FastAPI):
         limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
     )
 
+    cache_metrics_task = PeriodicTask(
+        name="cache-metrics-log",
+        interval=settings.APP.CACHE_METRICS_LOG_INTERVAL_SECONDS,
+        func=log_cache_metrics,
+    )
+    if settings.APP.CACHE_METRICS_LOG_INTERVAL_SECONDS > 0:
+        cache_metrics_task.start()
+
+    answer_checkpoint_task = PeriodicTask(
+        name="answer-buffer-checkpoint",
+        interval=settings.APP.ANSWER_BUFFER_CHECKPOINT_SECONDS,
+        func=checkpoint_answer_buffers,
+    )
+    if settings.APP.ANSWER_BUFFER_ENABLED:
+        answer_checkpoint_task.start()
+
+    attempt_sweeper_task = PeriodicTask(
+        name="attempt-expiry-sweeper",
+        interval=settings.APP.ATTEMPT_SWEEP_INTERVAL_SECONDS,
+        func=expire_attempts,
+    )
+    if settings.APP.ATTEMPT_SWEEP_INTERVAL_SECONDS > 0:
+        attempt_sweeper_task.start()
+
+    expiry_queue_task = PeriodicTask(
+        name="attempt-expiry-queue",
+        interval=settings.APP.ATTEMPT_EXPIRY_QUEUE_POLL_SECONDS,
+        func=process_expiry_queue,
+    )
+    if settings.APP.ATTEMPT_EXPIRY_QUEUE_POLL_SECONDS > 0:
+        try:
+            await rebuild_expiry_queue_on_startup()
+        except Exception:
+            # Sweeper still expires the attempts missing from the queue
+            logger.exception("Expiry queue rebuild failed")
+        expiry_queue_task.start()
+
     yield
     # Shutdown
     logger.info("Shutdown")
 
+    await cache_metrics_task.stop()
+    await answer_checkpoint_task.stop()
+    await attempt_sweeper_task.stop()
+    await expiry_queue_task.stop()
+
     await redis_manager.stop()
     await db_session_manager.stop()
     await http_client_manager.stop()
@@ -64,7 +117,10 @@ app.include_router(companies_router)
 app.include_router(invitations_router)
 app.include_router(quiz_router)
 app.include_router(attempt_router)
+if settings.APP.CACHE_METRICS_ROUTE_ENABLED:
+    app.include_router(cache_router)
 
+app.add_middleware(GenerationMemoMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.APP.ORIGINS,
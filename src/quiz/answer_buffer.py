@@ -0,0 +1,79 @@
+import json
+from datetime import datetime, timedelta
+from uuid import UUID
+
+from redis.asyncio import Redis
+
+from src.core.caching.config import DAY, HOUR
+
+# Buffer outlives the attempt, so the expiry path can still flush it
+BUFFER_GRACE = timedelta(seconds=HOUR)
+UNTIMED_BUFFER_EXPIRE = DAY
+
+DIRTY_ATTEMPTS_KEY = "attempt-answers:dirty"
+
+
+class AnswerBuffer:
+    """
+    Write-behind buffer of in progress answers. A Redis hash per attempt: question_id -> JSON list of option ids.
+    Flushed to Postgres on submit and expiry, attempts changed since the last checkpoint are kept in a dirty set.
+    Used only when settings.APP.ANSWER_BUFFER_ENABLED.
+    """
+
+    def __init__(self, redis: Redis):
+        self.redis = redis
+
+    @staticmethod
+    def get_key(attempt_id: UUID) -> str:
+        return f"attempt-answers:{attempt_id}"
+
+    async def save(
+        self,
+        attempt_id: UUID,
+        answers: dict[UUID, list[UUID]],
+        expires_at: datetime | None,
+    ) -> None:
+        key = self.get_key(attempt_id)
+        mapping = {
+            str(question_id): json.dumps([str(option_id) for option_id in option_ids])
+            for question_id, option_ids in answers.items()
+        }
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(key, mapping=mapping)
+            if expires_at:
+                pipe.expireat(key, expires_at + BUFFER_GRACE)
+            else:
+                pipe.expire(key, UNTIMED_BUFFER_EXPIRE)
+            pipe.sadd(DIRTY_ATTEMPTS_KEY, str(attempt_id))
+            await pipe.execute()
+
+    async def get(self, attempt_id: UUID) -> dict[UUID, list[UUID]]:
+        data = await self.redis.hgetall(self.get_key(attempt_id))
+        return {
+            UUID(question_id): [UUID(option_id) for option_id in json.loads(ids)]
+            for question_id, ids in data.items()
+        }
+
+    async def discard(self, *attempt_ids: UUID) -> None:
+        """After the answers are committed with the finished attempt."""
+        if not attempt_ids:
+            return
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.delete(*(self.get_key(attempt_id) for attempt_id in attempt_ids))
+            pipe.srem(
+                DIRTY_ATTEMPTS_KEY, *(str(attempt_id) for attempt_id in attempt_ids)
+            )
+            await pipe.execute()
+
+    async def mark_dirty(self, *attempt_ids: UUID) -> None:
+        if attempt_ids:
+            await self.redis.sadd(
+                DIRTY_ATTEMPTS_KEY, *(str(attempt_id) for attempt_id in attempt_ids)
+            )
+
+    async def pop_dirty_attempt_ids(self, count: int) -> list[UUID]:
+        """
+        Removed before the flush, so answers saved during the checkpoint mark the attempt dirty again.
+        """
+        attempt_ids = await self.redis.spop(DIRTY_ATTEMPTS_KEY, count)
+        return [UUID(attempt_id) for attempt_id in attempt_ids or []]
@@ -0,0 +1,92 @@
+"""
+Maintenance commands, run outside the app.
+Example: python -m src.quiz.commands rebuild-stats --batch-size 500
+         python -m src.quiz.commands rebuild-leaderboards
+         python -m src.quiz.commands rebuild-expiry-queue
+"""
+
+import argparse
+import asyncio
+
+from src.core.config import settings
+from src.core.database import db_session_manager
+from src.core.redis import redis_manager
+
+from .tasks import (
+    EXPIRY_QUEUE_REBUILD_BATCH_SIZE,
+    LEADERBOARD_REBUILD_BATCH_SIZE,
+    STATS_BACKFILL_BATCH_SIZE,
+    rebuild_expiry_queue,
+    rebuild_leaderboards,
+    rebuild_user_company_stats,
+)
+
+
+async def run_rebuild_stats(batch_size: int) -> None:
+    db_session_manager.start(str(settings.DB.DATABASE_URL))
+    try:
+        await rebuild_user_company_stats(batch_size=batch_size)
+    finally:
+        await db_session_manager.stop()
+
+
+async def run_rebuild_leaderboards(batch_size: int) -> None:
+    db_session_manager.start(str(settings.DB.DATABASE_URL))
+    redis_manager.start(
+        str(settings.REDIS.REDIS_URL), encoding="utf8", decode_responses=True
+    )
+    try:
+        await rebuild_leaderboards(batch_size=batch_size)
+    finally:
+        await redis_manager.stop()
+        await db_session_manager.stop()
+
+
+async def run_rebuild_expiry_queue(batch_size: int) -> None:
+    db_session_manager.start(str(settings.DB.DATABASE_URL))
+    redis_manager.start(
+        str(settings.REDIS.REDIS_URL), encoding="utf8", decode_responses=True
+    )
+    try:
+        await rebuild_expiry_queue(batch_size=batch_size)
+    finally:
+        await redis_manager.stop()
+        await db_session_manager.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m src.quiz.commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    rebuild_stats = commands.add_parser(
+        "rebuild-stats", help="Rebuild user company stats from the finished attempts"
+    )
+    rebuild_stats.add_argument(
+        "--batch-size", type=int, default=STATS_BACKFILL_BATCH_SIZE
+    )
+
+    rebuild_leaderboards_command = commands.add_parser(
+        "rebuild-leaderboards", help="Rebuild the Redis leaderboards from Postgres"
+    )
+    rebuild_leaderboards_command.add_argument(
+        "--batch-size", type=int, default=LEADERBOARD_REBUILD_BATCH_SIZE
+    )
+
+    rebuild_expiry_queue_command = commands.add_parser(
+        "rebuild-expiry-queue", help="Rebuild the attempt expiry queue from Postgres"
+    )
+    rebuild_expiry_queue_command.add_argument(
+        "--batch-size", type=int, default=EXPIRY_QUEUE_REBUILD_BATCH_SIZE
+    )
+
+    args = parser.parse_args()
+    if args.command == "rebuild-stats":
+        asyncio.run(run_rebuild_stats(batch_size=args.batch_size))
+    elif args.command == "rebuild-leaderboards":
+        asyncio.run(run_rebuild_leaderboards(batch_size=args.batch_size))
+    elif args.command == "rebuild-expiry-queue":
+        asyncio.run(run_rebuild_expiry_queue(batch_size=args.batch_size))
+
+
+if __name__ == "__main__":
+    main()
@@ -7,8 +7,11 @@ from fastapi_limiter.depends import RateLimiter
 
 from src.auth.dependencies import UserRepositoryDep
 from src.company.dependencies import CompanyMemberServiceDep
-from src.core.dependencies import DBSessionDep
+from src.core.dependencies import DBSessionDep, RedisDep
 
+from .answer_buffer import AnswerBuffer
+from .expiry_queue import ExpiryQueue
+from .leaderboard import Leaderboard
 from .repository import (
     AnswerRepository,
     AttemptRepository,
@@ -16,6 +19,7 @@ from .repository import (
     QuizRepository,
 )
 from .service import AttemptService, QuizService
+from .snapshots import QuizSnapshotStore
 
 QuizLimitDep = Depends(RateLimiter(times=20, seconds=60))
 AttemptLimitDep = Depends(RateLimiter(times=20, seconds=60))
@@ -25,9 +29,15 @@ async def get_company_quiz_service(
     quiz_repo: QuizRepositoryDep,
     question_repo: QuestionRepositoryDep,
     member_service: CompanyMemberServiceDep,
+    snapshots: QuizSnapshotStoreDep,
+    leaderboard: LeaderboardDep,
 ) -> QuizService:
     return QuizService(
-        quiz_repo=quiz_repo, question_repo=question_repo, member_service=member_service
+        quiz_repo=quiz_repo,
+        question_repo=question_repo,
+        member_service=member_service,
+        snapshots=snapshots,
+        leaderboard=leaderboard,
     )
 
 
@@ -41,6 +51,9 @@ async def get_attempt_service(
     question_repo: QuestionRepositoryDep,
     member_service: CompanyMemberServiceDep,
     quiz_service: CompanyQuizServiceDep,
+    answer_buffer: AnswerBufferDep,
+    expiry_queue: ExpiryQueueDep,
+    leaderboard: LeaderboardDep,
 ) -> AttemptService:
     return AttemptService(
         attempt_repo=attempt_repo,
@@ -49,6 +62,9 @@ async def get_attempt_service(
         question_repo=question_repo,
         member_service=member_service,
         quiz_service=quiz_service,
+        answer_buffer=answer_buffer,
+        expiry_queue=expiry_queue,
+        leaderboard=leaderboard,
     )
 
 
@@ -81,3 +97,31 @@ def get_answer_repository(db: DBSessionDep) -> AnswerRepository:
 
 
 AnswerRepositoryDep = Annotated[AnswerRepository, Depends(get_answer_repository)]
+
+
+def get_answer_buffer(redis: RedisDep) -> AnswerBuffer:
+    return AnswerBuffer(redis=redis)
+
+
+AnswerBufferDep = Annotated[AnswerBuffer, Depends(get_answer_buffer)]
+
+
+def get_expiry_queue(redis: RedisDep) -> ExpiryQueue:
+    return ExpiryQueue(redis=redis)
+
+
+ExpiryQueueDep = Annotated[ExpiryQueue, Depends(get_expiry_queue)]
+
+
+def get_quiz_snapshot_store(redis: RedisDep) -> QuizSnapshotStore:
+    return QuizSnapshotStore(redis=redis)
+
+
+QuizSnapshotStoreDep = Annotated[QuizSnapshotStore, Depends(get_quiz_snapshot_store)]
+
+
+def get_leaderboard(redis: RedisDep) -> Leaderboard:
+    return Leaderboard(redis=redis)
+
+
+LeaderboardDep = Annotated[Leaderboard, Depends(get_leaderboard)]
@@ -0,0 +1,57 @@
+from datetime import datetime
+from uuid import UUID
+
+from redis.asyncio import Redis
+
+EXPIRY_QUEUE_KEY = "attempt-expiry:queue"
+EXPIRY_QUEUE_REBUILD_KEY = "attempt-expiry:rebuild"
+
+# Atomic, so each due attempt is popped by one worker only
+POP_DUE_SCRIPT = """
+local ids = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+if #ids > 0 then
+    redis.call('ZREM', KEYS[1], unpack(ids))
+end
+return ids
+"""
+
+
+class ExpiryQueue:
+    """
+    Delayed jobs for timed attempts, a sorted set of attempt ids scored by expires_at.
+    Lost entries are restored by rebuild_expiry_queue() on startup, once per deploy, and covered by the expiry sweeper.
+    """
+
+    def __init__(self, redis: Redis):
+        self.redis = redis
+        self._pop_due = redis.register_script(POP_DUE_SCRIPT)
+
+    async def schedule(self, *items: tuple[UUID, datetime]) -> None:
+        """:param items: (attempt_id, expires_at)"""
+        if items:
+            await self.redis.zadd(
+                EXPIRY_QUEUE_KEY,
+                {
+                    str(attempt_id): expires_at.timestamp()
+                    for attempt_id, expires_at in items
+                },
+            )
+
+    async def cancel(self, *attempt_ids: UUID) -> None:
+        if attempt_ids:
+            await self.redis.zrem(
+                EXPIRY_QUEUE_KEY, *(str(attempt_id) for attempt_id in attempt_ids)
+            )
+
+    async def pop_due(self, now: datetime, count: int) -> list[UUID]:
+        attempt_ids = await self._pop_due(
+            keys=[EXPIRY_QUEUE_KEY], args=[now.timestamp(), count]
+        )
+        return [UUID(attempt_id) for attempt_id in attempt_ids]
+
+    async def claim_rebuild(self, ttl_seconds: int) -> bool:
+        """:return: True for the first caller within ttl_seconds only, so one worker of all replicas rebuilds."""
+        claimed = await self.redis.set(
+            EXPIRY_QUEUE_REBUILD_KEY, 1, nx=True, ex=ttl_seconds
+        )
+        return bool(claimed)
@@ -0,0 +1,81 @@
+from typing import Iterable
+from uuid import UUID
+
+from redis.asyncio import Redis
+
+
+class Leaderboard:
+    """
+    Rankings in Redis sorted sets of user ids, highest score first; top-N and ranks are O(log n).
+    Quiz boards keep the best attempt score of a user (ZADD GT), company boards the score of the user company stats.
+    Company scores aren't monotonic, so they are set while the stats rows are locked and land in commit order.
+    Members are removed from the boards of the company when they leave, users without finished attempts left
+    when a quiz is deleted. Lost boards are restored from Postgres by rebuild_leaderboards().
+    """
+
+    def __init__(self, redis: Redis):
+        self.redis = redis
+
+    @staticmethod
+    def get_quiz_key(quiz_id: UUID) -> str:
+        return f"leaderboard:quiz:{quiz_id}"
+
+    @staticmethod
+    def get_company_key(company_id: UUID) -> str:
+        return f"leaderboard:company:{company_id}"
+
+    async def add_quiz_scores(self, *items: tuple[UUID, UUID, float]) -> None:
+        """:param items: (quiz_id, user_id, score), a lower score than the stored one is ignored"""
+        if not items:
+            return
+
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for quiz_id, user_id, score in items:
+                pipe.zadd(self.get_quiz_key(quiz_id), {str(user_id): score}, gt=True)
+            await pipe.execute()
+
+    async def set_company_scores(self, *items: tuple[UUID, UUID, float]) -> None:
+        """
+        Call while the user company stats rows are locked, a later write replaces an earlier one.
+        :param items: (company_id, user_id, score)
+        """
+        if not items:
+            return
+
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for company_id, user_id, score in items:
+                pipe.zadd(self.get_company_key(company_id), {str(user_id): score})
+            await pipe.execute()
+
+    async def remove_members(
+        self, company_id: UUID, quiz_ids: Iterable[UUID], *user_ids: UUID
+    ) -> None:
+        """Removes the users from the company board and the boards of quiz_ids."""
+        if not user_ids:
+            return
+
+        members = [str(user_id) for user_id in user_ids]
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.zrem(self.get_company_key(company_id), *members)
+            for quiz_id in quiz_ids:
+                pipe.zrem(self.get_quiz_key(quiz_id), *members)
+            await pipe.execute()
+
+    async def delete_quiz(self, quiz_id: UUID) -> None:
+        await self.redis.delete(self.get_quiz_key(quiz_id))
+
+    async def get_top(self, key: str, limit: int) -> list[tuple[UUID, float]]:
+        """:return: (user_id, score) highest first"""
+        entries = await self.redis.zrange(key, 0, limit - 1, desc=True, withscores=True)
+        return [(UUID(user_id), score) for user_id, score in entries]
+
+    async def get_rank(self, key: str, user_id: UUID) -> tuple[int, float] | None:
+        """:return: 0-based rank and score, None if the user isn't on the board"""
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.zrevrank(key, str(user_id))
+            pipe.zscore(key, str(user_id))
+            rank, score = await pipe.execute()
+
+        if rank is None or score is None:
+            return None
+        return rank, score
@@ -8,9 +8,12 @@ from sqlalchemy import (
     DateTime,
     Float,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
+    UniqueConstraint,
+    text,
 )
 from sqlalchemy import (
     Enum as SQLEnum,
@@ -56,26 +59,42 @@ class CompanyQuiz(Base, TimestampMixin):
         cascade="all, delete",
     )
 
+    # Written through QuizQuestionLink rows, see QuestionRepository
     questions: Mapped[list["CompanyQuizQuestion"]] = relationship(
-        "CompanyQuizQuestion",
-        back_populates="quiz",
-        passive_deletes=True,
-        cascade="all, delete",
+        "CompanyQuizQuestion", secondary="quiz_question_link", viewonly=True
     )
 
 
-class CompanyQuizQuestion(Base, TimestampMixin):
-    __tablename__ = "company_quiz_question"
+class QuizQuestionLink(Base):
+    """
+    Questions of a quiz version. Versions share question rows instead of copying them,
+    a draft forks a shared question before editing it (see QuestionRepository.get_writable_question).
+    """
+
+    __tablename__ = "quiz_question_link"
 
     quiz_id: Mapped[uuid.UUID] = mapped_column(
         UUID, ForeignKey("company_quiz.id", ondelete="CASCADE")
     )
+    question_id: Mapped[uuid.UUID] = mapped_column(
+        UUID, ForeignKey("company_quiz_question.id", ondelete="CASCADE")
+    )
+
+    __table_args__ = (
+        UniqueConstraint("quiz_id", "question_id"),
+        # Counts the quizzes sharing a question
+        Index("ix_quiz_question_link_question_id", "question_id"),
+    )
+
+
+class CompanyQuizQuestion(Base, TimestampMixin):
+    """Question with its options, shared by the quiz versions linking it."""
+
+    __tablename__ = "company_quiz_question"
+
     text: Mapped[str] = mapped_column(Text)
     points: Mapped[float] = mapped_column(Float, default=1)
 
-    quiz: Mapped["CompanyQuiz"] = relationship(
-        "CompanyQuiz", back_populates="questions"
-    )
     options: Mapped[list["QuestionAnswerOption"]] = relationship(
         "QuestionAnswerOption",
         back_populates="question",
@@ -83,13 +102,6 @@ class CompanyQuizQuestion(Base, TimestampMixin):
         passive_deletes=True,
     )
 
-    def clone(self) -> "CompanyQuizQuestion":
-        return CompanyQuizQuestion(
-            id=uuid.uuid4(),
-            text=self.text,
-            options=[opt.clone() for opt in self.options],
-        )
-
 
 class QuestionAnswerOption(Base):
     __tablename__ = "question_answer_option"
@@ -104,11 +116,6 @@ class QuestionAnswerOption(Base):
         "CompanyQuizQuestion", back_populates="options"
     )
 
-    def clone(self) -> "QuestionAnswerOption":
-        return QuestionAnswerOption(
-            id=uuid.uuid4(), text=self.text, is_correct=self.is_correct
-        )
-
 
 class QuizAttempt(Base, AttemptMixin):
     __tablename__ = "quiz_attempt"
@@ -132,6 +139,33 @@ class QuizAttempt(Base, AttemptMixin):
         DateTime(timezone=True), nullable=True
     )
 
+    __table_args__ = (
+        # Expiry sweeper scans only the attempts in progress
+        Index(
+            "ix_quiz_attempt_expires_at_in_progress",
+            "expires_at",
+            postgresql_where=text("status = 'IN_PROGRESS'"),
+        ),
+        # One active attempt per user and quiz, conflict target of start_attempt
+        Index(
+            "uq_quiz_attempt_in_progress",
+            "user_id",
+            "quiz_id",
+            unique=True,
+            postgresql_where=text("status = 'IN_PROGRESS'"),
+        ),
+        # Covers the score distribution of a quiz, read by an index only scan
+        Index("ix_quiz_attempt_quiz_id_status_score", "quiz_id", "status", "score"),
+        # Keyset pages of the finished attempts of a quiz, newest first
+        Index(
+            "ix_quiz_attempt_quiz_id_finished_at_id",
+            "quiz_id",
+            "finished_at",
+            "id",
+            postgresql_where=text("finished_at IS NOT NULL"),
+        ),
+    )
+
     @property
     def is_expired(self) -> bool:
         if self.expires_at is None:
@@ -149,6 +183,76 @@ class QuizAttempt(Base, AttemptMixin):
     )
 
 
+class UserQuizAttemptCounter(Base):
+    """Attempts taken by a user per quiz. Incremented with the attempt INSERT and guards allowed_attempts."""
+
+    __tablename__ = "user_quiz_attempt_counter"
+
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID, ForeignKey("user.id", ondelete="CASCADE")
+    )
+    quiz_id: Mapped[uuid.UUID] = mapped_column(
+        UUID, ForeignKey("company_quiz.id", ondelete="CASCADE")
+    )
+    attempts_count: Mapped[int] = mapped_column(Integer, default=0)
+
+    # Conflict target of the counter upsert
+    __table_args__ = (UniqueConstraint("user_id", "quiz_id"),)
+
+
+class UserCompanyStats(Base):
+    """Totals of the user finished attempts in a company. Incremented when attempts are finalized."""
+
+    __tablename__ = "user_company_stats"
+
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID, ForeignKey("user.id", ondelete="CASCADE")
+    )
+    company_id: Mapped[uuid.UUID] = mapped_column(
+        UUID, ForeignKey("company.id", ondelete="CASCADE")
+    )
+    correct_answers_count: Mapped[int] = mapped_column(Integer, default=0)
+    total_questions_count: Mapped[int] = mapped_column(Integer, default=0)
+
+    # Conflict target of the stats upsert
+    __table_args__ = (UniqueConstraint("user_id", "company_id"),)
+
+
+class QuestionStats(Base):
+    """Answers of the finished attempts per quiz question. Incremented when attempts are finalized."""
+
+    __tablename__ = "question_stats"
+
+    quiz_id: Mapped[uuid.UUID] = mapped_column(
+        UUID, ForeignKey("company_quiz.id", ondelete="CASCADE")
+    )
+    question_id: Mapped[uuid.UUID] = mapped_column(
+        UUID, ForeignKey("company_quiz_question.id", ondelete="CASCADE")
+    )
+    answered_count: Mapped[int] = mapped_column(Integer, default=0)
+    correct_count: Mapped[int] = mapped_column(Integer, default=0)
+
+    # Conflict target of the stats upsert
+    __table_args__ = (UniqueConstraint("quiz_id", "question_id"),)
+
+
+class OptionStats(Base):
+    """Picks of an option in the finished attempts per quiz. Incremented when attempts are finalized."""
+
+    __tablename__ = "option_stats"
+
+    quiz_id: Mapped[uuid.UUID] = mapped_column(
+        UUID, ForeignKey("company_quiz.id", ondelete="CASCADE")
+    )
+    option_id: Mapped[uuid.UUID] = mapped_column(
+        UUID, ForeignKey("question_answer_option.id", ondelete="CASCADE")
+    )
+    picks_count: Mapped[int] = mapped_column(Integer, default=0)
+
+    # Conflict target of the stats upsert
+    __table_args__ = (UniqueConstraint("quiz_id", "option_id"),)
+
+
 class QuizAttemptAnswer(Base):
     __tablename__ = "quiz_attempt_answer"
 
@@ -171,6 +275,9 @@ class QuizAttemptAnswer(Base):
         passive_deletes=True,
     )
 
+    # Conflict target of the bulk answer upsert
+    __table_args__ = (UniqueConstraint("attempt_id", "question_id"),)
+
 
 class AttemptAnswerSelection(Base):
     __tablename__ = "attempt_answer_selection"
@@ -186,3 +293,5 @@ class AttemptAnswerSelection(Base):
         "QuizAttemptAnswer", back_populates="selected_options"
     )
     option: Mapped["QuestionAnswerOption"] = relationship("QuestionAnswerOption")
+
+    __table_args__ = (UniqueConstraint("answer_id", "option_id"),)
@@ -1,32 +1,278 @@
-from datetime import datetime, timezone
-from typing import Sequence
-from uuid import UUID
+from datetime import datetime, timedelta
+from typing import Any, Iterable, Sequence
+from uuid import UUID, uuid4
 
-from sqlalchemy import func, or_, select, update
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import InstrumentedAttribute, selectinload
+from sqlalchemy import (
+    DateTime,
+    Row,
+    Text,
+    and_,
+    case,
+    cast,
+    delete,
+    exists,
+    func,
+    insert,
+    literal,
+    or_,
+    select,
+    true,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects.postgresql import array
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncResult, AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute, aliased, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 
+from src.company.models import Member as MemberModel
+from src.core.caching.config import CacheConfig
+from src.core.caching.listeners import mark_for_invalidation
 from src.core.repository import BaseRepository
 
 from .enums import AttemptStatus
+from .models import (
+    AttemptAnswerSelection as AttemptAnswerSelectionModel,
+)
 from .models import (
     CompanyQuiz as CompanyQuizModel,
 )
 from .models import (
     CompanyQuizQuestion as CompanyQuestionModel,
 )
+from .models import (
+    OptionStats as OptionStatsModel,
+)
+from .models import (
+    QuestionAnswerOption as QuestionAnswerOptionModel,
+)
+from .models import (
+    QuestionStats as QuestionStatsModel,
+)
 from .models import (
     QuizAttempt as QuizAttemptModel,
 )
 from .models import (
     QuizAttemptAnswer as QuizAttemptAnswerModel,
 )
+from .models import (
+    QuizQuestionLink as QuizQuestionLinkModel,
+)
+from .models import (
+    UserCompanyStats as UserCompanyStatsModel,
+)
+from .models import (
+    UserQuizAttemptCounter as AttemptCounterModel,
+)
+from .utils.attempt_logic import (
+    MAX_SCORE,
+    SCORE_PERCENTILES,
+    get_answer_id,
+    get_selection_id,
+)
+from .utils.grading import (
+    correct_options_cte,
+    finalize_attempts_query,
+    finish_values,
+    is_correct_answer,
+    selected_options_cte,
+    status_inline,
+    status_literal,
+)
+
+EXPORT_YIELD_PER = 1000
+
+# Separates the hashes of the user company stats locks from other advisory locks
+USER_COMPANY_STATS_LOCK_SEED = 7316
+
+USER_COMPANY_STATS_COLUMNS = (
+    UserCompanyStatsModel.company_id,
+    UserCompanyStatsModel.user_id,
+    UserCompanyStatsModel.correct_answers_count,
+    UserCompanyStatsModel.total_questions_count,
+)
+
+
+# Columns of QuizAttemptBaseSchema, listings don't load the answers
+ATTEMPT_COLUMNS = (
+    QuizAttemptModel.id,
+    QuizAttemptModel.user_id,
+    QuizAttemptModel.quiz_id,
+    QuizAttemptModel.score,
+    QuizAttemptModel.correct_answers_count,
+    QuizAttemptModel.total_questions_count,
+    QuizAttemptModel.status,
+    QuizAttemptModel.expires_at,
+    QuizAttemptModel.started_at,
+    QuizAttemptModel.finished_at,
+)
 
 
 class QuizRepository(BaseRepository[CompanyQuizModel]):
     def __init__(self, db: AsyncSession):
         super().__init__(model=CompanyQuizModel, db=db)
 
+    async def add_quiz_with_questions(
+        self,
+        quiz: CompanyQuizModel,
+        question_rows: Sequence[dict[str, Any]],
+        link_rows: Sequence[dict[str, Any]],
+        option_rows: Sequence[dict[str, Any]],
+    ) -> None:
+        """
+        Flushes the quiz, then one executemany INSERT per table for questions, links and options,
+        batched into multi-row statements by the driver. Does not commit.
+        """
+        self.db.add(quiz)
+        await self.db.flush()
+        await self.bulk_insert_quizzes(
+            company_id=quiz.company_id,
+            quiz_rows=[],
+            question_rows=question_rows,
+            link_rows=link_rows,
+            option_rows=option_rows,
+        )
+
+    async def bulk_insert_quizzes(
+        self,
+        company_id: UUID,
+        quiz_rows: Sequence[dict[str, Any]],
+        question_rows: Sequence[dict[str, Any]],
+        link_rows: Sequence[dict[str, Any]],
+        option_rows: Sequence[dict[str, Any]],
+    ) -> None:
+        """
+        One executemany INSERT per table in foreign key order, batched into multi-row statements by the driver.
+        Empty tables are skipped. Does not commit.
+        """
+        for model, rows in (
+            (CompanyQuizModel, quiz_rows),
+            (CompanyQuestionModel, question_rows),
+            (QuizQuestionLinkModel, link_rows),
+            (QuestionAnswerOptionModel, option_rows),
+        ):
+            if rows:
+                await self.db.execute(insert(model), rows)
+
+        if quiz_rows:
+            mark_for_invalidation(self.db, CacheConfig.COMPANY, company_id)
+
+    async def stream_export_rows(
+        self, company_id: UUID, latest_only: bool
+    ) -> AsyncResult[Any]:
+        """
+        Quizzes of the company joined with their questions and options, streamed from a server-side cursor.
+        Ordered by root quiz and version, so a root is always read before its versions.
+        :param latest_only: Only the last version of every root quiz.
+        """
+        root_id = func.coalesce(CompanyQuizModel.root_quiz_id, CompanyQuizModel.id)
+        query = (
+            select(
+                CompanyQuizModel.id,
+                CompanyQuizModel.root_quiz_id,
+                CompanyQuizModel.version,
+                CompanyQuizModel.title,
+                CompanyQuizModel.description,
+                CompanyQuizModel.allowed_attempts,
+                CompanyQuizModel.time_limit_minutes,
+                CompanyQuestionModel.id.label("question_id"),
+                CompanyQuestionModel.text.label("question_text"),
+                CompanyQuestionModel.points,
+                QuestionAnswerOptionModel.text.label("option_text"),
+                QuestionAnswerOptionModel.is_correct,
+            )
+            .outerjoin(
+                QuizQuestionLinkModel,
+                QuizQuestionLinkModel.quiz_id == CompanyQuizModel.id,
+            )
+            .outerjoin(
+                CompanyQuestionModel,
+                CompanyQuestionModel.id == QuizQuestionLinkModel.question_id,
+            )
+            .outerjoin(
+                QuestionAnswerOptionModel,
+                QuestionAnswerOptionModel.question_id == CompanyQuestionModel.id,
+            )
+            .where(CompanyQuizModel.company_id == company_id)
+            .order_by(
+                root_id,
+                CompanyQuizModel.version,
+                CompanyQuizModel.id,
+                CompanyQuestionModel.created_at,
+                CompanyQuestionModel.id,
+                QuestionAnswerOptionModel.id,
+            )
+            .execution_options(yield_per=EXPORT_YIELD_PER)
+        )
+        if latest_only:
+            latest = (
+                select(root_id, func.max(CompanyQuizModel.version))
+                .where(CompanyQuizModel.company_id == company_id)
+                .group_by(root_id)
+            )
+            query = query.where(tuple_(root_id, CompanyQuizModel.version).in_(latest))
+
+        return await self.db.stream(query)
+
+    async def get_question_stats_rows(
+        self, company_id: UUID, quiz_id: UUID
+    ) -> Sequence[Row]:
+        """
+        Questions of the quiz with their options and stats, a row per option. Reads the stats tables only, not the answers.
+        :return: Empty if the quiz wasn't found, a row with empty question columns for a quiz without questions.
+        """
+        query = (
+            select(
+                CompanyQuestionModel.id.label("question_id"),
+                CompanyQuestionModel.text.label("question_text"),
+                func.coalesce(QuestionStatsModel.answered_count, 0).label(
+                    "answered_count"
+                ),
+                func.coalesce(QuestionStatsModel.correct_count, 0).label(
+                    "correct_count"
+                ),
+                QuestionAnswerOptionModel.id.label("option_id"),
+                QuestionAnswerOptionModel.text.label("option_text"),
+                QuestionAnswerOptionModel.is_correct,
+                func.coalesce(OptionStatsModel.picks_count, 0).label("picks_count"),
+            )
+            .select_from(CompanyQuizModel)
+            .outerjoin(
+                QuizQuestionLinkModel,
+                QuizQuestionLinkModel.quiz_id == CompanyQuizModel.id,
+            )
+            .outerjoin(
+                CompanyQuestionModel,
+                CompanyQuestionModel.id == QuizQuestionLinkModel.question_id,
+            )
+            .outerjoin(
+                QuestionStatsModel,
+                and_(
+                    QuestionStatsModel.quiz_id == CompanyQuizModel.id,
+                    QuestionStatsModel.question_id == CompanyQuestionModel.id,
+                ),
+            )
+            .outerjoin(
+                QuestionAnswerOptionModel,
+                QuestionAnswerOptionModel.question_id == CompanyQuestionModel.id,
+            )
+            .outerjoin(
+                OptionStatsModel,
+                and_(
+                    OptionStatsModel.quiz_id == CompanyQuizModel.id,
+                    OptionStatsModel.option_id == QuestionAnswerOptionModel.id,
+                ),
+            )
+            .where(
+                CompanyQuizModel.id == quiz_id,
+                CompanyQuizModel.company_id == company_id,
+            )
+            .order_by(CompanyQuestionModel.created_at, CompanyQuestionModel.id)
+        )
+        result = await self.db.execute(query)
+        return result.all()
+
     async def get_last_version_number(self, company_id: UUID, root_id: UUID) -> int:
         query = select(func.max(CompanyQuizModel.version)).where(
             CompanyQuizModel.company_id == company_id,
@@ -44,6 +290,119 @@ class QuizRepository(BaseRepository[CompanyQuizModel]):
         is_published = await self.db.scalar(query)
         return is_published
 
+    async def clone_quiz(
+        self, company_id: UUID, quiz_id: UUID, root_id: UUID, version: int
+    ) -> CompanyQuizModel | None:
+        """
+        Copies the quiz as a new hidden, unpublished version in one statement.
+        Questions are shared, only their links are copied. Nothing is loaded into Python. Does not commit.
+        :return: New quiz without questions loaded, None if the quiz wasn't found.
+        """
+        new_quiz_id = uuid4()
+        new_quiz = (
+            pg_insert(CompanyQuizModel)
+            .from_select(
+                [
+                    CompanyQuizModel.id,
+                    CompanyQuizModel.company_id,
+                    CompanyQuizModel.title,
+                    CompanyQuizModel.description,
+                    CompanyQuizModel.allowed_attempts,
+                    CompanyQuizModel.time_limit_minutes,
+                    CompanyQuizModel.is_published,
+                    CompanyQuizModel.is_visible,
+                    CompanyQuizModel.root_quiz_id,
+                    CompanyQuizModel.version,
+                ],
+                select(
+                    literal(new_quiz_id),
+                    CompanyQuizModel.company_id,
+                    CompanyQuizModel.title,
+                    CompanyQuizModel.description,
+                    CompanyQuizModel.allowed_attempts,
+                    CompanyQuizModel.time_limit_minutes,
+                    literal(False),
+                    literal(False),
+                    literal(root_id),
+                    literal(version),
+                ).where(
+                    CompanyQuizModel.id == quiz_id,
+                    CompanyQuizModel.company_id == company_id,
+                ),
+            )
+            .returning(*CompanyQuizModel.__table__.columns)
+            .cte("new_quiz")
+        )
+        new_links = (
+            insert(QuizQuestionLinkModel)
+            .from_select(
+                [
+                    QuizQuestionLinkModel.id,
+                    QuizQuestionLinkModel.quiz_id,
+                    QuizQuestionLinkModel.question_id,
+                ],
+                select(
+                    func.gen_random_uuid(),
+                    literal(new_quiz_id),
+                    QuizQuestionLinkModel.question_id,
+                ).where(
+                    QuizQuestionLinkModel.quiz_id == quiz_id,
+                    exists(new_quiz.select()),
+                ),
+            )
+            .cte("new_links")
+        )
+
+        # Foreign keys of the links are checked at the end of the statement, after the quiz is inserted
+        query = select(aliased(CompanyQuizModel, new_quiz)).add_cte(new_links)
+        new_quiz_model = await self.db.scalar(query)
+
+        if new_quiz_model is not None:
+            mark_for_invalidation(self.db, CacheConfig.COMPANY, company_id)
+        return new_quiz_model
+
+    async def subtract_from_user_company_stats(
+        self, company_id: UUID, quiz_id: UUID
+    ) -> Sequence[tuple[UUID, UUID, int, int]]:
+        """
+        Removes the finished attempts of the quiz from the user company stats, before the attempts cascade on delete.
+        :return: Updated stats (company_id, user_id, correct_answers_count, total_questions_count)
+        """
+        await self._lock_user_company_stats(QuizAttemptModel.quiz_id == quiz_id)
+        totals = (
+            select(
+                QuizAttemptModel.user_id,
+                func.sum(QuizAttemptModel.correct_answers_count).label("correct"),
+                func.sum(QuizAttemptModel.total_questions_count).label("total"),
+            )
+            .where(
+                QuizAttemptModel.quiz_id == quiz_id,
+                QuizAttemptModel.status.in_(
+                    [AttemptStatus.COMPLETED, AttemptStatus.EXPIRED]
+                ),
+            )
+            .group_by(QuizAttemptModel.user_id)
+            .subquery("totals")
+        )
+        query = (
+            update(UserCompanyStatsModel)
+            .where(
+                UserCompanyStatsModel.company_id == company_id,
+                UserCompanyStatsModel.user_id == totals.c.user_id,
+            )
+            .values(
+                correct_answers_count=UserCompanyStatsModel.correct_answers_count
+                - totals.c.correct,
+                total_questions_count=UserCompanyStatsModel.total_questions_count
+                - totals.c.total,
+            )
+            .returning(*USER_COMPANY_STATS_COLUMNS)
+        )
+        result = await self.db.execute(query)
+        stats = result.tuples().all()
+        mark_for_invalidation(self.db, CacheConfig.USER, *(row[1] for row in stats))
+        return stats
+
     async def hide_other_versions(
         self, company_id: UUID, root_id: UUID, exclude_quiz_id: UUID
     ) -> None:
@@ -65,25 +424,10 @@ class QuizRepository(BaseRepository[CompanyQuizModel]):
                 ),
             )
             .values(is_visible=False)
+            .returning(CompanyQuizModel.id)
         )
-        await self.db.execute(query)
-
-    async def get_allowed_attempts(self, company_id: UUID, quiz_id: UUID) -> int | None:
-        query = select(CompanyQuizModel.allowed_attempts).where(
-            CompanyQuizModel.company_id == company_id,
-            CompanyQuizModel.id == quiz_id,
-        )
-        allowed_attempts = await self.db.scalar(query)
-        return allowed_attempts
-
-    async def get_time_limit_minutes(
-        self, company_id: UUID, quiz_id: UUID
-    ) -> int | None:
-        query = select(CompanyQuizModel.time_limit_minutes).where(
-            CompanyQuizModel.company_id == company_id, CompanyQuizModel.id == quiz_id
-        )
-        time_limit_minutes = await self.db.scalar(query)
-        return time_limit_minutes
+        hidden_ids = await self.db.scalars(query)
+        mark_for_invalidation(self.db, CacheConfig.QUIZ, *hidden_ids.all())
 
     async def get_company_id_or_none(self, quiz_id: UUID) -> UUID | None:
         query = select(CompanyQuizModel.company_id).where(
@@ -106,7 +450,13 @@ class QuestionRepository(BaseRepository[CompanyQuestionModel]):
     ) -> CompanyQuestionModel | None:
         query = (
             select(CompanyQuestionModel)
-            .join(CompanyQuizModel, CompanyQuestionModel.quiz_id == CompanyQuizModel.id)
+            .join(
+                QuizQuestionLinkModel,
+                QuizQuestionLinkModel.question_id == CompanyQuestionModel.id,
+            )
+            .join(
+                CompanyQuizModel, QuizQuestionLinkModel.quiz_id == CompanyQuizModel.id
+            )
             .where(
                 CompanyQuestionModel.id == question_id,
                 CompanyQuizModel.id == quiz_id,
@@ -123,9 +473,15 @@ class QuestionRepository(BaseRepository[CompanyQuestionModel]):
     ) -> Sequence[CompanyQuestionModel]:
         query = (
             select(CompanyQuestionModel)
-            .join(CompanyQuizModel)
+            .join(
+                QuizQuestionLinkModel,
+                QuizQuestionLinkModel.question_id == CompanyQuestionModel.id,
+            )
+            .join(
+                CompanyQuizModel, QuizQuestionLinkModel.quiz_id == CompanyQuizModel.id
+            )
             .where(
-                CompanyQuestionModel.quiz_id == quiz_id,
+                QuizQuestionLinkModel.quiz_id == quiz_id,
                 CompanyQuizModel.company_id == company_id,
             )
             .options(selectinload(CompanyQuestionModel.options))
@@ -135,49 +491,350 @@ class QuestionRepository(BaseRepository[CompanyQuestionModel]):
 
     async def get_questions_count_for_quiz(self, quiz_id: UUID) -> int:
         """Since require only quiz_id field, must ensure it's correct. Example: attempt.quiz_id - ensures it exists and correct."""
-        query = (
-            select(func.count(CompanyQuestionModel.id))
-            .join(CompanyQuizModel)
-            .where(CompanyQuestionModel.quiz_id == quiz_id)
+        query = select(func.count(QuizQuestionLinkModel.question_id)).where(
+            QuizQuestionLinkModel.quiz_id == quiz_id
         )
         count = await self.db.scalar(query)
         return count or 0
 
+    async def get_answer_key_rows(
+        self, quiz_id: UUID
+    ) -> Sequence[tuple[UUID, float, UUID | None, str | None, bool | None]]:
+        """
+        Questions with their options of a published quiz in one query, empty if the quiz isn't published.
+        :return: (question_id, points, option_id, option_text, is_correct) rows.
+        """
+        query = (
+            select(
+                CompanyQuestionModel.id,
+                CompanyQuestionModel.points,
+                QuestionAnswerOptionModel.id,
+                QuestionAnswerOptionModel.text,
+                QuestionAnswerOptionModel.is_correct,
+            )
+            .join(
+                QuizQuestionLinkModel,
+                QuizQuestionLinkModel.question_id == CompanyQuestionModel.id,
+            )
+            .join(
+                CompanyQuizModel, QuizQuestionLinkModel.quiz_id == CompanyQuizModel.id
+            )
+            .outerjoin(QuestionAnswerOptionModel)
+            .where(
+                QuizQuestionLinkModel.quiz_id == quiz_id,
+                CompanyQuizModel.is_published.is_(True),
+            )
+        )
+        result = await self.db.execute(query)
+        return result.tuples().all()
+
+    def add_question(self, quiz_id: UUID, question: CompanyQuestionModel) -> None:
+        """Adds the question and links it to the quiz. Does not commit."""
+        link = QuizQuestionLinkModel(quiz_id=quiz_id, question_id=question.id)
+        self.db.add_all([question, link])
+
+    async def get_writable_question(
+        self, company_id: UUID, quiz_id: UUID, question_id: UUID
+    ) -> CompanyQuestionModel | None:
+        """
+        Question of the quiz, with options, that can be edited in place.
+        A question shared with other quiz versions is forked first: copied with its options and relinked,
+        so the other versions keep the original. Does not commit.
+        :return: The question or its fork, None if the quiz has no such question.
+        """
+        is_shared = exists().where(
+            QuizQuestionLinkModel.question_id == question_id,
+            QuizQuestionLinkModel.quiz_id != quiz_id,
+        )
+        query = (
+            select(is_shared)
+            .select_from(QuizQuestionLinkModel)
+            .join(
+                CompanyQuizModel, QuizQuestionLinkModel.quiz_id == CompanyQuizModel.id
+            )
+            .where(
+                QuizQuestionLinkModel.quiz_id == quiz_id,
+                QuizQuestionLinkModel.question_id == question_id,
+                CompanyQuizModel.company_id == company_id,
+            )
+        )
+        shared = await self.db.scalar(query)
+        if shared is None:
+            return None
+
+        if shared:
+            question_id = await self._fork_question(
+                quiz_id=quiz_id, question_id=question_id
+            )
+
+        query = (
+            select(CompanyQuestionModel)
+            .where(CompanyQuestionModel.id == question_id)
+            .options(selectinload(CompanyQuestionModel.options))
+        )
+        question = await self.db.scalar(query)
+        mark_for_invalidation(self.db, CacheConfig.QUIZ, quiz_id)
+        return question
+
+    async def _fork_question(self, quiz_id: UUID, question_id: UUID) -> UUID:
+        """Copies the question with its options and points the quiz link to the copy in one statement."""
+        new_question_id = uuid4()
+        new_question = (
+            insert(CompanyQuestionModel)
+            .from_select(
+                [
+                    CompanyQuestionModel.id,
+                    CompanyQuestionModel.text,
+                    CompanyQuestionModel.points,
+                ],
+                select(
+                    literal(new_question_id),
+                    CompanyQuestionModel.text,
+                    CompanyQuestionModel.points,
+                ).where(CompanyQuestionModel.id == question_id),
+            )
+            .cte("new_question")
+        )
+        new_options = (
+            insert(QuestionAnswerOptionModel)
+            .from_select(
+                [
+                    QuestionAnswerOptionModel.id,
+                    QuestionAnswerOptionModel.question_id,
+                    QuestionAnswerOptionModel.text,
+                    QuestionAnswerOptionModel.is_correct,
+                ],
+                select(
+                    func.gen_random_uuid(),
+                    literal(new_question_id),
+                    QuestionAnswerOptionModel.text,
+                    QuestionAnswerOptionModel.is_correct,
+                ).where(QuestionAnswerOptionModel.question_id == question_id),
+            )
+            .cte("new_options")
+        )
+        query = (
+            update(QuizQuestionLinkModel)
+            .where(
+                QuizQuestionLinkModel.quiz_id == quiz_id,
+                QuizQuestionLinkModel.question_id == question_id,
+            )
+            .values(question_id=new_question_id)
+            .add_cte(new_question, new_options)
+        )
+        await self.db.execute(query)
+        return new_question_id
+
+    async def unlink_question(self, quiz_id: UUID, question_id: UUID) -> None:
+        """Removes the question from the quiz, the question itself is deleted once no quiz links it. Does not commit."""
+        query = delete(QuizQuestionLinkModel).where(
+            QuizQuestionLinkModel.quiz_id == quiz_id,
+            QuizQuestionLinkModel.question_id == question_id,
+        )
+        await self.db.execute(query)
+
+        query = delete(CompanyQuestionModel).where(
+            CompanyQuestionModel.id == question_id,
+            ~exists().where(QuizQuestionLinkModel.question_id == question_id),
+        )
+        await self.db.execute(query)
+        mark_for_invalidation(self.db, CacheConfig.QUIZ, quiz_id)
+
+    async def delete_unshared_questions(self, quiz_id: UUID) -> None:
+        """Deletes the questions only the quiz links, before the quiz itself is deleted. Does not commit."""
+        other_links = aliased(QuizQuestionLinkModel)
+        query = delete(CompanyQuestionModel).where(
+            CompanyQuestionModel.id.in_(
+                select(QuizQuestionLinkModel.question_id).where(
+                    QuizQuestionLinkModel.quiz_id == quiz_id
+                )
+            ),
+            ~exists().where(
+                other_links.question_id == CompanyQuestionModel.id,
+                other_links.quiz_id != quiz_id,
+            ),
+        )
+        await self.db.execute(query)
+
 
 class AttemptRepository(BaseRepository[QuizAttemptModel]):
     def __init__(self, db: AsyncSession):
         super().__init__(model=QuizAttemptModel, db=db)
 
-    async def get_user_attempts_count(
-        self, company_id: UUID, user_id: UUID, quiz_id: UUID
-    ) -> int:
+    async def start_attempt(
+        self, company_id: UUID, quiz_id: UUID, user_id: UUID, started_at: datetime
+    ) -> Row[
+        tuple[
+            bool, bool, bool | None, UUID | None, bool | None, QuizAttemptModel | None
+        ]
+    ]:
         """
-        Get attempts count of user for a specific quiz. Asserts that quiz belongs to the company.
+        One statement: checks the membership and that the quiz is visible, looks for the attempt in progress,
+        increments the attempts counter if allowed and inserts a new attempt. allowed_attempts None means unlimited.
+        The counter upsert is the allowed attempts guard, INSERT ... ON CONFLICT DO NOTHING against the unique index
+        of attempts in progress keeps concurrent starts to one active attempt.
+        Does not commit. If no attempt is inserted the counter may still be incremented, the caller must roll back.
+        :return: member_found, quiz_found, attempts_left, active_attempt_id, active_expired,
+        attempt - the new attempt, None if not inserted.
         """
-        query = (
-            select(func.count(QuizAttemptModel.id))
-            .join(CompanyQuizModel)
+        member = (
+            select(MemberModel.id)
+            .where(MemberModel.company_id == company_id, MemberModel.user_id == user_id)
+            .cte("member")
+        )
+        quiz = (
+            select(
+                CompanyQuizModel.id,
+                CompanyQuizModel.allowed_attempts,
+                CompanyQuizModel.time_limit_minutes,
+            )
             .where(
-                QuizAttemptModel.quiz_id == quiz_id,
-                QuizAttemptModel.user_id == user_id,
+                CompanyQuizModel.id == quiz_id,
                 CompanyQuizModel.company_id == company_id,
+                CompanyQuizModel.is_visible.is_(True),
+                CompanyQuizModel.is_published.is_(True),
             )
+            .cte("quiz")
         )
-        attempts_taken = await self.db.scalar(query)
-        return attempts_taken or 0
-
-    async def get_active_attempt_id(self, user_id: UUID, quiz_id: UUID) -> UUID | None:
-        now = datetime.now(timezone.utc)
-        query = select(QuizAttemptModel.id).where(
+        user_attempts = (
             QuizAttemptModel.user_id == user_id,
             QuizAttemptModel.quiz_id == quiz_id,
-            QuizAttemptModel.status == AttemptStatus.IN_PROGRESS,
-            or_(
-                QuizAttemptModel.expires_at > now, QuizAttemptModel.expires_at.is_(None)
+        )
+        active = (
+            select(
+                QuizAttemptModel.id,
+                func.coalesce(QuizAttemptModel.expires_at <= started_at, False).label(
+                    "is_expired"
+                ),
+            )
+            .where(
+                *user_attempts,
+                QuizAttemptModel.status == status_inline(AttemptStatus.IN_PROGRESS),
+            )
+            .limit(1)
+            .cte("active")
+        )
+        counter_filters = (
+            AttemptCounterModel.user_id == user_id,
+            AttemptCounterModel.quiz_id == quiz_id,
+        )
+        taken = select(
+            func.coalesce(
+                select(AttemptCounterModel.attempts_count)
+                .where(*counter_filters)
+                .scalar_subquery(),
+                0,
+            ).label("count")
+        ).cte("taken")
+        attempts_left = or_(
+            quiz.c.allowed_attempts.is_(None),
+            taken.c.count < quiz.c.allowed_attempts,
+        )
+
+        # Row lock of the counter serializes concurrent starts, the WHERE is rechecked after the wait
+        allowed_attempts = (
+            select(CompanyQuizModel.allowed_attempts)
+            .where(CompanyQuizModel.id == quiz_id)
+            .scalar_subquery()
+        )
+        counted = (
+            pg_insert(AttemptCounterModel)
+            .from_select(
+                [
+                    AttemptCounterModel.id,
+                    AttemptCounterModel.user_id,
+                    AttemptCounterModel.quiz_id,
+                    AttemptCounterModel.attempts_count,
+                ],
+                select(literal(uuid4()), literal(user_id), quiz.c.id, literal(1))
+                .select_from(quiz.join(taken, true()))
+                .where(
+                    exists(member.select()), ~exists(active.select()), attempts_left
+                ),
+            )
+            .on_conflict_do_update(
+                index_elements=[
+                    AttemptCounterModel.user_id,
+                    AttemptCounterModel.quiz_id,
+                ],
+                set_={"attempts_count": AttemptCounterModel.attempts_count + 1},
+                where=or_(
+                    allowed_attempts.is_(None),
+                    AttemptCounterModel.attempts_count < allowed_attempts,
+                ),
+            )
+            .returning(AttemptCounterModel.attempts_count)
+            .cte("counted")
+        )
+
+        expires_at = case(
+            (
+                quiz.c.time_limit_minutes > 0,
+                literal(started_at, DateTime(timezone=True))
+                + quiz.c.time_limit_minutes * literal(timedelta(minutes=1)),
             ),
+            else_=None,
+        )
+        new_attempt_values = select(
+            literal(uuid4()),
+            literal(user_id),
+            quiz.c.id,
+            literal(started_at, DateTime(timezone=True)),
+            expires_at,
+            status_literal(AttemptStatus.IN_PROGRESS),
+            literal(0.0),
+            literal(0),
+            literal(0),
+        ).select_from(quiz.join(counted, true()))
+        new_attempt = (
+            pg_insert(QuizAttemptModel)
+            .from_select(
+                [
+                    QuizAttemptModel.id,
+                    QuizAttemptModel.user_id,
+                    QuizAttemptModel.quiz_id,
+                    QuizAttemptModel.started_at,
+                    QuizAttemptModel.expires_at,
+                    QuizAttemptModel.status,
+                    QuizAttemptModel.score,
+                    QuizAttemptModel.correct_answers_count,
+                    QuizAttemptModel.total_questions_count,
+                ],
+                new_attempt_values,
+            )
+            .on_conflict_do_nothing(
+                index_elements=[QuizAttemptModel.user_id, QuizAttemptModel.quiz_id],
+                index_where=QuizAttemptModel.status
+                == status_inline(AttemptStatus.IN_PROGRESS),
+            )
+            .returning(*QuizAttemptModel.__table__.columns)
+            .cte("new_attempt")
+        )
+
+        attempt_alias = aliased(QuizAttemptModel, new_attempt, name="attempt")
+        query = (
+            select(
+                exists(member.select()).label("member_found"),
+                exists(quiz.select()).label("quiz_found"),
+                select(attempts_left)
+                .select_from(quiz.join(taken, true()))
+                .scalar_subquery()
+                .label("attempts_left"),
+                select(active.c.id).scalar_subquery().label("active_attempt_id"),
+                select(active.c.is_expired).scalar_subquery().label("active_expired"),
+                attempt_alias,
+            )
+            .select_from(taken)
+            .outerjoin(new_attempt, true())
         )
-        attempt_id = await self.db.scalar(query)
-        return attempt_id
+        result = await self.db.execute(query)
+        row = result.one()
+
+        if row.attempt is not None:
+            # New attempt has no answers, nothing to lazy load
+            set_committed_value(row.attempt, "answers", [])
+            mark_for_invalidation(self.db, CacheConfig.USER, user_id)
+        return row
 
     async def get_user_company_stats(
         self, user_id: UUID, company_id: UUID
@@ -185,47 +842,571 @@ class AttemptRepository(BaseRepository[QuizAttemptModel]):
         """
         :returns: total_correct_answers, total_questions_answered
         """
+        query = select(
+            UserCompanyStatsModel.correct_answers_count,
+            UserCompanyStatsModel.total_questions_count,
+        ).where(
+            UserCompanyStatsModel.user_id == user_id,
+            UserCompanyStatsModel.company_id == company_id,
+        )
+
+        result = await self.db.execute(query)
+        row = result.one_or_none()
+
+        return (row.correct_answers_count, row.total_questions_count) if row else (0, 0)
+
+    async def get_user_system_stats(self, user_id: UUID) -> tuple[int, int]:
+        """
+        :returns: total_correct_answers, total_questions_answered
+        """
+        query = select(
+            func.sum(UserCompanyStatsModel.correct_answers_count),
+            func.sum(UserCompanyStatsModel.total_questions_count),
+        ).where(UserCompanyStatsModel.user_id == user_id)
+        result = await self.db.execute(query)
+        correct_answers_count, total_questions_count = result.one()
+
+        return correct_answers_count or 0, total_questions_count or 0
+
+    async def add_to_user_company_stats(
+        self, attempt_ids: Iterable[UUID]
+    ) -> Sequence[tuple[UUID, UUID, int, int]]:
+        """
+        Adds the finalized attempts to the user company stats. Same transaction as the finalization, does not commit.
+        :return: Updated stats (company_id, user_id, correct_answers_count, total_questions_count)
+        """
+        return await self._upsert_user_company_stats(
+            QuizAttemptModel.id.in_(attempt_ids), increment=True
+        )
+
+    async def add_to_question_stats(self, attempt_ids: Iterable[UUID]) -> None:
+        """
+        Adds the answers of the finalized attempts to the question and option stats, graded like finalize_attempts_query.
+        Same transaction as the finalization, does not commit.
+        """
+        targets = (
+            select(QuizAttemptModel.id, QuizAttemptModel.quiz_id)
+            .where(QuizAttemptModel.id.in_(attempt_ids))
+            .cte("targets")
+        )
+        selected = selected_options_cte(targets)
+        correct = correct_options_cte(targets)
+        answers = (
+            select(
+                func.gen_random_uuid(),
+                targets.c.quiz_id,
+                selected.c.question_id,
+                func.count().filter(selected.c.option_ids.is_not(None)),
+                func.count().filter(
+                    is_correct_answer(selected=selected, correct=correct)
+                ),
+            )
+            .select_from(selected)
+            .join(targets, targets.c.id == selected.c.attempt_id)
+            .outerjoin(correct, correct.c.question_id == selected.c.question_id)
+            .group_by(targets.c.quiz_id, selected.c.question_id)
+        )
+        query = pg_insert(QuestionStatsModel).from_select(
+            [
+                QuestionStatsModel.id,
+                QuestionStatsModel.quiz_id,
+                QuestionStatsModel.question_id,
+                QuestionStatsModel.answered_count,
+                QuestionStatsModel.correct_count,
+            ],
+            answers,
+        )
+        query = query.on_conflict_do_update(
+            index_elements=[QuestionStatsModel.quiz_id, QuestionStatsModel.question_id],
+            set_={
+                name: getattr(QuestionStatsModel, name) + query.excluded[name]
+                for name in ("answered_count", "correct_count")
+            },
+        )
+        await self.db.execute(query)
+
+        picks = (
+            select(
+                func.gen_random_uuid(),
+                QuizAttemptModel.quiz_id,
+                AttemptAnswerSelectionModel.option_id,
+                func.count(),
+            )
+            .join(
+                QuizAttemptAnswerModel,
+                QuizAttemptAnswerModel.attempt_id == QuizAttemptModel.id,
+            )
+            .join(
+                QuizQuestionLinkModel,
+                and_(
+                    QuizQuestionLinkModel.quiz_id == QuizAttemptModel.quiz_id,
+                    QuizQuestionLinkModel.question_id
+                    == QuizAttemptAnswerModel.question_id,
+                ),
+            )
+            .join(
+                AttemptAnswerSelectionModel,
+                AttemptAnswerSelectionModel.answer_id == QuizAttemptAnswerModel.id,
+            )
+            .where(QuizAttemptModel.id.in_(attempt_ids))
+            .group_by(QuizAttemptModel.quiz_id, AttemptAnswerSelectionModel.option_id)
+        )
+        query = pg_insert(OptionStatsModel).from_select(
+            [
+                OptionStatsModel.id,
+                OptionStatsModel.quiz_id,
+                OptionStatsModel.option_id,
+                OptionStatsModel.picks_count,
+            ],
+            picks,
+        )
+        query = query.on_conflict_do_update(
+            index_elements=[OptionStatsModel.quiz_id, OptionStatsModel.option_id],
+            set_={
+                "picks_count": OptionStatsModel.picks_count + query.excluded.picks_count
+            },
+        )
+        await self.db.execute(query)
+
+    async def rebuild_user_company_stats(self, user_ids: Iterable[UUID]) -> None:
+        """Recalculates the user company stats from the finished attempts, replacing the stored ones. Does not commit."""
+        await self._upsert_user_company_stats(
+            QuizAttemptModel.user_id.in_(user_ids), increment=False
+        )
+
+    async def get_attempt_user_ids(
+        self, after_user_id: UUID | None, limit: int
+    ) -> Sequence[UUID]:
+        """Keyset page of the users having attempts, ordered by id."""
+        query = (
+            select(QuizAttemptModel.user_id)
+            .distinct()
+            .order_by(QuizAttemptModel.user_id)
+            .limit(limit)
+        )
+        if after_user_id is not None:
+            query = query.where(QuizAttemptModel.user_id > after_user_id)
+
+        result = await self.db.scalars(query)
+        return result.all()
+
+    async def stream_company_attempt_rows(self, company_id: UUID) -> AsyncResult[Any]:
+        """
+        Attempts of the company quizzes with a row per selected option, plain columns from a server-side cursor.
+        Attempts without answers and answers without selections get a row with empty columns.
+        Not ordered, so rows are sent as the cursor reads them instead of after a sort.
+        """
         query = (
             select(
-                func.sum(QuizAttemptModel.correct_answers_count),
-                func.sum(QuizAttemptModel.total_questions_count),
+                QuizAttemptModel.id,
+                QuizAttemptModel.user_id,
+                QuizAttemptModel.quiz_id,
+                CompanyQuizModel.version,
+                QuizAttemptModel.status,
+                QuizAttemptModel.started_at,
+                QuizAttemptModel.finished_at,
+                QuizAttemptModel.score,
+                QuizAttemptModel.correct_answers_count,
+                QuizAttemptModel.total_questions_count,
+                QuizAttemptAnswerModel.question_id,
+                AttemptAnswerSelectionModel.option_id,
+                QuestionAnswerOptionModel.is_correct,
+            )
+            .join(CompanyQuizModel, CompanyQuizModel.id == QuizAttemptModel.quiz_id)
+            .outerjoin(
+                QuizAttemptAnswerModel,
+                QuizAttemptAnswerModel.attempt_id == QuizAttemptModel.id,
+            )
+            .outerjoin(
+                AttemptAnswerSelectionModel,
+                AttemptAnswerSelectionModel.answer_id == QuizAttemptAnswerModel.id,
+            )
+            .outerjoin(
+                QuestionAnswerOptionModel,
+                QuestionAnswerOptionModel.id == AttemptAnswerSelectionModel.option_id,
+            )
+            .where(CompanyQuizModel.company_id == company_id)
+            .execution_options(yield_per=EXPORT_YIELD_PER)
+        )
+        return await self.db.stream(query)
+
+    async def get_user_company_stats_rows(
+        self, user_ids: Iterable[UUID]
+    ) -> Sequence[tuple[UUID, UUID, int, int]]:
+        """
+        Locks the users like the stats writers, until the transaction ends.
+        :return: Stats of the users in the companies they are members of (company_id, user_id, correct_answers_count, total_questions_count)
+        """
+        await self._lock_user_company_stats(QuizAttemptModel.user_id.in_(user_ids))
+        query = (
+            select(*USER_COMPANY_STATS_COLUMNS)
+            .join(
+                MemberModel,
+                and_(
+                    MemberModel.company_id == UserCompanyStatsModel.company_id,
+                    MemberModel.user_id == UserCompanyStatsModel.user_id,
+                ),
+            )
+            .where(UserCompanyStatsModel.user_id.in_(user_ids))
+        )
+        result = await self.db.execute(query)
+        return result.tuples().all()
+
+    async def get_best_quiz_scores(
+        self, user_ids: Iterable[UUID]
+    ) -> Sequence[tuple[UUID, UUID, float]]:
+        """:return: Best score of the users finished attempts per quiz of the companies they are members of (quiz_id, user_id, score)"""
+        query = (
+            select(
+                QuizAttemptModel.quiz_id,
+                QuizAttemptModel.user_id,
+                func.max(QuizAttemptModel.score),
+            )
+            .join(CompanyQuizModel, CompanyQuizModel.id == QuizAttemptModel.quiz_id)
+            .join(
+                MemberModel,
+                and_(
+                    MemberModel.company_id == CompanyQuizModel.company_id,
+                    MemberModel.user_id == QuizAttemptModel.user_id,
+                ),
             )
-            .join(CompanyQuizModel)
             .where(
-                QuizAttemptModel.user_id == user_id,
-                CompanyQuizModel.company_id == company_id,
+                QuizAttemptModel.user_id.in_(user_ids),
                 QuizAttemptModel.status.in_(
                     [AttemptStatus.COMPLETED, AttemptStatus.EXPIRED]
                 ),
             )
+            .group_by(QuizAttemptModel.quiz_id, QuizAttemptModel.user_id)
         )
+        result = await self.db.execute(query)
+        return result.tuples().all()
+
+    async def get_finished_attempts_page(
+        self,
+        quiz_id: UUID,
+        limit: int,
+        after: tuple[datetime, UUID] | None = None,
+        status: AttemptStatus | None = None,
+        min_score: float | None = None,
+        max_score: float | None = None,
+        finished_from: datetime | None = None,
+        finished_to: datetime | None = None,
+    ) -> Sequence[Row]:
+        """
+        Finished attempts of the quiz newest first, keyset paginated on (finished_at, id) over
+        ix_quiz_attempt_quiz_id_finished_at_id: a page reads about limit entries of the index
+        however deep it is, and no total is counted.
+        :param after: (finished_at, id) of the last attempt of the previous page
+        """
+        query = (
+            select(*ATTEMPT_COLUMNS)
+            .where(
+                QuizAttemptModel.quiz_id == quiz_id,
+                # Matches the partial index predicate
+                QuizAttemptModel.finished_at.is_not(None),
+            )
+            .order_by(QuizAttemptModel.finished_at.desc(), QuizAttemptModel.id.desc())
+            .limit(limit)
+        )
+        if after is not None:
+            query = query.where(
+                tuple_(QuizAttemptModel.finished_at, QuizAttemptModel.id)
+                < tuple_(*after)
+            )
+        if status is not None:
+            query = query.where(QuizAttemptModel.status == status)
+        if min_score is not None:
+            query = query.where(QuizAttemptModel.score >= min_score)
+        if max_score is not None:
+            query = query.where(QuizAttemptModel.score <= max_score)
+        if finished_from is not None:
+            query = query.where(QuizAttemptModel.finished_at >= finished_from)
+        if finished_to is not None:
+            query = query.where(QuizAttemptModel.finished_at < finished_to)
 
         result = await self.db.execute(query)
-        correct_answers_count, total_questions_count = result.one()
+        return result.all()
 
-        return correct_answers_count or 0, total_questions_count or 0
+    async def get_score_distribution(
+        self, quiz_id: UUID, buckets: int, sample_percent: float | None = None
+    ) -> Row:
+        """
+        Histogram and percentiles of the finished attempt scores of the quiz in one aggregate,
+        an index only scan of ix_quiz_attempt_quiz_id_status_score. With sample_percent each row of the quiz
+        is kept with that chance during the scan, the scan stays the same but fewer scores are aggregated and sorted.
+        :return: (attempts_count, average_score, percentiles, *count per bucket), counts of the sample
+        """
+        attempts = QuizAttemptModel.__table__
+        score = attempts.c.score
+        # Bucket buckets + 1 holds the max score, counted in the last one
+        bucket = func.least(func.width_bucket(score, 0.0, MAX_SCORE, buckets), buckets)
+        query = select(
+            func.count(),
+            func.avg(score),
+            func.percentile_cont(array(SCORE_PERCENTILES)).within_group(score),
+            *(
+                func.count().filter(bucket == number)
+                for number in range(1, buckets + 1)
+            ),
+        ).where(
+            attempts.c.quiz_id == quiz_id,
+            attempts.c.status.in_([AttemptStatus.COMPLETED, AttemptStatus.EXPIRED]),
+        )
+        if sample_percent is not None:
+            # Filtered after the quiz_id condition, unlike TABLESAMPLE which samples pages of the whole table
+            query = query.where(func.random() < sample_percent / 100)
+        result = await self.db.execute(query)
+        return result.one()
 
-    async def get_user_system_stats(self, user_id: UUID) -> tuple[int, int]:
+    async def _lock_user_company_stats(self, *criteria: Any) -> None:
         """
-        :returns: total_correct_answers, total_questions_answered
+        Transaction level advisory lock per user of the attempts matching criteria, taken in user id order.
+        Own statement, so the totals read after it see the attempts committed by the previous lock holder.
         """
-        query = (
+        users = (
+            select(QuizAttemptModel.user_id)
+            .where(*criteria)
+            .distinct()
+            .order_by(QuizAttemptModel.user_id)
+            .subquery()
+        )
+        query = select(
+            func.pg_advisory_xact_lock(
+                func.hashtextextended(
+                    cast(users.c.user_id, Text), USER_COMPANY_STATS_LOCK_SEED
+                )
+            )
+        )
+        await self.db.execute(query)
+
+    async def _upsert_user_company_stats(
+        self, *criteria: Any, increment: bool
+    ) -> Sequence[tuple[UUID, UUID, int, int]]:
+        """
+        Totals of the finished attempts matching criteria per user and company. Added to the stored totals or replace them.
+        The users are locked first, so totals replacing the stored ones can't overwrite a concurrent increment.
+        """
+        await self._lock_user_company_stats(*criteria)
+        totals = (
             select(
+                func.gen_random_uuid(),
+                QuizAttemptModel.user_id,
+                CompanyQuizModel.company_id,
                 func.sum(QuizAttemptModel.correct_answers_count),
                 func.sum(QuizAttemptModel.total_questions_count),
             )
             .join(CompanyQuizModel)
             .where(
-                QuizAttemptModel.user_id == user_id,
+                *criteria,
                 QuizAttemptModel.status.in_(
                     [AttemptStatus.COMPLETED, AttemptStatus.EXPIRED]
                 ),
             )
+            .group_by(QuizAttemptModel.user_id, CompanyQuizModel.company_id)
+        )
+        query = pg_insert(UserCompanyStatsModel).from_select(
+            [
+                UserCompanyStatsModel.id,
+                UserCompanyStatsModel.user_id,
+                UserCompanyStatsModel.company_id,
+                UserCompanyStatsModel.correct_answers_count,
+                UserCompanyStatsModel.total_questions_count,
+            ],
+            totals,
+        )
+        counters = ("correct_answers_count", "total_questions_count")
+        query = query.on_conflict_do_update(
+            index_elements=[
+                UserCompanyStatsModel.user_id,
+                UserCompanyStatsModel.company_id,
+            ],
+            set_={
+                name: (
+                    getattr(UserCompanyStatsModel, name) + query.excluded[name]
+                    if increment
+                    else query.excluded[name]
+                )
+                for name in counters
+            },
+        ).returning(*USER_COMPANY_STATS_COLUMNS)
+        result = await self.db.execute(query)
+        return result.tuples().all()
+
+    async def finalize_attempts(
+        self, *criteria: Any, finished_at: datetime
+    ) -> Sequence[QuizAttemptModel]:
+        """
+        Grades and finishes the in progress attempts matching criteria in one statement. Does not commit.
+        :return: Finalized attempts, empty if nothing was in progress.
+        """
+        query = finalize_attempts_query(*criteria, finished_at=finished_at)
+        result = await self.db.scalars(query)
+        attempts = result.all()
+
+        mark_for_invalidation(
+            self.db, CacheConfig.ATTEMPT, *(attempt.id for attempt in attempts)
+        )
+        mark_for_invalidation(
+            self.db, CacheConfig.USER, *{attempt.user_id for attempt in attempts}
+        )
+        quiz_ids = {attempt.quiz_id for attempt in attempts}
+        mark_for_invalidation(self.db, CacheConfig.QUESTION_STATS, *quiz_ids)
+        mark_for_invalidation(self.db, CacheConfig.SCORE_DISTRIBUTION, *quiz_ids)
+        return attempts
+
+    async def get_in_progress_selections(
+        self, user_id: UUID, attempt_id: UUID
+    ) -> tuple[UUID | None, list[tuple[UUID, UUID | None]]]:
+        """
+        Everything needed to grade an attempt against the answer key, in one query.
+        :return: quiz_id, None if the attempt isn't in progress, and the (question_id, option_id) selections.
+        """
+        query = (
+            select(
+                QuizAttemptModel.quiz_id,
+                QuizAttemptAnswerModel.question_id,
+                AttemptAnswerSelectionModel.option_id,
+            )
+            .outerjoin(
+                QuizAttemptAnswerModel,
+                QuizAttemptAnswerModel.attempt_id == QuizAttemptModel.id,
+            )
+            .outerjoin(
+                AttemptAnswerSelectionModel,
+                AttemptAnswerSelectionModel.answer_id == QuizAttemptAnswerModel.id,
+            )
+            .where(
+                QuizAttemptModel.id == attempt_id,
+                QuizAttemptModel.user_id == user_id,
+                QuizAttemptModel.status == AttemptStatus.IN_PROGRESS,
+            )
         )
         result = await self.db.execute(query)
-        correct_answers_count, total_questions_count = result.one()
+        rows = result.tuples().all()
+        if not rows:
+            return None, []
 
-        return correct_answers_count or 0, total_questions_count or 0
+        selections = [
+            (question_id, option_id)
+            for _, question_id, option_id in rows
+            if question_id is not None
+        ]
+        return rows[0][0], selections
+
+    async def finish_attempt(
+        self,
+        attempt_id: UUID,
+        correct_count: int,
+        total_count: int,
+        score: float,
+        finished_at: datetime,
+    ) -> QuizAttemptModel | None:
+        """
+        Finishes the in progress attempt with an already computed grade. Does not commit.
+        :return: Finished attempt, None if it was no longer in progress.
+        """
+        query = (
+            update(QuizAttemptModel)
+            .where(
+                QuizAttemptModel.id == attempt_id,
+                QuizAttemptModel.status == AttemptStatus.IN_PROGRESS,
+            )
+            .values(
+                finish_values(
+                    correct_count=correct_count,
+                    total_count=total_count,
+                    score=score,
+                    finished_at=finished_at,
+                )
+            )
+            .returning(QuizAttemptModel)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+        attempt = await self.db.scalar(query)
+        if attempt is not None:
+            mark_for_invalidation(self.db, CacheConfig.ATTEMPT, attempt.id)
+            mark_for_invalidation(self.db, CacheConfig.USER, attempt.user_id)
+            mark_for_invalidation(self.db, CacheConfig.QUESTION_STATS, attempt.quiz_id)
+            mark_for_invalidation(
+                self.db, CacheConfig.SCORE_DISTRIBUTION, attempt.quiz_id
+            )
+        return attempt
+
+    async def lock_expired_attempt_ids(
+        self, expired_before: datetime, limit: int
+    ) -> Sequence[UUID]:
+        """
+        Oldest expired in progress attempts, locked until commit. Rows locked by another transaction are skipped.
+        """
+        query = (
+            select(QuizAttemptModel.id)
+            .where(
+                QuizAttemptModel.status == status_inline(AttemptStatus.IN_PROGRESS),
+                QuizAttemptModel.expires_at <= expired_before,
+            )
+            .order_by(QuizAttemptModel.expires_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        result = await self.db.scalars(query)
+        return result.all()
+
+    async def get_in_progress_expiries(
+        self, after: tuple[datetime, UUID] | None, limit: int
+    ) -> Sequence[tuple[UUID, datetime]]:
+        """
+        Keyset page of the timed attempts in progress ordered by (expires_at, id), over ix_quiz_attempt_expires_at_in_progress.
+        :param after: (expires_at, id) of the last attempt of the previous page
+        :return: (attempt_id, expires_at)
+        """
+        query = (
+            select(QuizAttemptModel.id, QuizAttemptModel.expires_at)
+            .where(
+                QuizAttemptModel.status == status_inline(AttemptStatus.IN_PROGRESS),
+                QuizAttemptModel.expires_at.is_not(None),
+            )
+            .order_by(QuizAttemptModel.expires_at, QuizAttemptModel.id)
+            .limit(limit)
+        )
+        if after is not None:
+            query = query.where(
+                tuple_(QuizAttemptModel.expires_at, QuizAttemptModel.id)
+                > tuple_(*after)
+            )
+        result = await self.db.execute(query)
+        return result.tuples().all()
+
+    async def get_oldest_expiry(self, expired_before: datetime) -> datetime | None:
+        query = select(func.min(QuizAttemptModel.expires_at)).where(
+            QuizAttemptModel.status == status_inline(AttemptStatus.IN_PROGRESS),
+            QuizAttemptModel.expires_at <= expired_before,
+        )
+        oldest_expiry = await self.db.scalar(query)
+        return oldest_expiry
+
+    async def get_in_progress_ids(self, attempt_ids: list[UUID]) -> Sequence[UUID]:
+        query = select(QuizAttemptModel.id).where(
+            QuizAttemptModel.id.in_(attempt_ids),
+            QuizAttemptModel.status == AttemptStatus.IN_PROGRESS,
+        )
+        result = await self.db.scalars(query)
+        return result.all()
+
+    async def lock_in_progress_ids(self, attempt_ids: list[UUID]) -> Sequence[UUID]:
+        """
+        In progress attempts among attempt_ids, locked until commit so a finalization waits for the answers written
+        under the lock. Rows locked by another transaction are skipped.
+        """
+        query = (
+            select(QuizAttemptModel.id)
+            .where(
+                QuizAttemptModel.id.in_(attempt_ids),
+                QuizAttemptModel.status == AttemptStatus.IN_PROGRESS,
+            )
+            .with_for_update(skip_locked=True)
+        )
+        result = await self.db.scalars(query)
+        return result.all()
 
     async def get_attempt_status(
         self, user_id: UUID, attempt_id: UUID
@@ -240,3 +1421,56 @@ class AttemptRepository(BaseRepository[QuizAttemptModel]):
 class AnswerRepository(BaseRepository[QuizAttemptAnswerModel]):
     def __init__(self, db: AsyncSession):
         super().__init__(model=QuizAttemptAnswerModel, db=db)
+
+    async def upsert_answers(
+        self, attempt_id: UUID, answers: dict[UUID, list[UUID]]
+    ) -> Sequence[QuizAttemptAnswerModel]:
+        """
+        Replaces the selections of every answered question with three set based statements. Does not commit.
+        :param answers: question_id -> selected option ids.
+        :return: Answers, both inserted and already existing.
+        """
+        query = pg_insert(QuizAttemptAnswerModel).values(
+            [
+                {
+                    "id": get_answer_id(attempt_id=attempt_id, question_id=question_id),
+                    "attempt_id": attempt_id,
+                    "question_id": question_id,
+                }
+                for question_id in answers
+            ]
+        )
+        # No-op update, so RETURNING includes the existing answers too
+        query = query.on_conflict_do_update(
+            index_elements=[
+                QuizAttemptAnswerModel.attempt_id,
+                QuizAttemptAnswerModel.question_id,
+            ],
+            set_={"question_id": query.excluded.question_id},
+        ).returning(QuizAttemptAnswerModel)
+        result = await self.db.scalars(
+            query, execution_options={"populate_existing": True}
+        )
+        saved_answers = result.all()
+
+        await self.db.execute(
+            delete(AttemptAnswerSelectionModel).where(
+                AttemptAnswerSelectionModel.answer_id.in_(
+                    [answer.id for answer in saved_answers]
+                )
+            )
+        )
+
+        selections = [
+            {
+                "id": get_selection_id(answer_id=answer.id, option_id=option_id),
+                "answer_id": answer.id,
+                "option_id": option_id,
+            }
+            for answer in saved_answers
+            for option_id in dict.fromkeys(answers[answer.question_id])
+        ]
+        if selections:
+            await self.db.execute(insert(AttemptAnswerSelectionModel), selections)
+
+        return saved_answers
@@ -1,13 +1,16 @@
+from datetime import datetime
 from uuid import UUID
 
-from fastapi import APIRouter, status
+from fastapi import APIRouter, Query, Request, status
+from fastapi.responses import StreamingResponse
 from fastapi_cache.decorator import cache
 
-from src.auth.dependencies import GetOptionalUserJWTDep, GetUserJWTDep
-from src.company.dependencies import CompanyMemberServiceDep
-from src.core.caching.keys import endpoint_key_builder
-from src.core.dependencies import PaginationParamDep
-from src.core.schemas import PaginationResponse
+from src.auth.dependencies import GetUserJWTDep
+from src.company.dependencies import CompanyAudienceDep
+from src.core.caching.config import DAY, HOUR, CacheConfig
+from src.core.caching.keys import tagged_key_builder
+from src.core.dependencies import KeysetPaginationParamDep, PaginationParamDep
+from src.core.schemas import KeysetPaginationResponse, PaginationResponse
 
 from .dependencies import (
     AttemptLimitDep,
@@ -15,21 +18,29 @@ from .dependencies import (
     CompanyQuizServiceDep,
     QuizLimitDep,
 )
+from .enums import AttemptStatus
 from .schemas import (
     CompanyQuizAdminSchema,
     CompanyQuizBaseSchema,
     CompanyQuizQuestionAdminSchema,
     CompanyQuizQuestionSchema,
     CompanyQuizSchema,
+    LeaderboardEntrySchema,
     QuestionCreateRequestSchema,
     QuestionUpdateRequestSchema,
+    QuizAnalyticsSchema,
+    QuizAttemptAnswerBaseSchema,
     QuizAttemptAnswerSchema,
     QuizAttemptBaseSchema,
+    QuizBulkCreateRequestSchema,
     QuizCreateRequestSchema,
+    QuizImportResponseSchema,
     QuizReviewAttemptResponseSchema,
+    QuizScoreDistributionSchema,
     QuizStartAttemptResponseSchema,
     QuizUpdateRequestSchema,
     SaveAnswerRequestSchema,
+    SaveAnswersRequestSchema,
 )
 
 attempt_router = APIRouter(
@@ -59,6 +70,111 @@ async def create_company_quiz(
     return quiz
 
 
+@quiz_router.post(
+    "/bulk",
+    response_model=CompanyQuizAdminSchema,
+    status_code=status.HTTP_201_CREATED,
+)
+async def create_company_quiz_bulk(
+    quiz_service: CompanyQuizServiceDep,
+    user: GetUserJWTDep,
+    company_id: UUID,
+    quiz_info: QuizBulkCreateRequestSchema,
+):
+    """Draft quiz with all its questions and options in one request."""
+    quiz = await quiz_service.create_quiz_with_questions(
+        company_id=company_id, acting_user_id=user.id, quiz_info=quiz_info
+    )
+    return quiz
+
+
+@quiz_router.get("/export", status_code=status.HTTP_200_OK)
+async def export_company_quizzes(
+    quiz_service: CompanyQuizServiceDep,
+    user: GetUserJWTDep,
+    company_id: UUID,
+    latest_only: bool = False,
+):
+    """NDJSON stream, a quiz line followed by its question lines. Accepted as is by the import."""
+    lines = await quiz_service.export_quizzes(
+        company_id=company_id, acting_user_id=user.id, latest_only=latest_only
+    )
+    return StreamingResponse(
+        lines,
+        media_type="application/x-ndjson",
+        headers={
+            "Content-Disposition": f'attachment; filename="quizzes-{company_id}.ndjson"'
+        },
+    )
+
+
+@quiz_router.get("/attempts/export", status_code=status.HTTP_200_OK)
+async def export_company_attempts(
+    attempt_service: AttemptServiceDep,
+    user: GetUserJWTDep,
+    company_id: UUID,
+):
+    """CSV stream of every attempt of the company quizzes, a row per selected option."""
+    chunks = await attempt_service.export_company_attempts(
+        company_id=company_id, acting_user_id=user.id
+    )
+    return StreamingResponse(
+        chunks,
+        media_type="text/csv",
+        headers={
+            "Content-Disposition": f'attachment; filename="attempts-{company_id}.csv"'
+        },
+    )
+
+
+@quiz_router.get(
+    "/leaderboard",
+    response_model=list[LeaderboardEntrySchema],
+    status_code=status.HTTP_200_OK,
+)
+async def get_company_leaderboard(
+    attempt_service: AttemptServiceDep,
+    user: GetUserJWTDep,
+    company_id: UUID,
+    limit: int = Query(default=10, ge=1, le=100, description="Top entries"),
+):
+    return await attempt_service.get_company_leaderboard(
+        company_id=company_id, acting_user_id=user.id, limit=limit
+    )
+
+
+@quiz_router.get(
+    "/leaderboard/me",
+    response_model=LeaderboardEntrySchema,
+    status_code=status.HTTP_200_OK,
+)
+async def get_company_rank(
+    attempt_service: AttemptServiceDep,
+    user: GetUserJWTDep,
+    company_id: UUID,
+):
+    return await attempt_service.get_company_rank(
+        company_id=company_id, acting_user_id=user.id
+    )
+
+
+@quiz_router.post(
+    "/import",
+    response_model=QuizImportResponseSchema,
+    status_code=status.HTTP_201_CREATED,
+)
+async def import_company_quizzes(
+    request: Request,
+    quiz_service: CompanyQuizServiceDep,
+    user: GetUserJWTDep,
+    company_id: UUID,
+):
+    """Raw NDJSON body of an export, read as a stream. Quizzes are created as hidden drafts."""
+    return await quiz_service.import_quizzes(
+        company_id=company_id, acting_user_id=user.id, body=request.stream()
+    )
+
+
 @quiz_router.post(
     "/{quiz_id}/publish",
     response_model=CompanyQuizAdminSchema,
@@ -93,23 +209,18 @@ async def delete_company_quiz(
     response_model=CompanyQuizAdminSchema | CompanyQuizSchema,
     status_code=status.HTTP_200_OK,
 )
-@cache(expire=600, key_builder=endpoint_key_builder)
 async def get_quiz(
-    member_service: CompanyMemberServiceDep,
+    request: Request,
     quiz_service: CompanyQuizServiceDep,
-    user: GetOptionalUserJWTDep,
+    audience: CompanyAudienceDep,
     company_id: UUID,
     quiz_id: UUID,
 ):
-    user_id = user.id if user else None
-    is_admin = await member_service.has_admin_permission(
-        company_id=company_id, user_id=user_id
+    """Pre-rendered snapshot with a strong ETag, If-None-Match gets 304 Not Modified."""
+    snapshot = await quiz_service.get_quiz_snapshot(
+        company_id=company_id, is_admin=audience.is_admin, quiz_id=quiz_id
     )
-    quiz = await quiz_service.get_quiz(
-        company_id=company_id, is_admin=is_admin, quiz_id=quiz_id
-    )
-    # Service layer already handles schema transformation
-    return quiz
+    return snapshot.to_response(request=request)
 
 
 @quiz_router.get(
@@ -117,19 +228,21 @@ async def get_quiz(
     response_model=PaginationResponse[CompanyQuizBaseSchema],
     status_code=status.HTTP_200_OK,
 )
-@cache(expire=60, key_builder=endpoint_key_builder)
+@cache(
+    expire=6 * HOUR,
+    key_builder=tagged_key_builder(CacheConfig.COMPANY, per_audience=True),
+)
 async def get_quizzes(
     quiz_service: CompanyQuizServiceDep,
-    user: GetOptionalUserJWTDep,
+    audience: CompanyAudienceDep,
     company_id: UUID,
     pagination: PaginationParamDep,
 ):
-    user_id = user.id if user else None
     quizzes = await quiz_service.get_quizzes_paginated(
         company_id=company_id,
         page=pagination.page,
         page_size=pagination.page_size,
-        user_id=user_id,
+        is_admin=audience.is_admin,
     )
     return quizzes
 
@@ -201,21 +314,18 @@ async def delete_question(
     | list[CompanyQuizQuestionSchema],
     status_code=status.HTTP_200_OK,
 )
-@cache(expire=600, key_builder=endpoint_key_builder)
 async def get_questions(
+    request: Request,
     quiz_service: CompanyQuizServiceDep,
-    member_service: CompanyMemberServiceDep,
-    user: GetUserJWTDep,
+    audience: CompanyAudienceDep,
     company_id: UUID,
     quiz_id: UUID,
 ):
-    is_admin = await member_service.has_admin_permission(
-        company_id=company_id, user_id=user.id
+    """Pre-rendered snapshot with a strong ETag, If-None-Match gets 304 Not Modified."""
+    snapshot = await quiz_service.get_questions_snapshot(
+        company_id=company_id, quiz_id=quiz_id, is_admin=audience.is_admin
     )
-    questions = await quiz_service.get_questions_with_options(
-        company_id=company_id, quiz_id=quiz_id, is_admin=is_admin
-    )
-    return questions
+    return snapshot.to_response(request=request)
 
 
 @quiz_router.patch(
@@ -243,7 +353,7 @@ async def update_question_full(
 
 @quiz_router.post(
     "/{quiz_id}/versions",
-    response_model=CompanyQuizAdminSchema,
+    response_model=CompanyQuizAdminSchema | CompanyQuizBaseSchema,
     status_code=status.HTTP_201_CREATED,
 )
 async def create_new_quiz_version_within_company(
@@ -251,13 +361,97 @@ async def create_new_quiz_version_within_company(
     user: GetUserJWTDep,
     company_id: UUID,
     quiz_id: UUID,
+    include_questions: bool = Query(
+        default=True, description="False returns the new version without questions"
+    ),
 ):
     quiz = await quiz_service.create_new_version_within_company(
-        company_id=company_id, acting_user_id=user.id, curr_quiz_id=quiz_id
+        company_id=company_id,
+        acting_user_id=user.id,
+        curr_quiz_id=quiz_id,
+        include_questions=include_questions,
     )
     return quiz
 
 
+@quiz_router.get(
+    "/{quiz_id}/analytics",
+    response_model=QuizAnalyticsSchema,
+    status_code=status.HTTP_200_OK,
+)
+async def get_quiz_analytics(
+    quiz_service: CompanyQuizServiceDep,
+    user: GetUserJWTDep,
+    company_id: UUID,
+    quiz_id: UUID,
+):
+    """Answered, correct and per option pick counts of every question, for admins."""
+    return await quiz_service.get_quiz_analytics(
+        company_id=company_id, quiz_id=quiz_id, acting_user_id=user.id
+    )
+
+
+@quiz_router.get(
+    "/{quiz_id}/scores",
+    response_model=QuizScoreDistributionSchema,
+    status_code=status.HTTP_200_OK,
+)
+async def get_quiz_score_distribution(
+    attempt_service: AttemptServiceDep,
+    user: GetUserJWTDep,
+    company_id: UUID,
+    quiz_id: UUID,
+    buckets: int = Query(default=10, ge=1, le=50, description="Histogram buckets"),
+    sample_percent: float | None = Query(
+        default=None,
+        gt=0,
+        le=100,
+        description="Approximate from this share of the quiz attempts, None is exact",
+    ),
+):
+    """Histogram and percentiles of the finished attempt scores, for admins."""
+    return await attempt_service.get_score_distribution(
+        company_id=company_id,
+        quiz_id=quiz_id,
+        acting_user_id=user.id,
+        buckets=buckets,
+        sample_percent=sample_percent,
+    )
+
+
+@quiz_router.get(
+    "/{quiz_id}/leaderboard",
+    response_model=list[LeaderboardEntrySchema],
+    status_code=status.HTTP_200_OK,
+)
+async def get_quiz_leaderboard(
+    attempt_service: AttemptServiceDep,
+    user: GetUserJWTDep,
+    company_id: UUID,
+    quiz_id: UUID,
+    limit: int = Query(default=10, ge=1, le=100, description="Top entries"),
+):
+    return await attempt_service.get_quiz_leaderboard(
+        company_id=company_id, quiz_id=quiz_id, acting_user_id=user.id, limit=limit
+    )
+
+
+@quiz_router.get(
+    "/{quiz_id}/leaderboard/me",
+    response_model=LeaderboardEntrySchema,
+    status_code=status.HTTP_200_OK,
+)
+async def get_quiz_rank(
+    attempt_service: AttemptServiceDep,
+    user: GetUserJWTDep,
+    company_id: UUID,
+    quiz_id: UUID,
+):
+    return await attempt_service.get_quiz_rank(
+        company_id=company_id, quiz_id=quiz_id, acting_user_id=user.id
+    )
+
+
 @quiz_router.post(
     "/{quiz_id}/attempts",
     response_model=QuizStartAttemptResponseSchema,
@@ -275,6 +469,40 @@ async def start_quiz_attempt(
     return {"questions": questions, "attempt": attempt}
 
 
+@quiz_router.get(
+    "/{quiz_id}/attempts",
+    response_model=KeysetPaginationResponse[QuizAttemptBaseSchema],
+    status_code=status.HTTP_200_OK,
+)
+async def get_quiz_attempts_for_review(
+    attempt_service: AttemptServiceDep,
+    user: GetUserJWTDep,
+    company_id: UUID,
+    quiz_id: UUID,
+    pagination: KeysetPaginationParamDep,
+    attempt_status: AttemptStatus | None = Query(
+        default=None, alias="status", description="Only finished attempts are listed"
+    ),
+    min_score: float | None = Query(default=None, ge=0, le=100),
+    max_score: float | None = Query(default=None, ge=0, le=100),
+    finished_from: datetime | None = Query(default=None, description="Inclusive"),
+    finished_to: datetime | None = Query(default=None, description="Exclusive"),
+):
+    """Finished attempts of all members for the quiz, newest first, for admins to review."""
+    return await attempt_service.get_quiz_attempts_for_review(
+        company_id=company_id,
+        quiz_id=quiz_id,
+        acting_user_id=user.id,
+        page_size=pagination.page_size,
+        cursor=pagination.cursor,
+        status=attempt_status,
+        min_score=min_score,
+        max_score=max_score,
+        finished_from=finished_from,
+        finished_to=finished_to,
+    )
+
+
 @attempt_router.post(
     "/{attempt_id}/questions/{question_id}/answer",
     response_model=QuizAttemptAnswerSchema,
@@ -296,6 +524,22 @@ async def save_quiz_answer(
     return answer
 
 
+@attempt_router.post(
+    "/{attempt_id}/answers",
+    response_model=list[QuizAttemptAnswerBaseSchema],
+    status_code=status.HTTP_200_OK,
+)
+async def save_quiz_answers(
+    attempt_service: AttemptServiceDep,
+    user: GetUserJWTDep,
+    attempt_id: UUID,
+    answers_info: SaveAnswersRequestSchema,
+):
+    return await attempt_service.save_answers(
+        user_id=user.id, attempt_id=attempt_id, answers_info=answers_info
+    )
+
+
 @attempt_router.post(
     "/{attempt_id}/submit",
     response_model=QuizAttemptBaseSchema,
@@ -309,7 +553,7 @@ async def submit_quiz_attempt(
     return await attempt_service.submit_attempt(user_id=user.id, attempt_id=attempt_id)
 
 
-@attempt_router.get(  # TODO? add router for the admin to review member answers
+@attempt_router.get(
     "/{attempt_id}/active",
     response_model=QuizStartAttemptResponseSchema,
     status_code=status.HTTP_200_OK,
@@ -331,7 +575,10 @@ async def get_active_attempt(
     response_model=QuizReviewAttemptResponseSchema,
     status_code=status.HTTP_200_OK,
 )
-@cache(expire=600, key_builder=endpoint_key_builder)
+@cache(
+    expire=DAY,
+    key_builder=tagged_key_builder(CacheConfig.ATTEMPT, CacheConfig.USER),
+)
 async def get_quiz_attempt_results(
     attempt_service: AttemptServiceDep,
     user: GetUserJWTDep,
@@ -348,7 +595,9 @@ async def get_quiz_attempt_results(
     response_model=PaginationResponse[QuizAttemptBaseSchema],
     status_code=status.HTTP_200_OK,
 )
-@cache(expire=60, key_builder=endpoint_key_builder)  # Critical endpoint
+@cache(
+    expire=6 * HOUR, key_builder=tagged_key_builder(CacheConfig.USER)
+)  # Critical endpoint
 async def get_attempts(
     attempt_service: AttemptServiceDep,
     user: GetUserJWTDep,
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from datetime import datetime, timezone
+from typing import Annotated, Literal
 from uuid import UUID
 
 from pydantic import BaseModel, Field, computed_field, field_validator
@@ -21,7 +22,6 @@ class QuestionAnswerOptionAdminSchema(QuestionAnswerOptionBaseSchema):
 
 class CompanyQuizQuestionBaseSchema(Base, TimestampMixin):
     id: UUID
-    quiz_id: UUID
     text: str
     points: float
 
@@ -112,6 +112,24 @@ class QuizAttemptAdminSchema(QuizAttemptBaseSchema):
     answers: list[QuizAttemptAnswerAdminSchema]
 
 
+class QuizAnswerKeySchema(Base):
+    """
+    Correct options per question of a published quiz. Published quizzes are immutable, so it's built once.
+    option_ids is the option index, every option per question, used to validate answers.
+    option_texts let the buffered answers be returned without loading the questions.
+    """
+
+    quiz_id: UUID
+    correct_option_ids: dict[UUID, frozenset[UUID]]
+    option_ids: dict[UUID, frozenset[UUID]]
+    option_texts: dict[UUID, str]
+    total_points: float
+
+    @property
+    def questions_count(self) -> int:
+        return len(self.correct_option_ids)
+
+
 # ----------------------------------------------- RESPONSES -------------------------------------------------
 
 
@@ -127,6 +145,68 @@ class QuizReviewAttemptResponseSchema(Base):
     attempt: QuizAttemptAdminSchema
 
 
+class OptionStatsSchema(Base):
+    option_id: UUID
+    text: str
+    is_correct: bool
+    picks_count: int
+
+
+class QuestionStatsSchema(Base):
+    question_id: UUID
+    text: str
+    answered_count: int
+    correct_count: int
+    options: list[OptionStatsSchema]
+
+    @computed_field
+    @property
+    def correct_rate(self) -> float:
+        """Share of the answers that were correct, low means a hard question."""
+        if not self.answered_count:
+            return 0.0
+        return self.correct_count / self.answered_count
+
+
+class QuizAnalyticsSchema(Base):
+    """Per question stats of the finished attempts, for quiz authors."""
+
+    quiz_id: UUID
+    questions: list[QuestionStatsSchema]
+
+
+class ScoreBucketSchema(Base):
+    min_score: float
+    max_score: float = Field(description="Exclusive, except 100 of the last bucket")
+    count: int
+
+
+class QuizScoreDistributionSchema(Base):
+    """Score histogram and percentiles of the finished attempts of a quiz version."""
+
+    quiz_id: UUID
+    attempts_count: int
+    average_score: float | None
+    percentiles: dict[str, float] = Field(
+        description="Score per percentile, p50 is the median"
+    )
+    buckets: list[ScoreBucketSchema]
+    sample_percent: float | None = Field(
+        description="Share of the quiz attempts sampled, counts are estimated from it. None for exact results"
+    )
+
+
+class LeaderboardEntrySchema(Base):
+    rank: int = Field(description="1 is the highest score")
+    user_id: UUID
+    score: float
+
+
+class QuizImportResponseSchema(Base):
+    quizzes_count: int
+    questions_count: int
+
+
 # ----------------------------------------------- MIXIN -------------------------------------------------
 
 
@@ -201,5 +281,56 @@ class AnswerOptionsCreateRequestSchema(Base):
     is_correct: bool = Field(False)
 
 
+class QuestionBulkCreateRequestSchema(QuestionCreateRequestSchema):
+    points: float = Field(1.0, gt=0, le=100)
+
+
+class QuizBulkCreateRequestSchema(QuizCreateRequestSchema):
+    """Whole quiz tree, the question rules of publishing are checked on the request itself."""
+
+    questions: list[QuestionBulkCreateRequestSchema] = Field(
+        min_length=2, max_length=1000
+    )
+
+
+class QuizTransferSchema(QuizCreateRequestSchema):
+    """Quiz line of the NDJSON export, ids are the ones of the exporting company."""
+
+    type: Literal["quiz"] = "quiz"
+    id: UUID
+    root_quiz_id: UUID | None = None
+    version: int = Field(1, ge=1)
+    allowed_attempts: int | None = Field(None, ge=1)
+
+
+class QuestionTransferSchema(QuestionBulkCreateRequestSchema):
+    """Question line of the NDJSON export, follows the line of its quiz."""
+
+    type: Literal["question"] = "question"
+    quiz_id: UUID
+
+
+TransferLineSchema = Annotated[
+    QuizTransferSchema | QuestionTransferSchema, Field(discriminator="type")
+]
+
+
 class SaveAnswerRequestSchema(Base):
     ids: list[UUID]
+
+
+class QuestionAnswerRequestSchema(SaveAnswerRequestSchema):
+    question_id: UUID
+
+
+class SaveAnswersRequestSchema(Base):
+    answers: list[QuestionAnswerRequestSchema] = Field(min_length=1, max_length=200)
+
+    @field_validator("answers")
+    @classmethod
+    def unique_questions(
+        cls, answers: list[QuestionAnswerRequestSchema]
+    ) -> list[QuestionAnswerRequestSchema]:
+        if len({answer.question_id for answer in answers}) != len(answers):
+            raise ValueError("Each question can be answered only once")
+        return answers
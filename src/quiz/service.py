@@ -1,5 +1,5 @@
-from datetime import datetime, timedelta, timezone
-from typing import Any, Sequence
+from datetime import datetime, timezone
+from typing import Any, AsyncIterable, AsyncIterator, Awaitable, Callable, Sequence
 from uuid import UUID, uuid4
 
 from sqlalchemy.orm import InstrumentedAttribute, selectinload
@@ -10,14 +10,24 @@ from src.auth.schemas import UserAverageSystemStatsResponseSchema
 from src.company.schemas import UserAverageCompanyStatsResponseSchema
 from src.company.service import MemberService
 from src.core.caching.config import CacheConfig
-from src.core.caching.decorators import cache_with_mapping
-from src.core.exceptions import InstanceNotFoundException, ResourceConflictException
+from src.core.caching.decorators import cache_not_found, cache_with_mapping
+from src.core.caching.generations import get_generations
+from src.core.caching.serializers import serialize
+from src.core.config import settings
+from src.core.exceptions import (
+    InstanceNotFoundException,
+    ResourceConflictException,
+    UserIsNotACompanyMemberException,
+)
 from src.core.logger import logger
-from src.core.schemas import PaginationResponse
+from src.core.schemas import KeysetPaginationResponse, PaginationResponse
 from src.core.service import BaseService
 from src.core.utils import sanitize
 
+from .answer_buffer import AnswerBuffer
 from .enums import AttemptStatus
+from .expiry_queue import ExpiryQueue
+from .leaderboard import Leaderboard
 from .models import AttemptAnswerSelection as AttemptAnswerSelectionModel
 from .models import CompanyQuiz as CompanyQuizModel
 from .models import CompanyQuizQuestion as CompanyQuizQuestionModel
@@ -37,32 +47,59 @@ from .schemas import (
     CompanyQuizQuestionAdminSchema,
     CompanyQuizQuestionSchema,
     CompanyQuizSchema,
+    LeaderboardEntrySchema,
     QuestionAnswerOptionAdminSchema,
     QuestionCreateRequestSchema,
     QuestionUpdateRequestSchema,
+    QuizAnalyticsSchema,
+    QuizAnswerKeySchema,
     QuizAttemptAdminSchema,
     QuizAttemptAnswerAdminSchema,
+    QuizAttemptAnswerBaseSchema,
+    QuizAttemptAnswerSchema,
     QuizAttemptBaseSchema,
     QuizAttemptSchema,
+    QuizBulkCreateRequestSchema,
     QuizCreateRequestSchema,
+    QuizImportResponseSchema,
     QuizReviewAttemptResponseSchema,
+    QuizScoreDistributionSchema,
     QuizStartAttemptResponseSchema,
     QuizUpdateRequestSchema,
     SaveAnswerRequestSchema,
+    SaveAnswersRequestSchema,
+)
+from .snapshots import (
+    QUESTIONS_VIEW,
+    QUIZ_VIEW,
+    QuizSnapshot,
+    QuizSnapshotStore,
+    get_snapshot_name,
 )
 from .utils.attempt_logic import (
     answer_filters,
     assert_in_progress,
+    assert_valid_answers,
     assert_viewable,
     attempt_filters,
     attempt_filters_by_quiz,
-    calc_correct_answers_count,
+    build_answer_schema,
+    build_attempts_page,
+    build_score_distribution,
     calc_score,
-    finalize_attempt_options,
+    get_answer_id,
+    get_company_scores,
+    get_question_options,
+    get_unscored_user_ids,
+    merge_buffered_answers,
+    parse_attempt_cursor,
     user_attempts_order_rules,
 )
+from .utils.grading import build_answer_key, grade_selections
 from .utils.quiz_logic import (
     assert_valid_question,
+    build_question_rows,
+    build_quiz_analytics,
     get_all_quiz_filters,
     get_all_quizzes_filters,
     get_visible_quiz_filters,
@@ -70,6 +107,17 @@ from .utils.quiz_logic import (
     update_question_options,
     validate_quiz,
 )
+from .utils.transfer import (
+    IMPORT_CHUNK_SIZE,
+    QuizImportBatch,
+    attempt_csv_chunks,
+    chunk_lines,
+    export_lines,
+    iter_ndjson,
+)
+
+# Each lost race or expired active attempt costs one more start statement
+START_ATTEMPT_TRIES = 3
 
 
 class QuizService(BaseService[QuizRepository, CompanyQuizModel]):
@@ -82,10 +130,14 @@ class QuizService(BaseService[QuizRepository, CompanyQuizModel]):
         quiz_repo: QuizRepository,
         question_repo: QuestionRepository,
         member_service: MemberService,
+        snapshots: QuizSnapshotStore,
+        leaderboard: Leaderboard,
     ):
         super().__init__(repo=quiz_repo)
         self.member_service = member_service
         self.question_repo = question_repo
+        self.snapshots = snapshots
+        self.leaderboard = leaderboard
 
     async def _get_quiz_model(
         self,
@@ -109,6 +161,20 @@ class QuizService(BaseService[QuizRepository, CompanyQuizModel]):
 
         return quiz
 
+    @cache_with_mapping(
+        config=CacheConfig.ANSWER_KEY, response_schema=QuizAnswerKeySchema
+    )
+    async def get_answer_key(self, quiz_id: UUID) -> QuizAnswerKeySchema | None:
+        """
+        Correct options of a published quiz, built once and kept until the quiz is deleted.
+        :return: None if the quiz isn't published or has no questions.
+        """
+        rows = await self.question_repo.get_answer_key_rows(quiz_id=quiz_id)
+        if not rows:
+            return None
+        return build_answer_key(quiz_id=quiz_id, rows=rows)
+
+    @cache_not_found(config=CacheConfig.QUIZ)
     async def get_quiz(
         self, company_id: UUID, quiz_id: UUID, is_admin: bool
     ) -> CompanyQuizAdminSchema | CompanyQuizSchema:
@@ -129,14 +195,6 @@ class QuizService(BaseService[QuizRepository, CompanyQuizModel]):
         )
 
     @cache_with_mapping(config=CacheConfig.QUIZ, response_schema=None)
-    async def get_quiz_time_limit_minutes(
-        self, company_id: UUID, quiz_id: UUID
-    ) -> int | None:
-        time_limit_minutes = await self.repo.get_time_limit_minutes(
-            company_id=company_id, quiz_id=quiz_id
-        )
-        return time_limit_minutes
-
     @cache_with_mapping(
         config=CacheConfig.QUIZ, response_schema=CompanyQuizQuestionAdminSchema
     )
@@ -165,15 +223,72 @@ class QuizService(BaseService[QuizRepository, CompanyQuizModel]):
             is_admin=is_admin,
         )
 
-    async def get_quizzes_paginated(
-        self, company_id: UUID, user_id: UUID | None, page: int, page_size: int
-    ) -> PaginationResponse[CompanyQuizBaseSchema]:
-        is_admin = False
-        if user_id:
-            is_admin = self.member_service.has_admin_permission(
-                company_id=company_id, user_id=user_id
+    async def get_quiz_snapshot(
+        self, company_id: UUID, quiz_id: UUID, is_admin: bool
+    ) -> QuizSnapshot:
+        """get_quiz() rendered to JSON once per quiz generation, served as is."""
+        return await self._get_snapshot(
+            company_id=company_id,
+            quiz_id=quiz_id,
+            name=get_snapshot_name(QUIZ_VIEW, is_admin),
+            build=lambda: self.get_quiz(
+                company_id=company_id, quiz_id=quiz_id, is_admin=is_admin
+            ),
+        )
+
+    async def get_questions_snapshot(
+        self, company_id: UUID, quiz_id: UUID, is_admin: bool
+    ) -> QuizSnapshot:
+        """get_questions_with_options() rendered to JSON once per quiz generation, served as is."""
+        return await self._get_snapshot(
+            company_id=company_id,
+            quiz_id=quiz_id,
+            name=get_snapshot_name(QUESTIONS_VIEW, is_admin),
+            build=lambda: self.get_questions_with_options(
+                company_id=company_id, quiz_id=quiz_id, is_admin=is_admin
+            ),
+        )
+
+    async def _get_snapshot(
+        self,
+        company_id: UUID,
+        quiz_id: UUID,
+        name: str,
+        build: Callable[[], Awaitable[Any]],
+    ) -> QuizSnapshot:
+        """Snapshots are keyed by the QUIZ generation, any change of the quiz makes them unreachable."""
+        (generation,) = await get_generations(
+            CacheConfig.QUIZ.get_generation_key(quiz_id)
+        )
+        snapshot = await self.snapshots.get(
+            company_id=company_id, quiz_id=quiz_id, generation=generation, name=name
+        )
+        if snapshot is not None:
+            return snapshot
+
+        snapshot = QuizSnapshot.render(serialize(await build()))
+        await self.snapshots.save(
+            company_id=company_id,
+            quiz_id=quiz_id,
+            generation=generation,
+            snapshots={name: snapshot},
+        )
+        return snapshot
+
+    async def _warm_snapshots(self, company_id: UUID, quiz_id: UUID) -> None:
+        """Renders every view for both audiences, once the invalidations of the publish commit have run."""
+        await self.repo.wait_for_invalidations()
+        for is_admin in (True, False):
+            await self.get_quiz_snapshot(
+                company_id=company_id, quiz_id=quiz_id, is_admin=is_admin
+            )
+            await self.get_questions_snapshot(
+                company_id=company_id, quiz_id=quiz_id, is_admin=is_admin
             )
 
+    async def get_quizzes_paginated(
+        self, company_id: UUID, is_admin: bool, page: int, page_size: int
+    ) -> PaginationResponse[CompanyQuizBaseSchema]:
         if is_admin:
             filters = get_all_quizzes_filters(company_id=company_id)
         else:
@@ -213,6 +328,112 @@ class QuizService(BaseService[QuizRepository, CompanyQuizModel]):
 
         return CompanyQuizAdminSchema.model_validate(new_quiz)
 
+    async def create_quiz_with_questions(
+        self,
+        company_id: UUID,
+        acting_user_id: UUID,
+        quiz_info: QuizBulkCreateRequestSchema,
+    ) -> CompanyQuizAdminSchema:
+        """
+        Creates a draft quiz with all its questions and options in one transaction, version = 1.
+        Permissions are checked once, rows are inserted with bulk statements and the response is built from them.
+        """
+        await self.member_service.assert_admin_permissions(
+            company_id=company_id, user_id=acting_user_id
+        )
+
+        quiz_data = quiz_info.model_dump(exclude={"questions"})
+        new_quiz = CompanyQuizModel(id=uuid4(), **quiz_data, company_id=company_id)
+        question_rows, link_rows, option_rows = build_question_rows(
+            quiz_id=new_quiz.id,
+            questions=quiz_info.questions,
+            created_at=datetime.now(timezone.utc),
+        )
+        await self.repo.add_quiz_with_questions(
+            quiz=new_quiz,
+            question_rows=question_rows,
+            link_rows=link_rows,
+            option_rows=option_rows,
+        )
+        await self.repo.commit()
+        logger.info(
+            f"Created new quiz: {new_quiz.id} with {len(question_rows)} questions company {company_id} by {acting_user_id}"
+        )
+
+        options: dict[UUID, list[dict[str, Any]]] = {}
+        for option in option_rows:
+            options.setdefault(option["question_id"], []).append(option)
+        questions = [
+            {**question, "options": options[question["id"]]}
+            for question in question_rows
+        ]
+        return CompanyQuizAdminSchema.model_validate(
+            {
+                **CompanyQuizBaseSchema.model_validate(new_quiz).model_dump(),
+                "questions": questions,
+            }
+        )
+
+    async def export_quizzes(
+        self, company_id: UUID, acting_user_id: UUID, latest_only: bool
+    ) -> AsyncIterator[str]:
+        """
+        NDJSON export of the company quizzes with questions and correct options, see utils.transfer.
+        Rows are streamed from a server-side cursor, memory doesn't grow with the company.
+        :param latest_only: Only the last version of every quiz.
+        :return: Chunks of lines, to be streamed as the response.
+        """
+        await self.member_service.assert_admin_permissions(
+            company_id=company_id, user_id=acting_user_id
+        )
+
+        rows = await self.repo.stream_export_rows(
+            company_id=company_id, latest_only=latest_only
+        )
+        logger.info(f"Exporting quizzes of company {company_id} by {acting_user_id}")
+        return chunk_lines(export_lines(rows))
+
+    async def import_quizzes(
+        self, company_id: UUID, acting_user_id: UUID, body: AsyncIterable[bytes]
+    ) -> QuizImportResponseSchema:
+        """
+        Imports an NDJSON export as hidden drafts. The body is parsed as it arrives and inserted in chunks,
+        all in one transaction, so an invalid line imports nothing.
+        :param body: Raw request body chunks.
+        """
+        await self.member_service.assert_admin_permissions(
+            company_id=company_id, user_id=acting_user_id
+        )
+
+        batch = QuizImportBatch(
+            company_id=company_id, created_at=datetime.now(timezone.utc)
+        )
+        async for line_number, record in iter_ndjson(body):
+            batch.add(line_number=line_number, record=record)
+            if len(batch) >= IMPORT_CHUNK_SIZE:
+                await self._insert_import_batch(company_id=company_id, batch=batch)
+        await self._insert_import_batch(company_id=company_id, batch=batch)
+
+        await self.repo.commit()
+        logger.info(
+            f"Imported {batch.quizzes_count} quizzes, {batch.questions_count} questions company {company_id} by {acting_user_id}"
+        )
+        return QuizImportResponseSchema(
+            quizzes_count=batch.quizzes_count, questions_count=batch.questions_count
+        )
+
+    async def _insert_import_batch(
+        self, company_id: UUID, batch: QuizImportBatch
+    ) -> None:
+        quiz_rows, question_rows, link_rows, option_rows = batch.take()
+        await self.repo.bulk_insert_quizzes(
+            company_id=company_id,
+            quiz_rows=quiz_rows,
+            question_rows=question_rows,
+            link_rows=link_rows,
+            option_rows=option_rows,
+        )
+
     async def create_question(
         self,
         company_id: UUID,
@@ -226,11 +447,10 @@ class QuizService(BaseService[QuizRepository, CompanyQuizModel]):
         await self._assert_quiz_not_published(company_id=company_id, quiz_id=quiz_id)
 
         question_data = question_info.model_dump()
-        question = CompanyQuizQuestionModel(
-            id=uuid4(), quiz_id=quiz_id, **question_data
-        )
+        question = CompanyQuizQuestionModel(id=uuid4(), **question_data)
 
-        await self.repo.save(question)
+        self.question_repo.add_question(quiz_id=quiz_id, question=question)
+        await self.repo.commit()
         logger.info(
             f"Created new question: {question.id} quiz {quiz_id} by {acting_user_id}"
         )
@@ -250,13 +470,13 @@ class QuizService(BaseService[QuizRepository, CompanyQuizModel]):
         )
         await self._assert_quiz_not_published(company_id=company_id, quiz_id=quiz_id)
 
-        question = await self._get_question_model(
+        question = await self._get_writable_question_model(
             company_id=company_id, quiz_id=quiz_id, question_id=question_id
         )
 
         options_data = options_info.model_dump()
         options = QuestionAnswerOptionModel(
-            id=uuid4(), question_id=question_id, **options_data
+            id=uuid4(), question_id=question.id, **options_data
         )
         question.options.append(options)
 
@@ -286,11 +506,30 @@ class QuizService(BaseService[QuizRepository, CompanyQuizModel]):
         quiz = await self._get_quiz_model(
             company_id=company_id, quiz_id=quiz_id, is_admin=True
         )
+        stats = await self.repo.subtract_from_user_company_stats(
+            company_id=company_id, quiz_id=quiz_id
+        )
+        await self.question_repo.delete_unshared_questions(quiz_id=quiz_id)
         await self.repo.delete_instance(quiz)
         logger.info(f"Deleted quiz: {quiz_id} company {company_id} by {acting_user_id}")
 
+        # Stats rows stay locked until the commit, so a concurrent finalization can't be overwritten
+        try:
+            await self.leaderboard.set_company_scores(*get_company_scores(stats))
+            await self.leaderboard.remove_members(
+                company_id, (), *get_unscored_user_ids(stats)
+            )
+        except Exception:
+            # rebuild_leaderboards() restores the boards
+            logger.exception(f"Company leaderboard update of quiz {quiz_id} failed")
         await self.repo.commit()
 
+        try:
+            await self.leaderboard.delete_quiz(quiz_id=quiz_id)
+        except Exception:
+            # Quiz is deleted already, its board is left unread
+            logger.exception(f"Leaderboard delete of quiz {quiz_id} failed")
+
     async def delete_question(
         self,
         company_id: UUID,
@@ -303,10 +542,12 @@ class QuizService(BaseService[QuizRepository, CompanyQuizModel]):
         )
         await self._assert_quiz_not_published(company_id=company_id, quiz_id=quiz_id)
 
-        question = await self._get_question_model(
+        await self._get_question_model(
             company_id=company_id, quiz_id=quiz_id, question_id=question_id
         )
-        await self.repo.delete_instance(question)
+        await self.question_repo.unlink_question(
+            quiz_id=quiz_id, question_id=question_id
+        )
         logger.info(
             f"Deleted question: {question_id} quiz_id {quiz_id} company {company_id} by {acting_user_id}"
         )
@@ -314,52 +555,57 @@ class QuizService(BaseService[QuizRepository, CompanyQuizModel]):
         await self.repo.commit()
 
     async def create_new_version_within_company(
-        self, company_id: UUID, acting_user_id: UUID, curr_quiz_id: UUID
-    ) -> CompanyQuizAdminSchema:
+        self,
+        company_id: UUID,
+        acting_user_id: UUID,
+        curr_quiz_id: UUID,
+        include_questions: bool = True,
+    ) -> CompanyQuizAdminSchema | CompanyQuizBaseSchema:
         """
         Creates a new quiz version within the company. New quiz fields are is_published=False and is_visible=False, so that Admins+ can update quiz contents.
+        Questions and options are copied in the database, they are only loaded for the response.
         :param company_id:
         :param acting_user_id:
         :param curr_quiz_id:
-        :return: Quiz
+        :param include_questions: False skips loading the questions of the new version
+        :return: Quiz, without questions if not include_questions
         """
         await self.member_service.assert_admin_permissions(
             company_id=company_id, user_id=acting_user_id
         )
 
-        options = [
-            selectinload(CompanyQuizModel.questions).selectinload(
-                CompanyQuizQuestionModel.options
-            )
-        ]
         curr_quiz = await self._get_quiz_model(
-            company_id=company_id, quiz_id=curr_quiz_id, options=options, is_admin=True
+            company_id=company_id, quiz_id=curr_quiz_id, is_admin=True
         )
 
         root_id = curr_quiz.root_quiz_id if curr_quiz.root_quiz_id else curr_quiz_id
         last_ver = await self.repo.get_last_version_number(
             company_id=company_id, root_id=root_id
         )
-        new_quiz = CompanyQuizModel(
-            id=uuid4(),
-            company_id=curr_quiz.company_id,
-            title=curr_quiz.title,
-            description=curr_quiz.description,
-            allowed_attempts=curr_quiz.allowed_attempts,
-            is_published=False,
-            is_visible=False,
-            root_quiz_id=root_id,
+        new_quiz = await self.repo.clone_quiz(
+            company_id=company_id,
+            quiz_id=curr_quiz_id,
+            root_id=root_id,
             version=last_ver + 1,
         )
+        if new_quiz is None:
+            raise InstanceNotFoundException(instance_name=self.display_name)
 
-        for old_q in curr_quiz.questions:
-            new_quiz.questions.append(old_q.clone())
-
-        await self.repo.save(new_quiz)
+        await self.repo.commit()
         logger.info(
             f"Created new_quiz version: {new_quiz.version} new_quiz {new_quiz.id} old_quiz {curr_quiz.id} by {acting_user_id}"
         )
+        if not include_questions:
+            return CompanyQuizBaseSchema.model_validate(new_quiz)
 
+        options = [
+            selectinload(CompanyQuizModel.questions).selectinload(
+                CompanyQuizQuestionModel.options
+            )
+        ]
+        new_quiz = await self._get_quiz_model(
+            company_id=company_id, quiz_id=new_quiz.id, is_admin=True, options=options
+        )
         return CompanyQuizAdminSchema.model_validate(new_quiz)
 
     async def publish_quiz(
@@ -404,6 +650,10 @@ class QuizService(BaseService[QuizRepository, CompanyQuizModel]):
             f"Published quiz: {quiz.id} version {quiz.version} by {acting_user_id}"
         )
 
+        # Warm up, so the first submit and the first readers don't build them
+        await self.get_answer_key(quiz_id=quiz.id)
+        await self._warm_snapshots(company_id=company_id, quiz_id=quiz.id)
+
         return CompanyQuizAdminSchema.model_validate(quiz)
 
     async def update_quiz(
@@ -442,7 +692,7 @@ class QuizService(BaseService[QuizRepository, CompanyQuizModel]):
         )
         await self._assert_quiz_not_published(company_id=company_id, quiz_id=quiz_id)
 
-        question = await self._get_question_model(
+        question = await self._get_writable_question_model(
             company_id=company_id, quiz_id=quiz_id, question_id=question_id
         )
         if question_info.text is not None:
@@ -453,7 +703,7 @@ class QuizService(BaseService[QuizRepository, CompanyQuizModel]):
         )
         await self.repo.save(question)
         logger.info(
-            f"Updated {self.display_name}: {quiz_id} question {question_id} by {acting_user_id}"
+            f"Updated {self.display_name}: {quiz_id} question {question.id} by {acting_user_id}"
         )
 
         return CompanyQuizQuestionAdminSchema.model_validate(question)
@@ -474,6 +724,16 @@ class QuizService(BaseService[QuizRepository, CompanyQuizModel]):
         question = assert_valid_question(question=question)
         return question
 
+    async def _get_writable_question_model(
+        self, company_id: UUID, quiz_id: UUID, question_id: UUID
+    ) -> CompanyQuizQuestionModel:
+        """Questions shared with other versions are forked, the returned question may have a new id."""
+        question = await self.question_repo.get_writable_question(
+            company_id=company_id, quiz_id=quiz_id, question_id=question_id
+        )
+        question = assert_valid_question(question=question)
+        return question
+
     async def get_question(
         self, company_id: UUID, quiz_id: UUID, question_id: UUID
     ) -> CompanyQuizQuestionAdminSchema:
@@ -485,20 +745,41 @@ class QuizService(BaseService[QuizRepository, CompanyQuizModel]):
         )
         return CompanyQuizQuestionAdminSchema.model_validate(question)
 
-    async def get_quiz_allowed_attempts(self, company_id: UUID, quiz_id: UUID) -> int:
-        allowed_attempts = await self.repo.get_allowed_attempts(
+    async def get_quiz_analytics(
+        self, company_id: UUID, quiz_id: UUID, acting_user_id: UUID
+    ) -> QuizAnalyticsSchema:
+        """Difficulty and option distribution per question, read from the stats kept on finalization."""
+        await self.member_service.assert_admin_permissions(
+            company_id=company_id, user_id=acting_user_id
+        )
+        analytics = await self._get_quiz_analytics_cached(
+            company_id=company_id, quiz_id=quiz_id
+        )
+        if analytics is None:
+            raise InstanceNotFoundException(instance_name=self.display_name)
+        return analytics
+
+    @cache_with_mapping(
+        config=CacheConfig.QUESTION_STATS, response_schema=QuizAnalyticsSchema
+    )
+    async def _get_quiz_analytics_cached(
+        self, company_id: UUID, quiz_id: UUID
+    ) -> QuizAnalyticsSchema | None:
+        rows = await self.repo.get_question_stats_rows(
             company_id=company_id, quiz_id=quiz_id
         )
-        if allowed_attempts is None:
-            raise InstanceNotFoundException(instance_name="Quiz")
-        return allowed_attempts
+        return build_quiz_analytics(quiz_id=quiz_id, rows=rows)
 
     async def get_company_id(self, quiz_id: UUID) -> UUID:
-        company_id = await self.repo.get_company_id_or_none(quiz_id=quiz_id)
+        company_id = await self._get_company_id_cached(quiz_id=quiz_id)
         if not company_id:
             raise InstanceNotFoundException(instance_name="Company")
         return company_id
 
+    @cache_with_mapping(config=CacheConfig.QUIZ_COMPANY, response_schema=UUID)
+    async def _get_company_id_cached(self, quiz_id: UUID) -> UUID | None:
+        return await self.repo.get_company_id_or_none(quiz_id=quiz_id)
+
 
 class AttemptService(BaseService[AttemptRepository, QuizAttemptModel]):
     @property
@@ -513,8 +794,14 @@ class AttemptService(BaseService[AttemptRepository, QuizAttemptModel]):
         question_repo: QuestionRepository,
         member_service: MemberService,
         quiz_service: QuizService,
+        answer_buffer: AnswerBuffer,
+        expiry_queue: ExpiryQueue,
+        leaderboard: Leaderboard,
     ):
         super().__init__(repo=attempt_repo)
+        self.answer_buffer = answer_buffer
+        self.expiry_queue = expiry_queue
+        self.leaderboard = leaderboard
         self.member_service = member_service
         self.quiz_service = quiz_service
         self.user_repo = user_repo
@@ -524,40 +811,61 @@ class AttemptService(BaseService[AttemptRepository, QuizAttemptModel]):
     async def start_attempt(
         self, company_id: UUID, quiz_id: UUID, user_id: UUID
     ) -> QuizStartAttemptResponseSchema:
-        await self.member_service.get_and_lock_member_row(
-            company_id=company_id, user_id=user_id
-        )
-
-        attempt_id = await self.repo.get_active_attempt_id(
-            user_id=user_id, quiz_id=quiz_id
-        )
-        if attempt_id:
-            return await self.continue_attempt(user_id=user_id, attempt_id=attempt_id)
-
-        await self._assert_user_have_attempts(
-            company_id=company_id, quiz_id=quiz_id, user_id=user_id
-        )
-
-        return await self._create_new_attempt(company_id, quiz_id, user_id)
-
-    async def _create_new_attempt(
-        self, company_id: UUID, quiz_id: UUID, user_id: UUID
+        """
+        Continues the active attempt or starts a new one. Checks and the INSERT are a single statement,
+        the unique index of attempts in progress keeps concurrent starts to one active attempt.
+        Allowed attempts are guarded by the attempts counter, incremented in the same statement.
+        Retries after finalizing an expired active attempt or losing a race with a concurrent start,
+        up to START_ATTEMPT_TRIES statements, then the start is left to the client to retry.
+        """
+        for _ in range(START_ATTEMPT_TRIES):
+            result = await self.repo.start_attempt(
+                company_id=company_id,
+                quiz_id=quiz_id,
+                user_id=user_id,
+                started_at=datetime.now(timezone.utc),
+            )
+            if not result.member_found:
+                raise UserIsNotACompanyMemberException()
+            if not result.quiz_found:
+                raise InstanceNotFoundException(instance_name="Quiz")
+            if result.attempt is not None:
+                return await self._complete_start(
+                    company_id=company_id, attempt=result.attempt
+                )
+            # Counter may be incremented without a new attempt
+            await self.repo.rollback()
+
+            if result.active_attempt_id and not result.active_expired:
+                return await self.continue_attempt(
+                    user_id=user_id, attempt_id=result.active_attempt_id
+                )
+            if result.active_attempt_id:
+                await self.expire_attempts_by_id(attempt_ids=[result.active_attempt_id])
+            elif not result.attempts_left:
+                raise ResourceConflictException(
+                    "You have no attempts left for this quiz."
+                )
+
+        raise ResourceConflictException(
+            "The attempt is being started concurrently, try again."
+        )
+
+    async def _complete_start(
+        self, company_id: UUID, attempt: QuizAttemptModel
     ) -> QuizStartAttemptResponseSchema:
-        time_limit = await self.quiz_service.get_quiz_time_limit_minutes(
-            company_id=company_id, quiz_id=quiz_id
-        )
-
-        expires_at = None
-        if time_limit:
-            expires_at = datetime.now(timezone.utc) + timedelta(minutes=time_limit)
-
-        attempt = QuizAttemptModel(
-            user_id=user_id, quiz_id=quiz_id, expires_at=expires_at
-        )
-        await self.repo.save(attempt)
+        await self.repo.commit()
+        if attempt.expires_at and settings.APP.ATTEMPT_EXPIRY_QUEUE_POLL_SECONDS > 0:
+            try:
+                await self.expiry_queue.schedule((attempt.id, attempt.expires_at))
+            except Exception:
+                # Attempt is started already, the sweeper expires it if it's missing from the queue
+                logger.exception(
+                    f"Scheduling the expiry of attempt {attempt.id} failed"
+                )
 
         questions_schema = await self.quiz_service.get_questions_with_options(
-            company_id=company_id, quiz_id=quiz_id, is_admin=False
+            company_id=company_id, quiz_id=attempt.quiz_id, is_admin=False
         )
 
         data = {"questions": questions_schema, "attempt": attempt}
@@ -566,63 +874,134 @@ class AttemptService(BaseService[AttemptRepository, QuizAttemptModel]):
     async def submit_attempt(
         self, user_id: UUID, attempt_id: UUID
     ) -> QuizAttemptBaseSchema:
-        options = finalize_attempt_options()
-        attempt = await self._get_attempt_model(
-            user_id=user_id, attempt_id=attempt_id, options=options
-        )
-
-        if attempt.status != AttemptStatus.IN_PROGRESS:  # Basic return if finished
-            return QuizAttemptBaseSchema.model_validate(attempt)
-
-        if attempt.is_expired:  # Expire
-            attempt = await self._finalize_attempt(
-                attempt=attempt, status=AttemptStatus.EXPIRED
-            )
-        else:
-            attempt = await self._finalize_attempt(
-                attempt=attempt, status=AttemptStatus.COMPLETED
-            )  # Finish
-
+        """
+        Grades against the quiz answer key, or in SQL if there is none. Expired attempts are finalized as EXPIRED.
+        Finished attempts are returned as is.
+        """
+        await self._flush_buffered_answers(attempt_id=attempt_id)
+
+        quiz_id, selections = await self.repo.get_in_progress_selections(
+            user_id=user_id, attempt_id=attempt_id
+        )
+        if quiz_id is not None:
+            answer_key = await self.quiz_service.get_answer_key(quiz_id=quiz_id)
+            if answer_key is not None:
+                attempts = await self._finalize_with_answer_key(
+                    attempt_id=attempt_id,
+                    answer_key=answer_key,
+                    selections=selections,
+                )
+            else:
+                attempts = await self._finalize_attempts(
+                    QuizAttemptModel.id == attempt_id,
+                    QuizAttemptModel.user_id == user_id,
+                )
+            if attempts:
+                return QuizAttemptBaseSchema.model_validate(attempts[0])
+
+        # Nothing to finalize, either finished already or not found
+        attempt = await self._get_attempt_model(user_id=user_id, attempt_id=attempt_id)
         return QuizAttemptBaseSchema.model_validate(attempt)
 
-    async def _finalize_attempt(
-        self, attempt: QuizAttemptModel, status: AttemptStatus
-    ) -> QuizAttemptModel:
+    async def _finalize_attempts(self, *criteria: Any) -> Sequence[QuizAttemptModel]:
         """
-        Update attempt fields to finnish the attempt. Grade existing answers, change status and set finished time.
-        Expects loaded attempt.quiz, attempt.answers and attempt.options.
-        Returns QuizAttemptModel, so external methods should validate themselves.
+        Grades and finishes the in progress attempts matching criteria with a single UPDATE ... RETURNING.
+        Sets users last_quiz_attempt_at and commits.
+        Returns QuizAttemptModels, so external methods should validate themselves.
         """
         finished_time = datetime.now(timezone.utc)
-        attempt = await self._finish_attempt_update_fields(
-            attempt=attempt, finished_time=finished_time, status=status
+        attempts = await self.repo.finalize_attempts(
+            *criteria, finished_at=finished_time
+        )
+        return await self._complete_finalization(
+            attempts=attempts, finished_time=finished_time
         )
 
-        await self.repo.save(attempt)
-        logger.info(f"Finalized attempt: {attempt.id} status {attempt.status}")
-
-        return attempt
+    async def _finalize_with_answer_key(
+        self,
+        attempt_id: UUID,
+        answer_key: QuizAnswerKeySchema,
+        selections: list[tuple[UUID, UUID | None]],
+    ) -> Sequence[QuizAttemptModel]:
+        """Grades in Python, questions and options aren't loaded. Same return as self._finalize_attempts()."""
+        correct_count = grade_selections(answer_key=answer_key, selections=selections)
+        total_count = answer_key.questions_count
 
-    async def _finish_attempt_update_fields(
-        self, attempt: QuizAttemptModel, finished_time: datetime, status: AttemptStatus
-    ) -> QuizAttemptModel:
-        correct_count = calc_correct_answers_count(attempt)
-        total_questions = await self.question_repo.get_questions_count_for_quiz(
-            quiz_id=attempt.quiz_id
+        finished_time = datetime.now(timezone.utc)
+        attempt = await self.repo.finish_attempt(
+            attempt_id=attempt_id,
+            correct_count=correct_count,
+            total_count=total_count,
+            score=calc_score(correct_count, total_count),
+            finished_at=finished_time,
         )
-        score = calc_score(
-            correct_answers_count=correct_count, total_questions_count=total_questions
+        attempts = [attempt] if attempt is not None else []
+        return await self._complete_finalization(
+            attempts=attempts, finished_time=finished_time
         )
 
-        attempt.finished_at = finished_time
-        attempt.score = score
-        attempt.correct_answers_count = correct_count
-        attempt.total_questions_count = total_questions
-        attempt.status = status
+    async def _complete_finalization(
+        self, attempts: Sequence[QuizAttemptModel], finished_time: datetime
+    ) -> Sequence[QuizAttemptModel]:
+        """
+        Adds the attempts to the user company and question stats, sets users last_quiz_attempt_at and commits.
+        Company leaderboards are set while the stats rows are locked, so concurrent finalizations of a user
+        write them in commit order. Quiz leaderboards are updated after the commit.
+        """
+        if not attempts:
+            return attempts
+
+        attempt_ids = [attempt.id for attempt in attempts]
+        stats = await self.repo.add_to_user_company_stats(attempt_ids=attempt_ids)
+        await self.repo.add_to_question_stats(attempt_ids=attempt_ids)
+        await self.user_repo.update_last_quiz_attempt_time(
+            user_ids={attempt.user_id for attempt in attempts}, new_time=finished_time
+        )
+        try:
+            await self.leaderboard.set_company_scores(*get_company_scores(stats))
+        except Exception:
+            # rebuild_leaderboards() restores the boards
+            logger.exception(
+                f"Company leaderboard update of {len(attempts)} attempts failed"
+            )
+        await self.repo.commit()
 
-        attempt.user.last_quiz_attempt_at = finished_time
+        try:
+            if settings.APP.ANSWER_BUFFER_ENABLED:
+                await self.answer_buffer.discard(*(attempt.id for attempt in attempts))
+            await self.expiry_queue.cancel(
+                *(attempt.id for attempt in attempts if attempt.expires_at)
+            )
+            await self.leaderboard.add_quiz_scores(
+                *(
+                    (attempt.quiz_id, attempt.user_id, attempt.score)
+                    for attempt in attempts
+                )
+            )
+        except Exception:
+            # Attempts are finalized already. Buffers expire or are dropped by the checkpoint, the queue skips
+            # finished attempts and rebuild_leaderboards() restores the boards
+            logger.exception(
+                f"Redis cleanup after finalizing {len(attempts)} attempts failed"
+            )
 
-        return attempt
+        for attempt in attempts:
+            logger.info(f"Finalized attempt: {attempt.id} status {attempt.status}")
+        return attempts
+
+    async def _flush_buffered_answers(self, attempt_id: UUID) -> None:
+        """
+        Writes the buffered answers with one bulk upsert. Does not commit, they are committed with the finished attempt.
+        The buffer is discarded once the attempt is finalized.
+        """
+        if not settings.APP.ANSWER_BUFFER_ENABLED:
+            return
+
+        buffered = await self.answer_buffer.get(attempt_id=attempt_id)
+        if buffered:
+            await self.answer_repo.upsert_answers(
+                attempt_id=attempt_id, answers=buffered
+            )
 
     async def save_answer(
         self,
@@ -630,7 +1009,15 @@ class AttemptService(BaseService[AttemptRepository, QuizAttemptModel]):
         question_id: UUID,
         attempt_id: UUID,
         selected_option_info: SaveAnswerRequestSchema,
-    ) -> QuizAttemptAnswerAdminSchema:
+    ) -> QuizAttemptAnswerAdminSchema | QuizAttemptAnswerSchema:
+        if settings.APP.ANSWER_BUFFER_ENABLED:
+            return await self._buffer_answer(
+                user_id=user_id,
+                question_id=question_id,
+                attempt_id=attempt_id,
+                option_ids=selected_option_info.ids,
+            )
+
         attempt = await self._get_attempt_model(user_id=user_id, attempt_id=attempt_id)
         assert_in_progress(attempt=attempt)
 
@@ -651,6 +1038,75 @@ class AttemptService(BaseService[AttemptRepository, QuizAttemptModel]):
         await self.repo.save(answer)
         return QuizAttemptAnswerAdminSchema.model_validate(answer)
 
+    async def save_answers(
+        self, user_id: UUID, attempt_id: UUID, answers_info: SaveAnswersRequestSchema
+    ) -> list[QuizAttemptAnswerBaseSchema]:
+        """
+        Saves answers for many questions in one transaction, validated against the option index of the quiz answer key.
+        Answered questions get their selections replaced.
+        """
+        answers = {answer.question_id: answer.ids for answer in answers_info.answers}
+        attempt, _ = await self._get_writable_attempt(
+            user_id=user_id, attempt_id=attempt_id, answers=answers
+        )
+
+        if settings.APP.ANSWER_BUFFER_ENABLED:
+            await self.answer_buffer.save(
+                attempt_id=attempt_id, answers=answers, expires_at=attempt.expires_at
+            )
+            return [
+                QuizAttemptAnswerBaseSchema(
+                    id=get_answer_id(attempt_id=attempt_id, question_id=question_id),
+                    attempt_id=attempt_id,
+                    question_id=question_id,
+                )
+                for question_id in answers
+            ]
+
+        saved_answers = await self.answer_repo.upsert_answers(
+            attempt_id=attempt_id, answers=answers
+        )
+        await self.answer_repo.commit()
+
+        return [
+            QuizAttemptAnswerBaseSchema.model_validate(answer)
+            for answer in saved_answers
+        ]
+
+    async def _buffer_answer(
+        self, user_id: UUID, question_id: UUID, attempt_id: UUID, option_ids: list[UUID]
+    ) -> QuizAttemptAnswerSchema:
+        """save_answer() with the answer buffer, the answer is written to Postgres on submit, expiry or checkpoint."""
+        attempt, answer_key = await self._get_writable_attempt(
+            user_id=user_id, attempt_id=attempt_id, answers={question_id: option_ids}
+        )
+        await self.answer_buffer.save(
+            attempt_id=attempt_id,
+            answers={question_id: option_ids},
+            expires_at=attempt.expires_at,
+        )
+
+        # Valid answers mean a cached answer key, the options come from it instead of the questions
+        return build_answer_schema(
+            attempt_id=attempt_id,
+            question_id=question_id,
+            option_ids=option_ids,
+            options=get_question_options(
+                answer_key=answer_key, question_id=question_id
+            ),
+        )
+
+    async def _get_writable_attempt(
+        self, user_id: UUID, attempt_id: UUID, answers: dict[UUID, list[UUID]]
+    ) -> tuple[QuizAttemptModel, QuizAnswerKeySchema]:
+        """Attempt must be in progress and answers valid against the option index of the quiz answer key."""
+        attempt = await self._get_attempt_model(user_id=user_id, attempt_id=attempt_id)
+        assert_in_progress(attempt=attempt)
+
+        answer_key = await self.quiz_service.get_answer_key(quiz_id=attempt.quiz_id)
+        assert_valid_answers(answers=answers, answer_key=answer_key)
+        return attempt, answer_key
+
     async def _get_attempt_model(
         self,
         user_id: UUID,
@@ -666,20 +1122,6 @@ class AttemptService(BaseService[AttemptRepository, QuizAttemptModel]):
             raise InstanceNotFoundException(instance_name=self.display_name)
         return attempt
 
-    async def _assert_user_have_attempts(
-        self, company_id: UUID, quiz_id: UUID, user_id: UUID
-    ) -> None:
-        allowed_attempts = await self.quiz_service.get_quiz_allowed_attempts(
-            company_id=company_id, quiz_id=quiz_id
-        )
-        taken_attempts = await self.repo.get_user_attempts_count(
-            company_id=company_id, user_id=user_id, quiz_id=quiz_id
-        )
-        if taken_attempts is None:
-            raise InstanceNotFoundException(instance_name="Quiz")
-        if taken_attempts >= allowed_attempts:
-            raise ResourceConflictException("You have no attempts left for this quiz.")
-
     async def get_attempt(
         self, user_id: UUID, attempt_id: UUID, is_admin: bool
     ) -> QuizAttemptAdminSchema | QuizAttemptSchema:
@@ -786,21 +1228,49 @@ class AttemptService(BaseService[AttemptRepository, QuizAttemptModel]):
             company_id=company_id, quiz_id=attempt.quiz_id, is_admin=False
         )
 
+        if settings.APP.ANSWER_BUFFER_ENABLED:
+            buffered = await self.answer_buffer.get(attempt_id=attempt_id)
+            attempt = merge_buffered_answers(
+                attempt=attempt, buffered=buffered, questions=questions
+            )
+
         data = {"questions": questions, "attempt": attempt}
         return sanitize(data=data, schema=QuizStartAttemptResponseSchema)
 
-    async def _check_and_expire_attempt(self, attempt: QuizAttemptModel) -> None:
+    async def expire_attempts(self, batch_size: int) -> int:
         """
-        Checks if expired, if so marks it and calls self._finalize_attempt().
-        Refetches the attempt to ensure the correct fields for _finalize_attempt() are present.
-        For worker only, other methods should check expiration manually.
+        Finalizes a batch of expired in progress attempts as EXPIRED. For the sweeper task only.
+        Rows are locked with FOR UPDATE SKIP LOCKED, so sweepers on other replicas take other batches.
+        :return: Expired attempts count.
         """
-        if attempt.status == AttemptStatus.IN_PROGRESS and attempt.is_expired:
-            options = finalize_attempt_options()
-            attempt = await self._get_attempt_model(
-                user_id=attempt.user_id, attempt_id=attempt.id, options=options
-            )
-            await self._finalize_attempt(attempt=attempt, status=AttemptStatus.EXPIRED)
+        attempt_ids = await self.repo.lock_expired_attempt_ids(
+            expired_before=datetime.now(timezone.utc), limit=batch_size
+        )
+        return await self.expire_attempts_by_id(attempt_ids=attempt_ids)
+
+    async def expire_attempts_by_id(self, attempt_ids: Sequence[UUID]) -> int:
+        """
+        Finalizes the attempts that are in progress and expired, others are skipped. For the expiry tasks only.
+        :return: Expired attempts count.
+        """
+        if not attempt_ids:
+            return 0
+
+        for attempt_id in attempt_ids:
+            await self._flush_buffered_answers(attempt_id=attempt_id)
+        attempts = await self._finalize_attempts(
+            QuizAttemptModel.id.in_(attempt_ids),
+            QuizAttemptModel.expires_at <= datetime.now(timezone.utc),
+        )
+        return len(attempts)
+
+    async def get_expiry_lag_seconds(self) -> float:
+        """How long the oldest expired attempt has been waiting for the sweeper, 0 if none."""
+        now = datetime.now(timezone.utc)
+        oldest_expiry = await self.repo.get_oldest_expiry(expired_before=now)
+        if oldest_expiry is None:
+            return 0.0
+        return (now - oldest_expiry).total_seconds()
 
     async def _get_answer_model_or_none(
         self, question_id: UUID, attempt_id: UUID
@@ -843,6 +1313,156 @@ class AttemptService(BaseService[AttemptRepository, QuizAttemptModel]):
             company_id=company_id,
         )
 
+    async def export_company_attempts(
+        self, company_id: UUID, acting_user_id: UUID
+    ) -> AsyncIterator[str]:
+        """
+        CSV of all attempts of the company quizzes with the selected options, for admins.
+        Rows are streamed from a server-side cursor without loading models, memory doesn't grow with the company.
+        :return: Chunks of CSV, to be streamed as the response.
+        """
+        await self.member_service.assert_admin_permissions(
+            company_id=company_id, user_id=acting_user_id
+        )
+
+        rows = await self.repo.stream_company_attempt_rows(company_id=company_id)
+        logger.info(f"Exporting attempts of company {company_id} by {acting_user_id}")
+        return attempt_csv_chunks(rows)
+
+    async def get_company_leaderboard(
+        self, company_id: UUID, acting_user_id: UUID, limit: int
+    ) -> list[LeaderboardEntrySchema]:
+        """Top members by the score of their finished attempts in the company."""
+        await self.member_service.assert_user_in_company(
+            company_id=company_id, user_id=acting_user_id
+        )
+        return await self._get_leaderboard(
+            key=self.leaderboard.get_company_key(company_id), limit=limit
+        )
+
+    async def get_company_rank(
+        self, company_id: UUID, acting_user_id: UUID
+    ) -> LeaderboardEntrySchema:
+        await self.member_service.assert_user_in_company(
+            company_id=company_id, user_id=acting_user_id
+        )
+        return await self._get_rank(
+            key=self.leaderboard.get_company_key(company_id), user_id=acting_user_id
+        )
+
+    async def get_quiz_leaderboard(
+        self, company_id: UUID, quiz_id: UUID, acting_user_id: UUID, limit: int
+    ) -> list[LeaderboardEntrySchema]:
+        """Top members by their best attempt score of the quiz."""
+        await self._assert_quiz_leaderboard_access(
+            company_id=company_id, quiz_id=quiz_id, user_id=acting_user_id
+        )
+        return await self._get_leaderboard(
+            key=self.leaderboard.get_quiz_key(quiz_id), limit=limit
+        )
+
+    async def get_quiz_rank(
+        self, company_id: UUID, quiz_id: UUID, acting_user_id: UUID
+    ) -> LeaderboardEntrySchema:
+        await self._assert_quiz_leaderboard_access(
+            company_id=company_id, quiz_id=quiz_id, user_id=acting_user_id
+        )
+        return await self._get_rank(
+            key=self.leaderboard.get_quiz_key(quiz_id), user_id=acting_user_id
+        )
+
+    async def get_quiz_attempts_for_review(
+        self,
+        company_id: UUID,
+        quiz_id: UUID,
+        acting_user_id: UUID,
+        page_size: int,
+        cursor: str | None = None,
+        status: AttemptStatus | None = None,
+        min_score: float | None = None,
+        max_score: float | None = None,
+        finished_from: datetime | None = None,
+        finished_to: datetime | None = None,
+    ) -> KeysetPaginationResponse[QuizAttemptBaseSchema]:
+        """Finished attempts of all members for the quiz version, newest first, for admins."""
+        await self.member_service.assert_admin_permissions(
+            company_id=company_id, user_id=acting_user_id
+        )
+        if await self.quiz_service.get_company_id(quiz_id=quiz_id) != company_id:
+            raise InstanceNotFoundException(instance_name="Quiz")
+
+        rows = await self.repo.get_finished_attempts_page(
+            quiz_id=quiz_id,
+            limit=page_size + 1,
+            after=parse_attempt_cursor(cursor),
+            status=status,
+            min_score=min_score,
+            max_score=max_score,
+            finished_from=finished_from,
+            finished_to=finished_to,
+        )
+        return build_attempts_page(rows=rows, page_size=page_size)
+
+    async def get_score_distribution(
+        self,
+        company_id: UUID,
+        quiz_id: UUID,
+        acting_user_id: UUID,
+        buckets: int,
+        sample_percent: float | None = None,
+    ) -> QuizScoreDistributionSchema:
+        """Score histogram and percentiles of the quiz version, for admins."""
+        await self.member_service.assert_admin_permissions(
+            company_id=company_id, user_id=acting_user_id
+        )
+        if await self.quiz_service.get_company_id(quiz_id=quiz_id) != company_id:
+            raise InstanceNotFoundException(instance_name="Quiz")
+
+        return await self._get_score_distribution_cached(
+            quiz_id=quiz_id, buckets=buckets, sample_percent=sample_percent
+        )
+
+    @cache_with_mapping(
+        config=CacheConfig.SCORE_DISTRIBUTION,
+        response_schema=QuizScoreDistributionSchema,
+    )
+    async def _get_score_distribution_cached(
+        self, quiz_id: UUID, buckets: int, sample_percent: float | None
+    ) -> QuizScoreDistributionSchema:
+        row = await self.repo.get_score_distribution(
+            quiz_id=quiz_id, buckets=buckets, sample_percent=sample_percent
+        )
+        return build_score_distribution(
+            quiz_id=quiz_id, row=row, buckets=buckets, sample_percent=sample_percent
+        )
+
+    async def _assert_quiz_leaderboard_access(
+        self, company_id: UUID, quiz_id: UUID, user_id: UUID
+    ) -> None:
+        await self.member_service.assert_user_in_company(
+            company_id=company_id, user_id=user_id
+        )
+        if await self.quiz_service.get_company_id(quiz_id=quiz_id) != company_id:
+            raise InstanceNotFoundException(instance_name="Quiz")
+
+    async def _get_leaderboard(
+        self, key: str, limit: int
+    ) -> list[LeaderboardEntrySchema]:
+        entries = await self.leaderboard.get_top(key=key, limit=limit)
+        return [
+            LeaderboardEntrySchema(rank=rank, user_id=user_id, score=score)
+            for rank, (user_id, score) in enumerate(entries, start=1)
+        ]
+
+    async def _get_rank(self, key: str, user_id: UUID) -> LeaderboardEntrySchema:
+        entry = await self.leaderboard.get_rank(key=key, user_id=user_id)
+        if entry is None:
+            raise InstanceNotFoundException(
+                instance_name="Leaderboard entry", message="no finished attempts"
+            )
+        rank, score = entry
+        return LeaderboardEntrySchema(rank=rank + 1, user_id=user_id, score=score)
+
     async def get_user_attempts(
         self, user_id: UUID, page: int, page_size: int
     ) -> PaginationResponse[QuizAttemptBaseSchema]:
@@ -873,5 +1493,3 @@ class AttemptService(BaseService[AttemptRepository, QuizAttemptModel]):
             total_correct_answers=correct_answers_count,
             total_questions_answered=total_questions_count,
         )
-
-    # TODO WORKER TO AUTO END OLD ATTEMPTS
@@ -0,0 +1,86 @@
+import hashlib
+from dataclasses import dataclass
+from uuid import UUID
+
+from fastapi import Request, Response, status
+from redis.asyncio import Redis
+
+from src.core.caching.config import DAY
+
+SNAPSHOT_EXPIRE = 7 * DAY
+
+QUIZ_VIEW = "quiz"
+QUESTIONS_VIEW = "questions"
+
+
+def get_snapshot_name(view: str, is_admin: bool) -> str:
+    return f"{view}:{'admin' if is_admin else 'public'}"
+
+
+@dataclass(frozen=True)
+class QuizSnapshot:
+    """Rendered JSON response with its strong ETag, the hash of the body."""
+
+    body: str
+    etag: str
+
+    @classmethod
+    def render(cls, body: str) -> "QuizSnapshot":
+        digest = hashlib.sha256(body.encode()).hexdigest()[:32]
+        return cls(body=body, etag=f'"{digest}"')
+
+    def matches(self, if_none_match: str | None) -> bool:
+        if not if_none_match:
+            return False
+        etags = {etag.strip().removeprefix("W/") for etag in if_none_match.split(",")}
+        return "*" in etags or self.etag in etags
+
+    def to_response(self, request: Request) -> Response:
+        """304 without a body when the client has the same snapshot. Clients must revalidate, content is per audience."""
+        headers = {"ETag": self.etag, "Cache-Control": "private, no-cache"}
+        if self.matches(request.headers.get("if-none-match")):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(
+            content=self.body, media_type="application/json", headers=headers
+        )
+
+
+class QuizSnapshotStore:
+    """
+    Rendered quiz responses, a Redis hash per quiz and its QUIZ cache generation: "{view}:{audience}" -> body and ETag.
+    Every change of the quiz bumps the generation, so snapshots are never updated, only replaced and left to expire.
+    """
+
+    def __init__(self, redis: Redis):
+        self.redis = redis
+
+    @staticmethod
+    def get_key(company_id: UUID, quiz_id: UUID, generation: int) -> str:
+        return f"quiz-snapshot:{company_id}:{quiz_id}:{generation}"
+
+    async def get(
+        self, company_id: UUID, quiz_id: UUID, generation: int, name: str
+    ) -> QuizSnapshot | None:
+        key = self.get_key(company_id, quiz_id, generation)
+        body, etag = await self.redis.hmget(key, [name, f"{name}:etag"])
+        if body is None or etag is None:
+            return None
+        return QuizSnapshot(body=body, etag=etag)
+
+    async def save(
+        self,
+        company_id: UUID,
+        quiz_id: UUID,
+        generation: int,
+        snapshots: dict[str, QuizSnapshot],
+    ) -> None:
+        key = self.get_key(company_id, quiz_id, generation)
+        mapping = {}
+        for name, snapshot in snapshots.items():
+            mapping[name] = snapshot.body
+            mapping[f"{name}:etag"] = snapshot.etag
+
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(key, mapping=mapping)
+            pipe.expire(key, SNAPSHOT_EXPIRE)
+            await pipe.execute()
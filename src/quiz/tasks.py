@@ -0,0 +1,270 @@
+from datetime import datetime, timezone
+
+from redis.asyncio import Redis
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.auth.repository import UserRepository
+from src.company.repository import MemberRepository
+from src.company.service import MemberService
+from src.core.database import db_session_manager
+from src.core.logger import logger
+from src.core.redis import redis_manager
+
+from .answer_buffer import AnswerBuffer
+from .expiry_queue import ExpiryQueue
+from .leaderboard import Leaderboard
+from .repository import (
+    AnswerRepository,
+    AttemptRepository,
+    QuestionRepository,
+    QuizRepository,
+)
+from .service import AttemptService, QuizService
+from .snapshots import QuizSnapshotStore
+from .utils.attempt_logic import get_company_scores
+
+CHECKPOINT_BATCH_SIZE = 500
+
+SWEEP_BATCH_SIZE = 200
+# Bounds a single run, the rest is left for the next one
+MAX_SWEEP_BATCHES = 25
+
+EXPIRY_QUEUE_BATCH_SIZE = 100
+
+EXPIRY_QUEUE_REBUILD_BATCH_SIZE = 1000
+# Workers and replicas started within the window skip the startup rebuild
+EXPIRY_QUEUE_REBUILD_CLAIM_SECONDS = 600
+
+STATS_BACKFILL_BATCH_SIZE = 1000
+
+LEADERBOARD_REBUILD_BATCH_SIZE = 1000
+
+
+def build_attempt_service(db: AsyncSession, redis: Redis) -> AttemptService:
+    """Same graph as get_attempt_service(), for tasks running outside a request."""
+    question_repo = QuestionRepository(db=db)
+    leaderboard = Leaderboard(redis=redis)
+    member_service = MemberService(
+        member_repo=MemberRepository(db=db), leaderboard=leaderboard
+    )
+    quiz_service = QuizService(
+        quiz_repo=QuizRepository(db=db),
+        question_repo=question_repo,
+        member_service=member_service,
+        snapshots=QuizSnapshotStore(redis=redis),
+        leaderboard=leaderboard,
+    )
+    return AttemptService(
+        attempt_repo=AttemptRepository(db=db),
+        user_repo=UserRepository(db=db),
+        answer_repo=AnswerRepository(db=db),
+        question_repo=question_repo,
+        member_service=member_service,
+        quiz_service=quiz_service,
+        answer_buffer=AnswerBuffer(redis=redis),
+        expiry_queue=ExpiryQueue(redis=redis),
+        leaderboard=leaderboard,
+    )
+
+
+async def process_expiry_queue() -> None:
+    """
+    Finalizes the attempts due in the expiry queue. Safe on every replica, due ids are popped atomically.
+    Failed batches are scheduled again.
+    """
+    async with (
+        redis_manager.session() as redis,
+        db_session_manager.session() as db,
+    ):
+        expiry_queue = ExpiryQueue(redis=redis)
+        now = datetime.now(timezone.utc)
+        attempt_ids = await expiry_queue.pop_due(now=now, count=EXPIRY_QUEUE_BATCH_SIZE)
+        if not attempt_ids:
+            return
+
+        attempt_service = build_attempt_service(db=db, redis=redis)
+        try:
+            expired_count = await attempt_service.expire_attempts_by_id(
+                attempt_ids=attempt_ids
+            )
+        except Exception:
+            await expiry_queue.schedule(
+                *((attempt_id, now) for attempt_id in attempt_ids)
+            )
+            raise
+
+    logger.info(f"Expiry queue expired {expired_count} attempts")
+
+
+async def rebuild_expiry_queue(
+    batch_size: int = EXPIRY_QUEUE_REBUILD_BATCH_SIZE,
+) -> int:
+    """
+    Restores the expiry queue from the attempts in progress, e.g. after Redis lost it, a batch of attempts at a time.
+    Scheduling is idempotent.
+    :return: Number of attempts scheduled.
+    """
+    scheduled = 0
+    last_expiry = None
+    async with redis_manager.session() as redis:
+        expiry_queue = ExpiryQueue(redis=redis)
+        while True:
+            async with db_session_manager.session() as db:
+                expiries = await AttemptRepository(db=db).get_in_progress_expiries(
+                    after=last_expiry, limit=batch_size
+                )
+            if not expiries:
+                break
+
+            await expiry_queue.schedule(*expiries)
+            scheduled += len(expiries)
+            attempt_id, expires_at = expiries[-1]
+            last_expiry = (expires_at, attempt_id)
+
+    logger.info(f"Expiry queue rebuilt with {scheduled} attempts")
+    return scheduled
+
+
+async def rebuild_expiry_queue_on_startup() -> None:
+    """rebuild_expiry_queue() by the first worker started, the others skip it."""
+    async with redis_manager.session() as redis:
+        claimed = await ExpiryQueue(redis=redis).claim_rebuild(
+            ttl_seconds=EXPIRY_QUEUE_REBUILD_CLAIM_SECONDS
+        )
+    if claimed:
+        await rebuild_expiry_queue()
+
+
+async def expire_attempts() -> None:
+    """
+    Finalizes expired in progress attempts in batches, each batch is graded set based and committed on its own.
+    Safe to run on every replica, batches are claimed with FOR UPDATE SKIP LOCKED.
+    Lag is the wait of the oldest expired attempt left behind.
+    """
+    expired_count = 0
+    async with (
+        redis_manager.session() as redis,
+        db_session_manager.session() as db,
+    ):
+        attempt_service = build_attempt_service(db=db, redis=redis)
+        for _ in range(MAX_SWEEP_BATCHES):
+            expired = await attempt_service.expire_attempts(batch_size=SWEEP_BATCH_SIZE)
+            expired_count += expired
+            if expired < SWEEP_BATCH_SIZE:
+                break
+
+        lag = await attempt_service.get_expiry_lag_seconds()
+
+    if expired_count or lag:
+        logger.info(f"Attempt sweeper expired {expired_count} attempts, lag {lag:.1f}s")
+
+
+async def checkpoint_answer_buffers() -> None:
+    """
+    Writes the buffered answers of attempts changed since the last checkpoint, so losing Redis costs one interval at most.
+    Buffers of attempts that are no longer in progress are dropped.
+    """
+    async with (
+        redis_manager.session() as redis,
+        db_session_manager.session() as db,
+    ):
+        answer_buffer = AnswerBuffer(redis=redis)
+        attempt_ids = await answer_buffer.pop_dirty_attempt_ids(
+            count=CHECKPOINT_BATCH_SIZE
+        )
+        if not attempt_ids:
+            return
+
+        try:
+            attempt_repo = AttemptRepository(db=db)
+            # Locked until the commit, a finalization can't grade the attempt between the buffer read and the upsert
+            locked_ids = await attempt_repo.lock_in_progress_ids(
+                attempt_ids=attempt_ids
+            )
+            answer_repo = AnswerRepository(db=db)
+            for attempt_id in locked_ids:
+                buffered = await answer_buffer.get(attempt_id=attempt_id)
+                if buffered:
+                    await answer_repo.upsert_answers(
+                        attempt_id=attempt_id, answers=buffered
+                    )
+            await answer_repo.commit()
+
+            # Skipped rows still in progress are locked by a finalization or another checkpoint, retried next interval
+            skipped_ids = set(attempt_ids).difference(locked_ids)
+            busy_ids = await attempt_repo.get_in_progress_ids(
+                attempt_ids=list(skipped_ids)
+            )
+        except Exception:
+            await answer_buffer.mark_dirty(*attempt_ids)
+            raise
+
+        await answer_buffer.mark_dirty(*busy_ids)
+        await answer_buffer.discard(*skipped_ids.difference(busy_ids))
+        logger.info(f"Checkpointed answers of {len(locked_ids)} attempts")
+
+
+async def rebuild_user_company_stats(
+    batch_size: int = STATS_BACKFILL_BATCH_SIZE,
+) -> int:
+    """
+    Recalculates user_company_stats from the finished attempts, a batch of users per transaction.
+    Rows of a batch are replaced. Finalizations and the rebuild take an advisory lock per user before reading the totals,
+    so a finalization either commits before the rebuild reads them or adds its attempts on top of the rebuilt rows.
+    :return: Number of users processed.
+    """
+    processed = 0
+    last_user_id = None
+    while True:
+        async with db_session_manager.session() as db:
+            repo = AttemptRepository(db=db)
+            user_ids = await repo.get_attempt_user_ids(
+                after_user_id=last_user_id, limit=batch_size
+            )
+            if not user_ids:
+                break
+
+            await repo.rebuild_user_company_stats(user_ids=user_ids)
+            await repo.commit()
+
+        processed += len(user_ids)
+        last_user_id = user_ids[-1]
+        logger.info(f"Rebuilt user company stats of {processed} users")
+
+    return processed
+
+
+async def rebuild_leaderboards(
+    batch_size: int = LEADERBOARD_REBUILD_BATCH_SIZE,
+) -> int:
+    """
+    Restores the leaderboards from Postgres after Redis lost them, a batch of users at a time.
+    Quiz boards only keep higher scores and company boards are set while the users are locked, so it's safe while attempts finish.
+    Only current members are restored, former members' entries are removed when they leave.
+    :return: Number of users processed.
+    """
+    processed = 0
+    last_user_id = None
+    async with redis_manager.session() as redis:
+        leaderboard = Leaderboard(redis=redis)
+        while True:
+            async with db_session_manager.session() as db:
+                repo = AttemptRepository(db=db)
+                user_ids = await repo.get_attempt_user_ids(
+                    after_user_id=last_user_id, limit=batch_size
+                )
+                if not user_ids:
+                    break
+
+                quiz_scores = await repo.get_best_quiz_scores(user_ids=user_ids)
+                stats = await repo.get_user_company_stats_rows(user_ids=user_ids)
+                # Users stay locked until the session ends, finalizations set their scores after this
+                await leaderboard.set_company_scores(*get_company_scores(stats))
+
+            await leaderboard.add_quiz_scores(*quiz_scores)
+
+            processed += len(user_ids)
+            last_user_id = user_ids[-1]
+            logger.info(f"Rebuilt leaderboards of {processed} users")
+
+    return processed
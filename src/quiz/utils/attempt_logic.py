@@ -1,19 +1,35 @@
-from typing import Any
-from uuid import UUID
+from datetime import datetime
+from typing import Any, Iterable, Mapping, Sequence
+from uuid import UUID, uuid5
 
 from sqlalchemy import case
-from sqlalchemy.orm import InstrumentedAttribute, selectinload
-from sqlalchemy.sql.base import ExecutableOption
+from sqlalchemy.orm import InstrumentedAttribute
 
-from src.core.exceptions import ResourceConflictException
+from src.core.exceptions import (
+    InvalidAnswerException,
+    InvalidCursorException,
+    ResourceConflictException,
+)
+from src.core.schemas import KeysetPaginationResponse
+from src.core.utils import decode_cursor, encode_cursor
 
 from ..enums import AttemptStatus
-from ..models import AttemptAnswerSelection as AttemptAnswerSelectionModel
-from ..models import CompanyQuizQuestion as CompanyQuizQuestionModel
-from ..models import QuestionAnswerOption as QuestionAnswerOptionModel
 from ..models import QuizAttempt as QuizAttemptModel
 from ..models import QuizAttemptAnswer as QuizAttemptAnswerModel
-from ..schemas import QuizAttemptBaseSchema
+from ..schemas import (
+    AttemptAnswerSelectionSchema,
+    CompanyQuizQuestionSchema,
+    QuestionAnswerOptionBaseSchema,
+    QuizAnswerKeySchema,
+    QuizAttemptAnswerSchema,
+    QuizAttemptBaseSchema,
+    QuizAttemptSchema,
+    QuizScoreDistributionSchema,
+    ScoreBucketSchema,
+)
+
+SCORE_PERCENTILES = (0.25, 0.5, 0.75, 0.9)
+MAX_SCORE = 100.0
 
 
 def assert_in_progress(
@@ -27,17 +43,18 @@ def assert_in_progress(
         raise ResourceConflictException("Attempt has expired.")
 
 
-def finalize_attempt_options() -> list[ExecutableOption]:
-    return [
-        selectinload(QuizAttemptModel.quiz),
-        selectinload(QuizAttemptModel.user),
-        selectinload(QuizAttemptModel.answers).selectinload(
-            QuizAttemptAnswerModel.selected_options
-        ),
-        selectinload(QuizAttemptModel.answers)
-        .selectinload(QuizAttemptAnswerModel.question)
-        .selectinload(CompanyQuizQuestionModel.options),
-    ]
+def assert_valid_answers(
+    answers: dict[UUID, list[UUID]], answer_key: QuizAnswerKeySchema | None
+) -> None:
+    """Every question must belong to the quiz and every option to its question. No answer key means no valid questions."""
+    option_ids = answer_key.option_ids if answer_key else {}
+    for question_id, selected_ids in answers.items():
+        if question_id not in option_ids:
+            raise InvalidAnswerException(f"Question {question_id} is not in the quiz")
+        if not option_ids[question_id].issuperset(selected_ids):
+            raise InvalidAnswerException(
+                f"Options do not belong to question {question_id}"
+            )
 
 
 def assert_viewable(attempt: QuizAttemptBaseSchema, is_admin: bool) -> None:
@@ -89,25 +106,82 @@ def answer_filters(
     }
 
 
-def calc_correct_answers_count(attempt: QuizAttemptModel) -> int:
+def get_answer_id(attempt_id: UUID, question_id: UUID) -> UUID:
     """
-    Calculate the score strictly. Must ensure attempt fields are loaded.
-    :param attempt: attempt.answers, answer.selected_options, question.options
-    :return: correct_answer_count: int, score: float
+    Deterministic, so answers get the same id whether written directly or flushed from the answer buffer.
     """
-    correct_answers_count = 0
-    for answer in attempt.answers:
-        question: CompanyQuizQuestionModel = answer.question
-        user_selections: list[AttemptAnswerSelectionModel] = answer.selected_options
-        q_options: list[QuestionAnswerOptionModel] = question.options
+    return uuid5(attempt_id, str(question_id))
+
+
+def get_selection_id(answer_id: UUID, option_id: UUID) -> UUID:
+    return uuid5(answer_id, str(option_id))
+
+
+def get_question_options(
+    answer_key: QuizAnswerKeySchema, question_id: UUID
+) -> dict[UUID, QuestionAnswerOptionBaseSchema]:
+    """Options of the question from the answer key, without the is_correct flag."""
+    return {
+        option_id: QuestionAnswerOptionBaseSchema(
+            id=option_id,
+            question_id=question_id,
+            text=answer_key.option_texts[option_id],
+        )
+        for option_id in answer_key.option_ids.get(question_id, ())
+    }
+
 
-        selected_ids = {sel.option_id for sel in user_selections}
-        correct_ids = {opt.id for opt in q_options if opt.is_correct}
+def build_answer_schema(
+    attempt_id: UUID,
+    question_id: UUID,
+    option_ids: list[UUID],
+    options: Mapping[UUID, QuestionAnswerOptionBaseSchema],
+) -> QuizAttemptAnswerSchema:
+    """Answer from the answer buffer, selected options are looked up in options by id."""
+    answer_id = get_answer_id(attempt_id=attempt_id, question_id=question_id)
+    selected_options = [
+        AttemptAnswerSelectionSchema(
+            id=get_selection_id(answer_id=answer_id, option_id=option_id),
+            answer_id=answer_id,
+            option_id=option_id,
+            option=options[option_id],
+        )
+        for option_id in dict.fromkeys(option_ids)
+        if option_id in options
+    ]
+    return QuizAttemptAnswerSchema(
+        id=answer_id,
+        attempt_id=attempt_id,
+        question_id=question_id,
+        selected_options=selected_options,
+    )
 
-        if selected_ids == correct_ids:
-            correct_answers_count += 1
 
-    return correct_answers_count
+def merge_buffered_answers(
+    attempt: QuizAttemptSchema,
+    buffered: dict[UUID, list[UUID]],
+    questions: Sequence[CompanyQuizQuestionSchema],
+) -> QuizAttemptSchema:
+    """Buffered answers replace the stored answers of the same questions."""
+    if not buffered:
+        return attempt
+
+    options = {
+        option.id: option for question in questions for option in question.options
+    }
+    answers = [
+        answer for answer in attempt.answers if answer.question_id not in buffered
+    ]
+    answers.extend(
+        build_answer_schema(
+            attempt_id=attempt.id,
+            question_id=question_id,
+            option_ids=option_ids,
+            options=options,
+        )
+        for question_id, option_ids in buffered.items()
+    )
+    return attempt.model_copy(update={"answers": answers})
 
 
 def calc_score(correct_answers_count: int, total_questions_count: int) -> float:
@@ -117,3 +191,88 @@ def calc_score(correct_answers_count: int, total_questions_count: int) -> float:
         else 0.0
     )
     return score
+
+
+def get_company_scores(
+    stats: Iterable[tuple[UUID, UUID, int, int]],
+) -> list[tuple[UUID, UUID, float]]:
+    """
+    :param stats: (company_id, user_id, correct_answers_count, total_questions_count)
+    :return: (company_id, user_id, score) for the company leaderboards, users without finished attempts are skipped
+    """
+    return [
+        (company_id, user_id, calc_score(correct_count, total_count))
+        for company_id, user_id, correct_count, total_count in stats
+        if total_count > 0
+    ]
+
+
+def get_unscored_user_ids(stats: Iterable[tuple[UUID, UUID, int, int]]) -> list[UUID]:
+    """:return: Users of the stats left without finished attempts, e.g. after a quiz is deleted"""
+    return [user_id for _, user_id, _, total_count in stats if total_count <= 0]
+
+
+def build_score_distribution(
+    quiz_id: UUID, row: Sequence[Any], buckets: int, sample_percent: float | None
+) -> QuizScoreDistributionSchema:
+    """
+    :param row: (attempts_count, average_score, percentiles, *bucket counts) of AttemptRepository.get_score_distribution
+    :param sample_percent: Counts of a sample are scaled up to estimates for all the attempts
+    """
+    attempts_count, average_score, percentiles, *counts = row
+    if sample_percent is not None:
+        attempts_count, *counts = (
+            round(count * 100 / sample_percent) for count in (attempts_count, *counts)
+        )
+
+    width = MAX_SCORE / buckets
+    return QuizScoreDistributionSchema(
+        quiz_id=quiz_id,
+        attempts_count=attempts_count,
+        average_score=average_score,
+        # No attempts, no percentiles
+        percentiles={
+            f"p{round(percentile * 100)}": score
+            for percentile, score in zip(SCORE_PERCENTILES, percentiles or [])
+        },
+        buckets=[
+            ScoreBucketSchema(
+                min_score=number * width, max_score=(number + 1) * width, count=count
+            )
+            for number, count in enumerate(counts)
+        ],
+        sample_percent=sample_percent,
+    )
+
+
+def parse_attempt_cursor(cursor: str | None) -> tuple[datetime, UUID] | None:
+    """:return: (finished_at, id) of the last attempt of the previous page"""
+    if cursor is None:
+        return None
+
+    finished_at, attempt_id = decode_cursor(cursor, size=2)
+    try:
+        finished_at, attempt_id = datetime.fromisoformat(finished_at), UUID(attempt_id)
+    except ValueError:
+        raise InvalidCursorException()
+
+    # Compared to a timestamptz column
+    if finished_at.tzinfo is None:
+        raise InvalidCursorException()
+    return finished_at, attempt_id
+
+
+def build_attempts_page(
+    rows: Sequence[Any], page_size: int
+) -> KeysetPaginationResponse[QuizAttemptBaseSchema]:
+    """:param rows: Up to page_size + 1 attempts, the extra one only tells that a next page exists"""
+    has_next = len(rows) > page_size
+    attempts = [QuizAttemptBaseSchema.model_validate(row) for row in rows[:page_size]]
+    next_cursor = None
+    if has_next:
+        last = attempts[-1]
+        next_cursor = encode_cursor([last.finished_at.isoformat(), last.id])
+
+    return KeysetPaginationResponse(
+        page_size=page_size, has_next=has_next, next_cursor=next_cursor, data=attempts
+    )
@@ -0,0 +1,247 @@
+from datetime import datetime
+from typing import Any, Iterable
+from uuid import UUID
+
+from sqlalchemy import (
+    CTE,
+    Float,
+    and_,
+    bindparam,
+    case,
+    cast,
+    func,
+    literal,
+    select,
+    update,
+)
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.sql import Update
+
+from ..enums import AttemptStatus
+from ..models import AttemptAnswerSelection as AttemptAnswerSelectionModel
+from ..models import QuestionAnswerOption as QuestionAnswerOptionModel
+from ..models import QuizAttempt as QuizAttemptModel
+from ..models import QuizAttemptAnswer as QuizAttemptAnswerModel
+from ..models import QuizQuestionLink as QuizQuestionLinkModel
+from ..schemas import QuizAnswerKeySchema
+
+
+def status_literal(status: AttemptStatus) -> Any:
+    """Status column is a non-native enum, literals in case() must be bound through the column type."""
+    return literal(status, type_=QuizAttemptModel.status.type)
+
+
+def status_inline(status: AttemptStatus) -> Any:
+    """Rendered into the SQL instead of bound, so partial indexes on status match prepared statements too."""
+    return bindparam(
+        None, status, type_=QuizAttemptModel.status.type, literal_execute=True
+    )
+
+
+def finish_values(
+    correct_count: Any, total_count: Any, score: Any, finished_at: datetime
+) -> dict[str, Any]:
+    """Columns set when an attempt is finished. Status is EXPIRED when the attempt expired before finished_at."""
+    status = case(
+        (
+            QuizAttemptModel.expires_at <= finished_at,
+            status_literal(AttemptStatus.EXPIRED),
+        ),
+        else_=status_literal(AttemptStatus.COMPLETED),
+    )
+    return {
+        "correct_answers_count": correct_count,
+        "total_questions_count": total_count,
+        "score": score,
+        "finished_at": finished_at,
+        "status": status,
+    }
+
+
+def selected_options_cte(targets: CTE) -> CTE:
+    """
+    Sorted distinct option ids per answered question of the target attempts, NULL when nothing selected.
+    Answers to questions outside the attempt quiz are left out.
+    :param targets: Attempts with id and quiz_id columns.
+    """
+    selection = AttemptAnswerSelectionModel.option_id
+    return (
+        select(
+            QuizAttemptAnswerModel.attempt_id,
+            QuizAttemptAnswerModel.question_id,
+            func.array_agg(aggregate_order_by(selection.distinct(), selection))
+            .filter(selection.is_not(None))
+            .label("option_ids"),
+        )
+        .join(targets, targets.c.id == QuizAttemptAnswerModel.attempt_id)
+        .join(
+            QuizQuestionLinkModel,
+            and_(
+                QuizQuestionLinkModel.question_id == QuizAttemptAnswerModel.question_id,
+                QuizQuestionLinkModel.quiz_id == targets.c.quiz_id,
+            ),
+        )
+        .outerjoin(
+            AttemptAnswerSelectionModel,
+            AttemptAnswerSelectionModel.answer_id == QuizAttemptAnswerModel.id,
+        )
+        .group_by(QuizAttemptAnswerModel.attempt_id, QuizAttemptAnswerModel.question_id)
+        .cte("selected")
+    )
+
+
+def correct_options_cte(targets: CTE) -> CTE:
+    """
+    Sorted correct option ids per question of the target attempts quizzes.
+    :param targets: Attempts with id and quiz_id columns.
+    """
+    option_id = QuestionAnswerOptionModel.id
+    return (
+        select(
+            QuestionAnswerOptionModel.question_id,
+            func.array_agg(aggregate_order_by(option_id, option_id))
+            .filter(QuestionAnswerOptionModel.is_correct.is_(True))
+            .label("option_ids"),
+        )
+        .where(
+            # Not a join, versions sharing a question would repeat its options
+            QuestionAnswerOptionModel.question_id.in_(
+                select(QuizQuestionLinkModel.question_id).where(
+                    QuizQuestionLinkModel.quiz_id.in_(select(targets.c.quiz_id))
+                )
+            )
+        )
+        .group_by(QuestionAnswerOptionModel.question_id)
+        .cte("correct")
+    )
+
+
+def is_correct_answer(selected: CTE, correct: CTE) -> Any:
+    """A question is correct when the set of selected options equals the set of correct options."""
+    return selected.c.option_ids.is_not_distinct_from(correct.c.option_ids)
+
+
+def finalize_attempts_query(*criteria: Any, finished_at: datetime) -> Update:
+    """
+    Grades and finishes the in progress attempts matching criteria in one statement.
+    A question is correct when the set of selected options equals the set of correct options.
+    Status is EXPIRED when the attempt expired before finished_at, COMPLETED otherwise.
+    Returns the updated attempts. Example: finalize_attempts_query(QuizAttemptModel.id == attempt_id, ...)
+    """
+    targets = (
+        select(QuizAttemptModel.id, QuizAttemptModel.quiz_id)
+        .where(QuizAttemptModel.status == AttemptStatus.IN_PROGRESS, *criteria)
+        .cte("targets")
+    )
+
+    selected = selected_options_cte(targets)
+    correct = correct_options_cte(targets)
+
+    total_count = (
+        select(func.count(QuizQuestionLinkModel.question_id))
+        .where(QuizQuestionLinkModel.quiz_id == targets.c.quiz_id)
+        .correlate(targets)
+        .scalar_subquery()
+    )
+    grades = (
+        select(
+            targets.c.id.label("attempt_id"),
+            func.count(selected.c.question_id)
+            .filter(is_correct_answer(selected=selected, correct=correct))
+            .label("correct_count"),
+            total_count.label("total_count"),
+        )
+        .select_from(targets)
+        .outerjoin(selected, selected.c.attempt_id == targets.c.id)
+        .outerjoin(correct, correct.c.question_id == selected.c.question_id)
+        .group_by(targets.c.id, targets.c.quiz_id)
+        .cte("grades")
+    )
+
+    score = case(
+        (
+            grades.c.total_count > 0,
+            cast(grades.c.correct_count, Float)
+            * 100.0
+            / cast(grades.c.total_count, Float),
+        ),
+        else_=0.0,
+    )
+
+    return (
+        update(QuizAttemptModel)
+        .where(
+            QuizAttemptModel.id == grades.c.attempt_id,
+            QuizAttemptModel.status == AttemptStatus.IN_PROGRESS,
+        )
+        .values(
+            finish_values(
+                correct_count=grades.c.correct_count,
+                total_count=grades.c.total_count,
+                score=score,
+                finished_at=finished_at,
+            )
+        )
+        .returning(QuizAttemptModel)
+        .execution_options(synchronize_session=False, populate_existing=True)
+    )
+
+
+def build_answer_key(
+    quiz_id: UUID,
+    rows: Iterable[tuple[UUID, float, UUID | None, str | None, bool | None]],
+) -> QuizAnswerKeySchema:
+    """
+    :param rows: (question_id, points, option_id, option_text, is_correct), option columns are None for a question without options.
+    """
+    correct_option_ids: dict[UUID, set[UUID]] = {}
+    option_ids: dict[UUID, set[UUID]] = {}
+    option_texts: dict[UUID, str] = {}
+    points: dict[UUID, float] = {}
+    for question_id, question_points, option_id, option_text, is_correct in rows:
+        correct_option_ids.setdefault(question_id, set())
+        option_ids.setdefault(question_id, set())
+        points[question_id] = question_points
+        if option_id is not None:
+            option_ids[question_id].add(option_id)
+            option_texts[option_id] = option_text
+        if is_correct:
+            correct_option_ids[question_id].add(option_id)
+
+    return QuizAnswerKeySchema(
+        quiz_id=quiz_id,
+        correct_option_ids={
+            question_id: frozenset(ids)
+            for question_id, ids in correct_option_ids.items()
+        },
+        option_ids={
+            question_id: frozenset(ids) for question_id, ids in option_ids.items()
+        },
+        option_texts=option_texts,
+        total_points=sum(points.values()),
+    )
+
+
+def grade_selections(
+    answer_key: QuizAnswerKeySchema,
+    selections: Iterable[tuple[UUID, UUID | None]],
+) -> int:
+    """
+    Same rule as finalize_attempts_query, in Python: a question is correct when the selected options equal the correct ones.
+    Answers to questions outside the key are ignored.
+    :param selections: (question_id, option_id), option_id is None for an answer without selections.
+    :return: Correct answers count.
+    """
+    selected: dict[UUID, set[UUID]] = {}
+    for question_id, option_id in selections:
+        option_ids = selected.setdefault(question_id, set())
+        if option_id is not None:
+            option_ids.add(option_id)
+
+    correct_option_ids = answer_key.correct_option_ids
+    return sum(
+        1
+        for question_id, option_ids in selected.items()
+        if question_id in correct_option_ids
+        and option_ids == correct_option_ids[question_id]
+    )
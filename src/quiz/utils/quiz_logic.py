@@ -1,3 +1,4 @@
+from datetime import datetime
 from typing import Any, Sequence
 from uuid import UUID, uuid4
 
@@ -9,7 +10,11 @@ from ..models import CompanyQuiz as CompanyQuizModel
 from ..models import CompanyQuizQuestion as CompanyQuizQuestionModel
 from ..models import QuestionAnswerOption as QuestionAnswerOptionModel
 from ..schemas import (
+    OptionStatsSchema,
+    QuestionBulkCreateRequestSchema,
+    QuestionStatsSchema,
     QuestionUpdateRequestSchema,
+    QuizAnalyticsSchema,
 )
 
 
@@ -105,3 +110,76 @@ def update_question_options(
         question.options.append(new_opt)
 
     return question
+
+
+def build_question_rows(
+    quiz_id: UUID,
+    questions: Sequence[QuestionBulkCreateRequestSchema],
+    created_at: datetime,
+) -> tuple[list[dict[str, Any]], list[dict[str, Any]], list[dict[str, Any]]]:
+    """
+    Rows for the bulk INSERTs of questions, their quiz links and options. Ids are generated here,
+    so the rows can be inserted and returned without reading them back.
+    :return: question_rows, link_rows, option_rows
+    """
+    question_rows, link_rows, option_rows = [], [], []
+    for question in questions:
+        question_id = uuid4()
+        question_rows.append(
+            {
+                "id": question_id,
+                "text": question.text,
+                "points": question.points,
+                "created_at": created_at,
+                "updated_at": created_at,
+            }
+        )
+        link_rows.append(
+            {"id": uuid4(), "quiz_id": quiz_id, "question_id": question_id}
+        )
+        option_rows.extend(
+            {
+                "id": uuid4(),
+                "question_id": question_id,
+                "text": option.text,
+                "is_correct": option.is_correct,
+            }
+            for option in question.options
+        )
+    return question_rows, link_rows, option_rows
+
+
+def build_quiz_analytics(
+    quiz_id: UUID, rows: Sequence[Any]
+) -> QuizAnalyticsSchema | None:
+    """
+    :param rows: A row per option, see QuizRepository.get_question_stats_rows
+    :return: None if the quiz wasn't found (no rows)
+    """
+    if not rows:
+        return None
+
+    questions: dict[UUID, QuestionStatsSchema] = {}
+    for row in rows:
+        if row.question_id is None:
+            continue
+        question = questions.get(row.question_id)
+        if question is None:
+            question = questions[row.question_id] = QuestionStatsSchema(
+                question_id=row.question_id,
+                text=row.question_text,
+                answered_count=row.answered_count,
+                correct_count=row.correct_count,
+                options=[],
+            )
+        if row.option_id is not None:
+            question.options.append(
+                OptionStatsSchema(
+                    option_id=row.option_id,
+                    text=row.option_text,
+                    is_correct=row.is_correct,
+                    picks_count=row.picks_count,
+                )
+            )
+
+    return QuizAnalyticsSchema(quiz_id=quiz_id, questions=list(questions.values()))
@@ -0,0 +1,250 @@
+import csv
+import io
+from datetime import datetime
+from typing import Any, AsyncIterable, AsyncIterator
+from uuid import UUID, uuid4
+
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import Row
+from sqlalchemy.ext.asyncio import AsyncResult
+
+from src.core.exceptions import InvalidImportException
+
+from ..schemas import (
+    AnswerOptionsCreateRequestSchema,
+    QuestionTransferSchema,
+    QuizTransferSchema,
+    TransferLineSchema,
+)
+from .quiz_logic import build_question_rows
+
+MAX_LINE_BYTES = 64 * 1024
+EXPORT_CHUNK_LINES = 500
+IMPORT_CHUNK_SIZE = 1000  # Quizzes and questions inserted per round trip
+
+ATTEMPT_CSV_HEADER = (
+    "attempt_id",
+    "user_id",
+    "quiz_id",
+    "quiz_version",
+    "status",
+    "started_at",
+    "finished_at",
+    "score",
+    "correct_answers_count",
+    "total_questions_count",
+    "question_id",
+    "option_id",
+    "option_is_correct",
+)
+
+transfer_line_adapter: TypeAdapter[QuizTransferSchema | QuestionTransferSchema] = (
+    TypeAdapter(TransferLineSchema)
+)
+
+
+async def export_lines(rows: AsyncIterable[Row]) -> AsyncIterator[str]:
+    """
+    NDJSON lines of the export, a quiz line followed by a line per question with its options.
+    :param rows: Quiz, question and option columns ordered by quiz and question, see QuizRepository.stream_export_rows
+    """
+    quiz_id = question_id = None
+    question: QuestionTransferSchema | None = None
+    async for row in rows:
+        if row.id != quiz_id or row.question_id != question_id:
+            if question is not None:
+                yield question.model_dump_json() + "\n"
+                question = None
+
+        if row.id != quiz_id:
+            quiz_id, question_id = row.id, None
+            quiz = QuizTransferSchema.model_construct(
+                id=row.id,
+                root_quiz_id=row.root_quiz_id,
+                version=row.version,
+                title=row.title,
+                description=row.description,
+                allowed_attempts=row.allowed_attempts,
+                time_limit_minutes=row.time_limit_minutes,
+            )
+            yield quiz.model_dump_json() + "\n"
+
+        if row.question_id is None:
+            continue
+        if question is None:
+            question_id = row.question_id
+            # Drafts are exported as they are, validation happens on import
+            question = QuestionTransferSchema.model_construct(
+                quiz_id=row.id, text=row.question_text, points=row.points, options=[]
+            )
+        if row.option_text is not None:
+            question.options.append(
+                AnswerOptionsCreateRequestSchema.model_construct(
+                    text=row.option_text, is_correct=row.is_correct
+                )
+            )
+
+    if question is not None:
+        yield question.model_dump_json() + "\n"
+
+
+async def chunk_lines(
+    lines: AsyncIterable[str], size: int = EXPORT_CHUNK_LINES
+) -> AsyncIterator[str]:
+    """Joins lines, so the response isn't written a line at a time."""
+    chunk: list[str] = []
+    async for line in lines:
+        chunk.append(line)
+        if len(chunk) >= size:
+            yield "".join(chunk)
+            chunk.clear()
+    if chunk:
+        yield "".join(chunk)
+
+
+async def attempt_csv_chunks(rows: AsyncResult[Any]) -> AsyncIterator[str]:
+    """
+    CSV of the attempt rows, see AttemptRepository.stream_company_attempt_rows. A chunk per fetched partition,
+    the next one is fetched only after the previous chunk was sent.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(ATTEMPT_CSV_HEADER)
+    async for partition in rows.partitions():
+        writer.writerows(
+            (
+                *row[:4],
+                row.status.value,
+                row.started_at.isoformat(),
+                row.finished_at.isoformat() if row.finished_at else None,
+                *row[7:],
+            )
+            for row in partition
+        )
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+    if buffer.tell():  # Header only, no attempts
+        yield buffer.getvalue()
+
+
+async def iter_ndjson(
+    chunks: AsyncIterable[bytes],
+) -> AsyncIterator[tuple[int, QuizTransferSchema | QuestionTransferSchema]]:
+    """
+    Parses the uploaded body as it arrives, only the unfinished line is kept between chunks.
+    Blank lines are skipped.
+    :return: line number and the validated record
+    """
+    buffer = b""
+    line_number = 0
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        if len(buffer) > MAX_LINE_BYTES:
+            raise InvalidImportException(line_number + len(lines) + 1, "line too long")
+
+        for line in lines:
+            line_number += 1
+            if line.strip():
+                yield line_number, parse_line(line_number, line)
+
+    if buffer.strip():
+        yield line_number + 1, parse_line(line_number + 1, buffer)
+
+
+def parse_line(
+    line_number: int, line: bytes
+) -> QuizTransferSchema | QuestionTransferSchema:
+    try:
+        return transfer_line_adapter.validate_json(line)
+    except ValidationError as e:
+        error = e.errors()[0]
+        location = ".".join(str(loc) for loc in error["loc"])
+        raise InvalidImportException(line_number, f"{location}: {error['msg']}")
+
+
+class QuizImportBatch:
+    """
+    Rows of the imported lines not inserted yet. Quizzes get new ids and are imported as hidden drafts,
+    old quiz ids are kept to link versions and questions, a version without its root becomes a root.
+    """
+
+    def __init__(self, company_id: UUID, created_at: datetime):
+        self.company_id = company_id
+        self.created_at = created_at
+        self.quiz_ids: dict[UUID, UUID] = {}
+        self.quizzes_count = 0
+        self.questions_count = 0
+        self._clear()
+
+    def _clear(self) -> None:
+        self.quiz_rows: list[dict[str, Any]] = []
+        self.question_rows: list[dict[str, Any]] = []
+        self.link_rows: list[dict[str, Any]] = []
+        self.option_rows: list[dict[str, Any]] = []
+
+    def __len__(self) -> int:
+        return len(self.quiz_rows) + len(self.question_rows)
+
+    def add(
+        self, line_number: int, record: QuizTransferSchema | QuestionTransferSchema
+    ) -> None:
+        if isinstance(record, QuizTransferSchema):
+            self.add_quiz(line_number=line_number, quiz=record)
+        else:
+            self.add_question(line_number=line_number, question=record)
+
+    def add_quiz(self, line_number: int, quiz: QuizTransferSchema) -> None:
+        if quiz.id in self.quiz_ids:
+            raise InvalidImportException(line_number, f"duplicate quiz {quiz.id}")
+
+        new_id = uuid4()
+        self.quiz_ids[quiz.id] = new_id
+        root_id = self.quiz_ids.get(quiz.root_quiz_id) if quiz.root_quiz_id else None
+        self.quiz_rows.append(
+            {
+                "id": new_id,
+                "company_id": self.company_id,
+                "title": quiz.title,
+                "description": quiz.description,
+                "allowed_attempts": quiz.allowed_attempts,
+                "time_limit_minutes": quiz.time_limit_minutes,
+                "is_published": False,
+                "is_visible": False,
+                "root_quiz_id": root_id,
+                "version": quiz.version if root_id else 1,
+                "created_at": self.created_at,
+                "updated_at": self.created_at,
+            }
+        )
+        self.quizzes_count += 1
+
+    def add_question(self, line_number: int, question: QuestionTransferSchema) -> None:
+        quiz_id = self.quiz_ids.get(question.quiz_id)
+        if quiz_id is None:
+            raise InvalidImportException(
+                line_number, f"question of unknown quiz {question.quiz_id}"
+            )
+
+        question_rows, link_rows, option_rows = build_question_rows(
+            quiz_id=quiz_id, questions=[question], created_at=self.created_at
+        )
+        self.question_rows += question_rows
+        self.link_rows += link_rows
+        self.option_rows += option_rows
+        self.questions_count += 1
+
+    def take(
+        self,
+    ) -> tuple[
+        list[dict[str, Any]],
+        list[dict[str, Any]],
+        list[dict[str, Any]],
+        list[dict[str, Any]],
+    ]:
+        """:return: quiz_rows, question_rows, link_rows, option_rows; the batch is emptied"""
+        rows = self.quiz_rows, self.question_rows, self.link_rows, self.option_rows
+        self._clear()
+        return rows
@@ -0,0 +1,65 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.auth.dependencies import get_user_from_jwt
+from src.core.caching import router
+from src.core.caching.metrics import CacheMetrics, Histogram, get_namespace
+
+
+@pytest.mark.parametrize(
+    "key, namespace",
+    [
+        ("api-cache:get_quiz:g1:no-user:/companies/1/quizzes/2", "get_quiz"),
+        ("mapping:quiz:123", "mapping:quiz"),
+        ("mapping:user:stats:company:123", "mapping:user:stats:company"),
+        ("gen:company:123", "gen:company"),
+    ],
+)
+def test_get_namespace(key, namespace):
+    assert get_namespace(key) == namespace
+
+
+def test_histogram_observe_puts_values_in_buckets():
+    histogram = Histogram(buckets=(1, 10))
+
+    for value in (0.5, 1, 5, 100):
+        histogram.observe(value)
+
+    snapshot = histogram.snapshot()
+    assert snapshot["buckets"] == {"le_1": 2, "le_10": 1, "inf": 1}
+    assert snapshot["count"] == 4
+    assert snapshot["max"] == 100
+
+
+def test_cache_metrics_hit_ratio_counts_stale_as_lookup():
+    metrics = CacheMetrics()
+    key = "api-cache:get_quiz:1"
+
+    metrics.record_hit(key, latency_ms=1, payload=b"{}")
+    metrics.record_miss(key, latency_ms=1)
+    metrics.record_stale(key)
+    metrics.record_error(key)
+
+    namespace = metrics.snapshot()["namespaces"]["get_quiz"]
+    assert namespace["hits"] == 1
+    assert namespace["misses"] == 1
+    assert namespace["stale"] == 1
+    assert namespace["errors"] == 1
+    assert namespace["hit_ratio"] == 0.333
+    assert namespace["payload_bytes"]["count"] == 1
+
+
+def test_cache_metrics_route_returns_snapshot(monkeypatch):
+    metrics = CacheMetrics()
+    metrics.record_miss("api-cache:get_quiz:1", latency_ms=1)
+    monkeypatch.setattr(router, "cache_metrics", metrics)
+
+    app = FastAPI()
+    app.include_router(router.cache_router)
+    app.dependency_overrides[get_user_from_jwt] = lambda: None
+
+    response = TestClient(app).get("/cache/metrics")
+
+    assert response.status_code == 200
+    assert response.json()["namespaces"]["get_quiz"]["misses"] == 1
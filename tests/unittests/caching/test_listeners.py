@@ -0,0 +1,41 @@
+import asyncio
+from types import SimpleNamespace
+from uuid import uuid4
+
+from src.core.caching import listeners
+from src.core.caching.config import CacheConfig
+
+
+def make_session() -> SimpleNamespace:
+    session = SimpleNamespace(info={})
+    listeners.mark_for_invalidation(session, CacheConfig.QUIZ, uuid4())
+    return session
+
+
+def test_wait_for_invalidations_waits_only_for_own_commits(monkeypatch):
+    other_done = asyncio.Event()
+    finished = []
+
+    async def invalidate(mappings):
+        (config, _id), *_ = mappings
+        if _id == other_id:
+            await other_done.wait()
+        finished.append(_id)
+
+    monkeypatch.setattr(listeners, "invalidate", invalidate)
+    own, other = make_session(), make_session()
+    (_, own_id), *_ = own.info[listeners.INVALIDATION_KEY]
+    (_, other_id), *_ = other.info[listeners.INVALIDATION_KEY]
+
+    async def run():
+        listeners.trigger_invalidation_after_commit(other)
+        listeners.trigger_invalidation_after_commit(own)
+
+        await asyncio.wait_for(listeners.wait_for_invalidations(own), timeout=1)
+        assert finished == [own_id]
+
+        other_done.set()
+        await listeners.wait_for_invalidations(other)
+        assert finished == [own_id, other_id]
+
+    asyncio.run(run())
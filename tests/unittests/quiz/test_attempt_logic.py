@@ -0,0 +1,240 @@
+from datetime import datetime, timezone
+from uuid import uuid4
+
+import pytest
+
+from src.core.exceptions import InvalidAnswerException, InvalidCursorException
+from src.core.utils import encode_cursor
+from src.quiz.enums import AttemptStatus
+from src.quiz.schemas import (
+    CompanyQuizQuestionSchema,
+    QuizAttemptSchema,
+    SaveAnswersRequestSchema,
+)
+from src.quiz.utils.attempt_logic import (
+    assert_valid_answers,
+    build_answer_schema,
+    build_attempts_page,
+    build_score_distribution,
+    get_answer_id,
+    get_company_scores,
+    get_question_options,
+    get_selection_id,
+    get_unscored_user_ids,
+    merge_buffered_answers,
+    parse_attempt_cursor,
+)
+from src.quiz.utils.grading import build_answer_key
+
+NOW = datetime.now(timezone.utc)
+Q1, Q2 = uuid4(), uuid4()
+Q1_A, Q2_A = uuid4(), uuid4()
+ANSWER_KEY = build_answer_key(
+    quiz_id=uuid4(),
+    rows=[(Q1, 1.0, Q1_A, "Option", True), (Q2, 1.0, Q2_A, "Option", True)],
+)
+
+
+def test_assert_valid_answers_accepts_known_options():
+    assert_valid_answers(answers={Q1: [Q1_A], Q2: []}, answer_key=ANSWER_KEY)
+
+
+@pytest.mark.parametrize(
+    "answers",
+    [
+        {uuid4(): []},  # Question not in the quiz
+        {Q1: [Q2_A]},  # Option of another question
+    ],
+)
+def test_assert_valid_answers_rejects(answers):
+    with pytest.raises(InvalidAnswerException):
+        assert_valid_answers(answers=answers, answer_key=ANSWER_KEY)
+
+
+def test_assert_valid_answers_without_answer_key():
+    with pytest.raises(InvalidAnswerException):
+        assert_valid_answers(answers={Q1: [Q1_A]}, answer_key=None)
+
+
+def test_save_answers_rejects_duplicate_questions():
+    with pytest.raises(ValueError):
+        SaveAnswersRequestSchema(
+            answers=[{"question_id": Q1, "ids": []}, {"question_id": Q1, "ids": []}]
+        )
+
+
+def test_answer_ids_are_deterministic():
+    attempt_id = uuid4()
+
+    answer_id = get_answer_id(attempt_id=attempt_id, question_id=Q1)
+
+    assert answer_id == get_answer_id(attempt_id=attempt_id, question_id=Q1)
+    assert answer_id != get_answer_id(attempt_id=attempt_id, question_id=Q2)
+    assert get_selection_id(answer_id=answer_id, option_id=Q1_A) != answer_id
+
+
+def test_buffered_answer_options_come_from_the_answer_key():
+    attempt_id = uuid4()
+
+    answer = build_answer_schema(
+        attempt_id=attempt_id,
+        question_id=Q1,
+        option_ids=[Q1_A, Q2_A],  # Q2_A is not an option of Q1
+        options=get_question_options(answer_key=ANSWER_KEY, question_id=Q1),
+    )
+
+    assert [s.option.text for s in answer.selected_options] == ["Option"]
+    assert answer.selected_options[0].option.question_id == Q1
+
+
+def test_merge_buffered_answers_replaces_stored_answers():
+    attempt_id = uuid4()
+    questions = [
+        CompanyQuizQuestionSchema(
+            id=question_id,
+            text="Question text",
+            points=1.0,
+            created_at=NOW,
+            updated_at=NOW,
+            options=[{"id": option_id, "question_id": question_id, "text": "Option"}],
+        )
+        for question_id, option_id in ((Q1, Q1_A), (Q2, Q2_A))
+    ]
+    stored = build_answer_schema(
+        attempt_id=attempt_id, question_id=Q1, option_ids=[], options={}
+    )
+    attempt = QuizAttemptSchema(
+        id=attempt_id,
+        user_id=uuid4(),
+        quiz_id=uuid4(),
+        score=0.0,
+        correct_answers_count=0,
+        total_questions_count=0,
+        status=AttemptStatus.IN_PROGRESS,
+        started_at=NOW,
+        finished_at=None,
+        answers=[stored],
+    )
+
+    merged = merge_buffered_answers(
+        attempt=attempt, buffered={Q1: [Q1_A], Q2: [Q2_A, Q2_A]}, questions=questions
+    )
+
+    selected = {
+        answer.question_id: [
+            selection.option_id for selection in answer.selected_options
+        ]
+        for answer in merged.answers
+    }
+    assert selected == {Q1: [Q1_A], Q2: [Q2_A]}
+
+
+def test_get_company_scores_from_stats():
+    company_id, user_id = uuid4(), uuid4()
+
+    stats = [
+        (company_id, user_id, 3, 4),
+        (company_id, Q1, 0, 2),
+        (company_id, Q2, 0, 0),
+    ]
+
+    assert get_company_scores(stats) == [
+        (company_id, user_id, 75.0),
+        (company_id, Q1, 0.0),
+    ]
+    assert get_unscored_user_ids(stats) == [Q2]
+
+
+def test_build_score_distribution_from_aggregate_row():
+    quiz_id = uuid4()
+
+    distribution = build_score_distribution(
+        quiz_id=quiz_id,
+        row=(6, 62.5, [50.0, 60.0, 80.0, 95.0], 1, 0, 2, 3),
+        buckets=4,
+        sample_percent=None,
+    )
+
+    assert distribution.percentiles == {
+        "p25": 50.0,
+        "p50": 60.0,
+        "p75": 80.0,
+        "p90": 95.0,
+    }
+    assert [(b.min_score, b.max_score) for b in distribution.buckets] == [
+        (0.0, 25.0),
+        (25.0, 50.0),
+        (50.0, 75.0),
+        (75.0, 100.0),
+    ]
+    assert [b.count for b in distribution.buckets] == [1, 0, 2, 3]
+
+
+def test_build_score_distribution_without_attempts():
+    distribution = build_score_distribution(
+        quiz_id=uuid4(), row=(0, None, None, 0, 0), buckets=2, sample_percent=None
+    )
+
+    assert distribution.attempts_count == 0
+    assert distribution.percentiles == {}
+
+
+def test_build_score_distribution_scales_sampled_counts():
+    distribution = build_score_distribution(
+        quiz_id=uuid4(),
+        row=(3, 70.0, [60.0, 70.0, 80.0, 90.0], 1, 2),
+        buckets=2,
+        sample_percent=10.0,
+    )
+
+    assert distribution.attempts_count == 30
+    assert [b.count for b in distribution.buckets] == [10, 20]
+    assert distribution.average_score == 70.0
+    assert distribution.sample_percent == 10.0
+
+
+def make_finished_attempt(finished_at: datetime) -> dict:
+    return {
+        "id": uuid4(),
+        "user_id": uuid4(),
+        "quiz_id": Q1,
+        "score": 50.0,
+        "correct_answers_count": 1,
+        "total_questions_count": 2,
+        "status": AttemptStatus.COMPLETED,
+        "started_at": finished_at,
+        "finished_at": finished_at,
+    }
+
+
+def test_build_attempts_page_cursor_points_at_the_last_attempt():
+    rows = [make_finished_attempt(NOW) for _ in range(3)]
+
+    page = build_attempts_page(rows=rows, page_size=2)
+
+    assert page.has_next
+    assert [attempt.id for attempt in page.data] == [row["id"] for row in rows[:2]]
+    assert parse_attempt_cursor(page.next_cursor) == (NOW, rows[1]["id"])
+
+
+def test_build_attempts_page_last_page():
+    page = build_attempts_page(rows=[make_finished_attempt(NOW)], page_size=2)
+
+    assert not page.has_next
+    assert page.next_cursor is None
+    assert parse_attempt_cursor(None) is None
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not base64!",
+        "WyJ4Il0=",
+        "WyJ4IiwgInkiXQ==",
+        "WzEsIDJd",
+        encode_cursor([NOW.replace(tzinfo=None), uuid4()]),
+    ],
+)
+def test_parse_attempt_cursor_rejects_invalid_cursors(cursor):
+    with pytest.raises(InvalidCursorException):
+        parse_attempt_cursor(cursor)
@@ -0,0 +1,65 @@
+from uuid import uuid4
+
+from src.core.caching.serializers import deserialize, serialize
+from src.quiz.schemas import QuizAnswerKeySchema
+from src.quiz.utils.grading import build_answer_key, grade_selections
+
+QUIZ_ID = uuid4()
+Q1, Q2, Q3 = uuid4(), uuid4(), uuid4()
+Q1_A, Q1_B, Q2_A, Q2_B, Q2_C = (uuid4() for _ in range(5))
+
+
+def make_answer_key() -> QuizAnswerKeySchema:
+    rows = [
+        (Q1, 1.0, Q1_A, "A", True),
+        (Q1, 1.0, Q1_B, "B", False),
+        (Q2, 2.0, Q2_A, "A", True),
+        (Q2, 2.0, Q2_B, "B", True),
+        (Q2, 2.0, Q2_C, "C", False),
+        (Q3, 0.5, None, None, None),
+    ]
+    return build_answer_key(quiz_id=QUIZ_ID, rows=rows)
+
+
+def test_build_answer_key():
+    answer_key = make_answer_key()
+
+    assert answer_key.correct_option_ids == {
+        Q1: frozenset({Q1_A}),
+        Q2: frozenset({Q2_A, Q2_B}),
+        Q3: frozenset(),
+    }
+    assert answer_key.option_ids == {
+        Q1: frozenset({Q1_A, Q1_B}),
+        Q2: frozenset({Q2_A, Q2_B, Q2_C}),
+        Q3: frozenset(),
+    }
+    assert answer_key.option_texts[Q2_C] == "C"
+    assert answer_key.total_points == 3.5
+    assert answer_key.questions_count == 3
+
+
+def test_grade_selections_requires_exact_option_set():
+    answer_key = make_answer_key()
+    selections = [
+        (Q1, Q1_A),
+        (Q2, Q2_A),  # Missing Q2_B
+        (uuid4(), uuid4()),  # Not in the quiz
+    ]
+
+    assert grade_selections(answer_key=answer_key, selections=selections) == 1
+
+
+def test_grade_selections_answer_without_options():
+    answer_key = make_answer_key()
+    selections = [(Q2, Q2_B), (Q2, Q2_A), (Q3, None)]
+
+    assert grade_selections(answer_key=answer_key, selections=selections) == 2
+
+
+def test_answer_key_survives_cache_round_trip():
+    answer_key = make_answer_key()
+
+    cached = deserialize(serialize(answer_key), response_schema=QuizAnswerKeySchema)
+
+    assert cached == answer_key
@@ -0,0 +1,89 @@
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from pydantic import ValidationError
+
+from src.quiz.schemas import CompanyQuizQuestionAdminSchema, QuizBulkCreateRequestSchema
+from src.quiz.utils.quiz_logic import build_question_rows, build_quiz_analytics
+
+NOW = datetime.now(timezone.utc)
+QUESTION = {
+    "text": "Which option is correct?",
+    "options": [{"text": "Yes", "is_correct": True}, {"text": "No"}],
+}
+
+
+def make_quiz(questions: list[dict]) -> QuizBulkCreateRequestSchema:
+    return QuizBulkCreateRequestSchema.model_validate(
+        {"title": "Bulk quiz", "description": "Created at once", "questions": questions}
+    )
+
+
+def test_build_question_rows_links_every_question():
+    quiz_id = uuid4()
+    quiz = make_quiz([QUESTION, {**QUESTION, "points": 2.5}])
+
+    questions, links, options = build_question_rows(
+        quiz_id=quiz_id, questions=quiz.questions, created_at=NOW
+    )
+
+    assert [q["points"] for q in questions] == [1.0, 2.5]
+    assert [link["question_id"] for link in links] == [q["id"] for q in questions]
+    assert all(link["quiz_id"] == quiz_id for link in links)
+    assert [o["question_id"] for o in options] == [
+        q["id"] for q in questions for _ in range(2)
+    ]
+
+    schema = CompanyQuizQuestionAdminSchema.model_validate(
+        {**questions[0], "options": options[:2]}
+    )
+    assert [o.is_correct for o in schema.options] == [True, False]
+
+
+@pytest.mark.parametrize(
+    "questions",
+    [
+        [QUESTION],  # Less than 2 questions
+        [QUESTION, {**QUESTION, "options": [{"text": "A"}, {"text": "B"}]}],
+    ],
+)
+def test_bulk_quiz_rejects_unpublishable_questions(questions):
+    with pytest.raises(ValidationError):
+        make_quiz(questions)
+
+
+def make_stats_row(question_id, option_id=None, **stats):
+    return SimpleNamespace(
+        question_id=question_id,
+        question_text="Which option is correct?",
+        answered_count=stats.get("answered_count", 0),
+        correct_count=stats.get("correct_count", 0),
+        option_id=option_id,
+        option_text="Option",
+        is_correct=stats.get("is_correct", False),
+        picks_count=stats.get("picks_count", 0),
+    )
+
+
+def test_build_quiz_analytics_groups_options_per_question():
+    quiz_id, q1, q2 = uuid4(), uuid4(), uuid4()
+    rows = [
+        make_stats_row(q1, uuid4(), answered_count=4, correct_count=1, picks_count=3),
+        make_stats_row(q1, uuid4(), answered_count=4, correct_count=1, picks_count=1),
+        make_stats_row(q2, uuid4()),
+    ]
+
+    analytics = build_quiz_analytics(quiz_id=quiz_id, rows=rows)
+
+    assert [q.question_id for q in analytics.questions] == [q1, q2]
+    assert [o.picks_count for o in analytics.questions[0].options] == [3, 1]
+    assert [q.correct_rate for q in analytics.questions] == [0.25, 0.0]
+
+
+def test_build_quiz_analytics_of_missing_or_empty_quiz():
+    assert build_quiz_analytics(quiz_id=uuid4(), rows=[]) is None
+
+    analytics = build_quiz_analytics(quiz_id=uuid4(), rows=[make_stats_row(None)])
+    assert analytics.questions == []
@@ -0,0 +1,58 @@
+import pytest
+from starlette.requests import Request
+
+from src.quiz.snapshots import QuizSnapshot
+
+
+def make_request(if_none_match: str | None = None) -> Request:
+    headers = []
+    if if_none_match is not None:
+        headers.append((b"if-none-match", if_none_match.encode()))
+    return Request({"type": "http", "method": "GET", "headers": headers})
+
+
+def test_render_etag_is_content_hash():
+    snapshot = QuizSnapshot.render('{"id": 1}')
+
+    assert snapshot == QuizSnapshot.render('{"id": 1}')
+    assert snapshot.etag != QuizSnapshot.render('{"id": 2}').etag
+    assert snapshot.etag.startswith('"') and snapshot.etag.endswith('"')
+
+
+@pytest.mark.parametrize(
+    "if_none_match, matches",
+    [
+        (None, False),
+        ("", False),
+        ('"other"', False),
+        ("{etag}", True),
+        ('"other", {etag}', True),
+        ("W/{etag}", True),
+        ("*", True),
+    ],
+)
+def test_matches_if_none_match(if_none_match, matches):
+    snapshot = QuizSnapshot.render("[]")
+    header = if_none_match.format(etag=snapshot.etag) if if_none_match else None
+
+    assert snapshot.matches(header) is matches
+
+
+def test_to_response_not_modified_has_no_body():
+    snapshot = QuizSnapshot.render('{"id": 1}')
+
+    response = snapshot.to_response(make_request(snapshot.etag))
+
+    assert response.status_code == 304
+    assert response.body == b""
+    assert response.headers["etag"] == snapshot.etag
+
+
+def test_to_response_serves_body():
+    snapshot = QuizSnapshot.render('{"id": 1}')
+
+    response = snapshot.to_response(make_request('"stale"'))
+
+    assert response.status_code == 200
+    assert response.body == b'{"id": 1}'
+    assert response.headers["content-type"] == "application/json"
@@ -0,0 +1,182 @@
+import asyncio
+import csv
+from collections import namedtuple
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+
+from src.core.exceptions import InvalidImportException
+from src.quiz.enums import AttemptStatus
+from src.quiz.utils.transfer import (
+    ATTEMPT_CSV_HEADER,
+    MAX_LINE_BYTES,
+    QuizImportBatch,
+    attempt_csv_chunks,
+    chunk_lines,
+    export_lines,
+    iter_ndjson,
+)
+
+ROOT_ID, VERSION_ID = uuid4(), uuid4()
+Q1, Q2 = uuid4(), uuid4()
+
+
+def make_row(quiz_id, question_id=None, option_text=None, is_correct=False, **quiz):
+    return SimpleNamespace(
+        id=quiz_id,
+        root_quiz_id=quiz.get("root_quiz_id"),
+        version=quiz.get("version", 1),
+        title="Exported quiz",
+        description="Description",
+        allowed_attempts=None,
+        time_limit_minutes=30,
+        question_id=question_id,
+        question_text="Which option is correct?",
+        points=2.0,
+        option_text=option_text,
+        is_correct=is_correct,
+    )
+
+
+ROWS = [
+    make_row(ROOT_ID, Q1, "Yes", True),
+    make_row(ROOT_ID, Q1, "No"),
+    make_row(ROOT_ID, Q2, "Yes", True),
+    make_row(ROOT_ID, Q2, "No"),
+    # Next version shares Q1
+    make_row(VERSION_ID, Q1, "Yes", True, root_quiz_id=ROOT_ID, version=2),
+    make_row(VERSION_ID, Q1, "No", root_quiz_id=ROOT_ID, version=2),
+]
+
+
+async def aiterate(items):
+    for item in items:
+        yield item
+
+
+async def collect(iterator):
+    return [item async for item in iterator]
+
+
+def export(rows) -> str:
+    return "".join(asyncio.run(collect(chunk_lines(export_lines(aiterate(rows)), 2))))
+
+
+def test_export_lines_groups_rows():
+    lines = export(ROWS).splitlines()
+
+    assert len(lines) == 5
+    assert [line.split('"type":"')[1][:4] for line in lines] == [
+        "quiz",
+        "ques",
+        "ques",
+        "quiz",
+        "ques",
+    ]
+
+
+def test_export_is_imported_with_new_ids():
+    body = export(ROWS).encode()
+    # Split inside lines, the parser must carry the unfinished line over
+    chunks = [body[i : i + 7] for i in range(0, len(body), 7)]
+    records = asyncio.run(collect(iter_ndjson(aiterate(chunks))))
+
+    batch = QuizImportBatch(company_id=uuid4(), created_at=datetime.now(timezone.utc))
+    for line_number, record in records:
+        batch.add(line_number=line_number, record=record)
+    quizzes, questions, links, options = batch.take()
+
+    assert (batch.quizzes_count, batch.questions_count) == (2, 3)
+    assert len(batch) == 0
+    root, version = quizzes
+    assert root["id"] not in (ROOT_ID, VERSION_ID)
+    assert (root["root_quiz_id"], version["root_quiz_id"]) == (None, root["id"])
+    assert version["version"] == 2
+    assert not version["is_published"]
+    assert [link["quiz_id"] for link in links] == [root["id"]] * 2 + [version["id"]]
+    assert len(options) == 6
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        b'{"type": "unknown"}\n',
+        b"not json\n",
+        b"x" * (MAX_LINE_BYTES + 1),
+    ],
+)
+def test_iter_ndjson_rejects_invalid_lines(body):
+    with pytest.raises(InvalidImportException):
+        asyncio.run(collect(iter_ndjson(aiterate([body]))))
+
+
+def test_import_rejects_question_of_unknown_quiz():
+    lines = export(ROWS).splitlines(keepends=True)[1:]
+    records = asyncio.run(
+        collect(iter_ndjson(aiterate([line.encode() for line in lines])))
+    )
+
+    batch = QuizImportBatch(company_id=uuid4(), created_at=datetime.now(timezone.utc))
+    with pytest.raises(InvalidImportException):
+        batch.add(*records[0])
+
+
+AttemptRow = namedtuple(
+    "AttemptRow",
+    [
+        "id",
+        "user_id",
+        "quiz_id",
+        "version",
+        "status",
+        "started_at",
+        "finished_at",
+        "score",
+        "correct_answers_count",
+        "total_questions_count",
+        "question_id",
+        "option_id",
+        "is_correct",
+    ],
+    defaults=[None, None, None],
+)
+
+
+class FakeResult:
+    def __init__(self, *partitions):
+        self._partitions = partitions
+
+    async def partitions(self):
+        for partition in self._partitions:
+            yield partition
+
+
+def test_attempt_csv_chunks_writes_a_chunk_per_partition():
+    now = datetime.now(timezone.utc)
+    finished = AttemptRow(
+        uuid4(), uuid4(), ROOT_ID, 1, AttemptStatus.COMPLETED, now, now, 50.0, 1, 2
+    )
+    result = FakeResult(
+        [finished._replace(question_id=Q1, option_id=uuid4(), is_correct=True)],
+        [
+            finished._replace(question_id=Q2, option_id=uuid4(), is_correct=False),
+            finished._replace(status=AttemptStatus.IN_PROGRESS, finished_at=None),
+        ],
+    )
+
+    chunks = asyncio.run(collect(attempt_csv_chunks(result)))
+    rows = list(csv.reader("".join(chunks).splitlines()))
+
+    assert len(chunks) == 2
+    assert rows[0] == list(ATTEMPT_CSV_HEADER)
+    assert [row[4] for row in rows[1:]] == ["completed", "completed", "in_progress"]
+    assert rows[1][5] == now.isoformat()
+    assert rows[3][6] == rows[3][10] == ""
+
+
+def test_attempt_csv_chunks_without_attempts_writes_the_header():
+    chunks = asyncio.run(collect(attempt_csv_chunks(FakeResult())))
+
+    assert chunks == [",".join(ATTEMPT_CSV_HEADER) + "\r\n"]